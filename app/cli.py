@@ -0,0 +1,48 @@
+"""
+Command line tools
+    python -m app.cli --help
+"""
+
+import click
+
+from app.src.core import migrations
+from app.src.core.database import SessionLocal
+# Register every table on Base.metadata before the first session
+from app.src.domain.buyer import models as buyer_models  # noqa: F401
+from app.src.domain.car import models as car_models  # noqa: F401
+from app.src.domain.report import models as report_models  # noqa: F401
+from app.src.domain.reservation import models as reservation_models  # noqa: F401
+from app.src.domain.sale import models as sale_models  # noqa: F401
+from app.src.domain.seller import models as seller_models  # noqa: F401
+from app.src.domain.stock import models as stock_models  # noqa: F401
+from app.src.domain.user import models as user_models  # noqa: F401
+from app.src.domain.report.service import report_service
+
+
+@click.group()
+def cli() -> None:
+    """Car shop ERP management commands"""
+
+
+@cli.command("rebuild-rollups")
+@click.option("--chunk-size", default=10000, show_default=True, help="Sales aggregated per query")
+def rebuild_rollups(chunk_size: int) -> None:
+    """Recompute the sales rollups from the sales table"""
+    db = SessionLocal()
+    try:
+        buckets = report_service.rebuild_rollups(db, chunk_size=chunk_size)
+    finally:
+        db.close()
+    click.echo(f"Rebuilt {buckets} sales rollup buckets")
+
+
+@cli.command("migrate")
+@click.option("--revision", default="head", show_default=True, help="Alembic revision to upgrade to")
+def migrate(revision: str) -> None:
+    """Apply the database migrations, run once per deploy before the workers start"""
+    migrations.upgrade(revision)
+    click.echo(f"Database migrated to {revision}")
+
+
+if __name__ == "__main__":
+    cli()
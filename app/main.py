@@ -1,28 +1,51 @@
+from contextlib import asynccontextmanager
+
 from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException
 from fastapi_pagination import add_pagination
 from fastapi_pagination.ext.sqlalchemy import paginate
+from starlette.concurrency import run_in_threadpool
 
-from .src.core.config import ALLOWED_HOSTS, API_PREFIX
-from .src.core.database import Base, SessionLocal, engine
+from .src.core.config import ALLOWED_HOSTS, API_PREFIX, settings
+from .src.core.database import RequestSession, engine
+from .src.core.health import health_monitor
+from .src.core.migrations import check_schema_version
 from .src.core.security import get_current_user
 from .src.internal import admin
 from .src.api.v1.router import api_router
+from .src.domain.report.leaderboard import leaderboard_reconciler
+from .src.domain.reservation.sweeper import reservation_sweeper
 
 ###
 # Main application file
 ###
 
 
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """Check the schema revision, then run the background tasks while the application serves"""
+    # Migrations are applied before deploys (python -m app.cli migrate), not by workers
+    await run_in_threadpool(check_schema_version, application.state.engine, settings.SCHEMA_VERSION_CHECK)
+    if settings.RESERVATION_SWEEPER_ENABLED:
+        reservation_sweeper.start()
+    # Seeds the seller leaderboard, then reconciles it with the database
+    leaderboard_reconciler.start()
+    application.state.health_monitor.start()
+    yield
+    await application.state.health_monitor.stop()
+    await leaderboard_reconciler.stop()
+    await reservation_sweeper.stop()
+
+
 def get_application() -> FastAPI:
     """Configure, start and return the application"""
 
     ## Start FastApi App
-    application = FastAPI()
-
-    ## Generate database tables
-    Base.metadata.create_all(bind=engine)
+    application = FastAPI(lifespan=lifespan)
+    # Replaced by the tests with their own database
+    application.state.engine = engine
+    application.state.health_monitor = health_monitor
 
     ## Mapping api routes
     application.include_router(api_router, prefix=API_PREFIX + "/v1")
@@ -63,13 +86,14 @@ async def health_check():
 @app.middleware("http")
 async def db_session_middleware(request: Request, call_next):
     """
-    The middleware we'll add (just a function) will create
-    a new SQLAlchemy SessionLocal for each request, add it to
-    the request and then close it once the request is finished.
+    The middleware we'll add (just a function) will attach
+    a lazy request scoped session to the request, shared with the
+    Database dependency, and close it once the request is finished.
+    The SQLAlchemy Session is only created if something asks for it.
     """
     response = Response("Internal server error", status_code=500)
+    request.state.db = RequestSession()
     try:
-        request.state.db = SessionLocal()
         response = await call_next(request)
     finally:
         request.state.db.close()
@@ -10,6 +10,7 @@ SELLER_DOES_NOT_EXIST_ERROR = "seller does not exist"
 SALES_DOES_NOT_EXIST_ERROR = "sale does not exist"
 USER_DOES_NOT_EXIST_ERROR = "user does not exist"
 ITEM_DOES_NOT_EXIST_ERROR = "item does not exist"
+RESERVATION_DOES_NOT_EXIST_ERROR = "reservation does not exist"
 
 # Errors - Resource Already Exists (409)
 CAR_ALREADY_EXISTS_ERROR = "car already exists"
@@ -33,6 +34,7 @@ CAR_NOT_AVAILABLE_ERROR = "Car not available"
 STOCK_OUT_OF_STOCK_ERROR = "out of stock"
 INSUFFICIENT_STOCK_ERROR = "Insufficient stock"
 INACTIVE_USER_ERROR = "User is inactive"
+RESERVATION_NOT_ACTIVE_ERROR = "reservation is not active"
 
 # Authentication & Authorization Errors
 UNAUTHORIZED_ERROR = "Unauthorized"
@@ -59,6 +61,9 @@ MISSING_REQUIRED_FIELD = "Missing required field"
 INVALID_FIELD_FORMAT = "Invalid field format"
 FIELD_TOO_LONG = "Field exceeds maximum length"
 FIELD_TOO_SHORT = "Field below minimum length"
+BULK_INVALID_BODY_ERROR = "Body must be a JSON array or NDJSON"
+BULK_TOO_MANY_ROWS_ERROR = "Too many rows in bulk request"
+INVALID_CURSOR_ERROR = "Invalid pagination cursor"
 
 # Database Messages
 DATABASE_CONNECTION_ERROR = "Database connection failed"
@@ -70,6 +75,7 @@ SERVICE_UNAVAILABLE = "Service temporarily unavailable"
 INTERNAL_SERVER_ERROR = "Internal server error"
 REQUEST_TIMEOUT = "Request timeout"
 RATE_LIMIT_EXCEEDED = "Rate limit exceeded"
+PASSWORD_HASHER_BUSY_ERROR = "Too many password checks in progress, retry shortly"
 
 # HTTP Status Descriptions
 HTTP_200_OK = "OK"
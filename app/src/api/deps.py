@@ -3,35 +3,61 @@ Dependencies for API endpoints using FastAPI Annotated patterns
 Centralized dependency injection for clean architecture
 """
 
-from typing import Annotated
+from typing import Annotated, AsyncIterator, Iterator, Optional
 
-from fastapi import Depends
+from fastapi import Depends, Header, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.src.core import database
 from app.src.core.database import SessionLocal
+from app.src.core.health import HealthMonitor as HealthMonitorClass
+from app.src.core.replicas import use_replica
 from app.src.core.security import get_current_user
 # Import the actual classes for type hints
 from app.src.domain.buyer.service import BuyerService as BuyerServiceClass
 from app.src.domain.car.repository import CarRepository as CarRepositoryClass
 from app.src.domain.car.service import CarService as CarServiceClass
+from app.src.domain.report.service import ReportService as ReportServiceClass
+from app.src.domain.reservation.service import ReservationService as ReservationServiceClass
 from app.src.domain.sale.service import SaleService as SaleServiceClass
 from app.src.domain.seller.service import SellerService as SellerServiceClass
 from app.src.domain.stock.service import StockService as StockServiceClass
 from app.src.domain.user.service import UserService as UserServiceClass
+from app.src.domain.buyer.service import AsyncBuyerService as AsyncBuyerServiceClass
+from app.src.domain.car.service import AsyncCarService as AsyncCarServiceClass
+from app.src.domain.sale.service import AsyncSaleService as AsyncSaleServiceClass
+from app.src.domain.seller.service import AsyncSellerService as AsyncSellerServiceClass
+from app.src.domain.stock.service import AsyncStockService as AsyncStockServiceClass
+from app.src.domain.user.service import AsyncUserService as AsyncUserServiceClass
 
 # Import singleton instances
 from app.src.domain.buyer.service import buyer_service
 from app.src.domain.car.repository import car_repository
 from app.src.domain.car.service import car_service
+from app.src.domain.report.service import report_service
+from app.src.domain.reservation.service import reservation_service
 from app.src.domain.sale.service import sale_service
 from app.src.domain.seller.service import seller_service
 from app.src.domain.stock.service import stock_service
 from app.src.domain.user.service import user_service
+from app.src.domain.buyer.service import async_buyer_service
+from app.src.domain.car.service import async_car_service
+from app.src.domain.sale.service import async_sale_service
+from app.src.domain.seller.service import async_seller_service
+from app.src.domain.stock.service import async_stock_service
+from app.src.domain.user.service import async_user_service
 
 
 # Database Dependency
-def get_db() -> Session:
-    """Database session dependency"""
+def get_db(request: Request) -> Iterator[Session]:
+    """Database session dependency, shares the request scoped session of the middleware"""
+    request_session = getattr(request.state, "db", None)
+    if request_session is not None:
+        # Closed by db_session_middleware once the request is finished
+        yield request_session.get()
+        return
+
     db = SessionLocal()
     try:
         yield db
@@ -39,21 +65,55 @@ def get_db() -> Session:
         db.close()
 
 
+def get_read_db(db: Session = Depends(get_db)) -> Session:
+    """Read only database session dependency, served by a replica when configured"""
+    return use_replica(db)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Async database session dependency, requires DATABASE_ASYNC"""
+    if database.AsyncSessionLocal is None:
+        raise RuntimeError("Async database is disabled, set DATABASE_ASYNC=true")
+    async with database.AsyncSessionLocal() as db:
+        yield db
+
+
+def get_health_monitor(request: Request) -> HealthMonitorClass:
+    """Health monitor of the application, probing the database it serves"""
+    return request.app.state.health_monitor
+
+
 # Security Dependencies
 # Using core.security module
 
 
 # Service Dependencies - Direct singleton imports
 Database = Annotated[Session, Depends(get_db)]
+ReadDatabase = Annotated[Session, Depends(get_read_db)]
 
 # Direct dependencies using singleton instances
 BuyerService = Annotated[BuyerServiceClass, Depends(lambda: buyer_service)]
 CarRepository = Annotated[CarRepositoryClass, Depends(lambda: car_repository)]
 CarService = Annotated[CarServiceClass, Depends(lambda: car_service)]
+ReportService = Annotated[ReportServiceClass, Depends(lambda: report_service)]
+ReservationService = Annotated[ReservationServiceClass, Depends(lambda: reservation_service)]
 SaleService = Annotated[SaleServiceClass, Depends(lambda: sale_service)]
 SellerService = Annotated[SellerServiceClass, Depends(lambda: seller_service)]
 StockService = Annotated[StockServiceClass, Depends(lambda: stock_service)]
 UserService = Annotated[UserServiceClass, Depends(lambda: user_service)]
+HealthMonitor = Annotated[HealthMonitorClass, Depends(get_health_monitor)]
+
+# Async counterparts, used by the async endpoints when DATABASE_ASYNC is enabled
+AsyncDatabase = Annotated[AsyncSession, Depends(get_async_db)]
+AsyncBuyerService = Annotated[AsyncBuyerServiceClass, Depends(lambda: async_buyer_service)]
+AsyncCarService = Annotated[AsyncCarServiceClass, Depends(lambda: async_car_service)]
+AsyncSaleService = Annotated[AsyncSaleServiceClass, Depends(lambda: async_sale_service)]
+AsyncSellerService = Annotated[AsyncSellerServiceClass, Depends(lambda: async_seller_service)]
+AsyncStockService = Annotated[AsyncStockServiceClass, Depends(lambda: async_stock_service)]
+AsyncUserService = Annotated[AsyncUserServiceClass, Depends(lambda: async_user_service)]
+
+# Conditional request headers
+IfNoneMatch = Annotated[Optional[str], Header()]
 
 # Security Annotated Dependencies
 CurrentUser = Annotated[dict, Depends(get_current_user)]
@@ -62,12 +122,23 @@ CurrentUser = Annotated[dict, Depends(get_current_user)]
 # Common Dependencies mapping
 CommonDependencies = {
     "db": Database,
+    "read_db": ReadDatabase,
     "buyer_service": BuyerService,
     "car_repository": CarRepository,
     "car_service": CarService,
+    "report_service": ReportService,
+    "reservation_service": ReservationService,
     "sale_service": SaleService,
     "seller_service": SellerService,
     "stock_service": StockService,
     "user_service": UserService,
+    "health_monitor": HealthMonitor,
     "current_user": CurrentUser,
+    "async_db": AsyncDatabase,
+    "async_buyer_service": AsyncBuyerService,
+    "async_car_service": AsyncCarService,
+    "async_sale_service": AsyncSaleService,
+    "async_seller_service": AsyncSellerService,
+    "async_stock_service": AsyncStockService,
+    "async_user_service": AsyncUserService,
 }
@@ -0,0 +1 @@
+"""Async endpoints package for v1 API, mounted when DATABASE_ASYNC is enabled"""
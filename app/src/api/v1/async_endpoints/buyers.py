@@ -0,0 +1,91 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi_pagination import Page, resolve_params
+
+from app.src.api.deps import AsyncDatabase, IfNoneMatch, AsyncBuyerService
+from app.src.core.etag import NOT_MODIFIED_RESPONSES, entity_etag, etag_matches, not_modified, page_etag
+from app.src.domain.buyer import exceptions, schemas
+from app.resources.strings import BUYER_ALREADY_EXISTS_ERROR, BUYER_DOES_NOT_EXIST_ERROR, INVALID_BUYER_ERROR
+
+router = APIRouter()
+
+
+@router.post("/", response_model=schemas.Buyer, status_code=201)
+async def create_buyer(
+    buyer: schemas.BuyerCreate,
+    db: AsyncDatabase,
+    buyer_service: AsyncBuyerService,
+):
+    """Create new buyer using dependency injection"""
+    try:
+        return await buyer_service.create_buyer(db=db, buyer=buyer)
+    except exceptions.BuyerAlreadyExistsError as e:
+        raise HTTPException(status_code=409, detail=BUYER_ALREADY_EXISTS_ERROR)
+    except exceptions.BuyerInvalidDataError as e:
+        raise HTTPException(status_code=400, detail=INVALID_BUYER_ERROR)
+
+
+@router.get("/{buyer_id}", response_model=schemas.Buyer, responses=NOT_MODIFIED_RESPONSES)
+async def read_buyer(
+    buyer_id: int,
+    response: Response,
+    db: AsyncDatabase,
+    buyer_service: AsyncBuyerService,
+    if_none_match: IfNoneMatch = None,
+):
+    """Get buyer by ID using dependency injection, 304 while If-None-Match holds its ETag"""
+    try:
+        if if_none_match is not None:
+            etag = entity_etag(await buyer_service.get_buyer_versions(db, buyer_id=buyer_id))
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        db_buyer = schemas.Buyer.model_validate(await buyer_service.get_buyer(db, buyer_id=buyer_id))
+    except exceptions.BuyerNotFoundError as e:
+        raise HTTPException(status_code=404, detail=BUYER_DOES_NOT_EXIST_ERROR)
+    response.headers["ETag"] = entity_etag(db_buyer.versions)
+    return db_buyer
+
+
+@router.get("/", response_model=Page[schemas.Buyer], responses=NOT_MODIFIED_RESPONSES)
+async def read_buyers(
+    response: Response,
+    db: AsyncDatabase,
+    buyer_service: AsyncBuyerService,
+    if_none_match: IfNoneMatch = None,
+):
+    """Get all buyers with automatic pagination, 304 while If-None-Match holds the ETag of the page"""
+    params = resolve_params().to_raw_params()
+    if if_none_match is not None:
+        total, versions = await buyer_service.get_buyers_versions(db, limit=params.limit, offset=params.offset)
+        etag = page_etag(total, params, versions)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    page = await buyer_service.get_buyers(db)
+    response.headers["ETag"] = page_etag(page.total, params, [buyer.versions for buyer in page.items])
+    return page
+
+
+@router.delete("/{buyer_id}", response_model=bool)
+async def delete_buyer(
+    buyer_id: int,
+    db: AsyncDatabase,
+    buyer_service: AsyncBuyerService,
+):
+    """Delete buyer by ID using dependency injection"""
+    try:
+        return await buyer_service.delete_buyer(db, buyer_id=buyer_id)
+    except exceptions.BuyerNotFoundError as e:
+        raise HTTPException(status_code=404, detail=BUYER_DOES_NOT_EXIST_ERROR)
+
+
+@router.get("/search/", response_model=List[schemas.Buyer])
+async def search_buyers(
+    db: AsyncDatabase,
+    buyer_service: AsyncBuyerService,
+    name: str = Query(..., description="Search buyers by name"),
+    skip: int = Query(default=0, ge=0, description="Buyers to skip"),
+    limit: int = Query(default=100, ge=1, le=100, description="Maximum number of buyers"),
+):
+    """Search buyers by name, best matches first"""
+    return await buyer_service.search_buyers_by_name(db, name=name, skip=skip, limit=limit)
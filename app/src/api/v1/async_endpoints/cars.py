@@ -0,0 +1,92 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi_pagination import Page, resolve_params
+
+from app.src.api.deps import AsyncDatabase, IfNoneMatch, AsyncCarService
+from app.src.core.etag import NOT_MODIFIED_RESPONSES, entity_etag, etag_matches, not_modified, page_etag
+from app.src.domain.car import exceptions, schemas
+from app.resources.strings import CAR_ALREADY_EXISTS_ERROR, CAR_DOES_NOT_EXIST_ERROR
+
+router = APIRouter()
+
+
+@router.post("/", response_model=schemas.Car, status_code=201)
+async def create_car(
+    car: schemas.CarCreate,
+    db: AsyncDatabase,
+    car_service: AsyncCarService,
+):
+    """Create new car using dependency injection"""
+    try:
+        return await car_service.create_car(db=db, car=car)
+    except exceptions.CarAlreadyExistsError as e:
+        raise HTTPException(status_code=409, detail=CAR_ALREADY_EXISTS_ERROR)
+
+
+@router.get("/{car_id}", response_model=schemas.Car, responses=NOT_MODIFIED_RESPONSES)
+async def read_car(
+    car_id: int,
+    response: Response,
+    db: AsyncDatabase,
+    car_service: AsyncCarService,
+    if_none_match: IfNoneMatch = None,
+):
+    """Get car by ID using dependency injection, 304 while If-None-Match holds its ETag"""
+    try:
+        if if_none_match is not None:
+            etag = entity_etag(await car_service.get_car_versions(db, car_id=car_id))
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        db_car = schemas.Car.model_validate(await car_service.get_car(db, car_id=car_id))
+    except exceptions.CarNotFoundError as e:
+        raise HTTPException(status_code=404, detail=CAR_DOES_NOT_EXIST_ERROR)
+    response.headers["ETag"] = entity_etag(db_car.versions)
+    return db_car
+
+
+@router.get("/", response_model=Page[schemas.Car], responses=NOT_MODIFIED_RESPONSES)
+async def read_cars(
+    response: Response,
+    db: AsyncDatabase,
+    car_service: AsyncCarService,
+    if_none_match: IfNoneMatch = None,
+):
+    """Get all cars with automatic pagination, 304 while If-None-Match holds the ETag of the page"""
+    params = resolve_params().to_raw_params()
+    if if_none_match is not None:
+        total, versions = await car_service.get_cars_versions(db, limit=params.limit, offset=params.offset)
+        etag = page_etag(total, params, versions)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    page = await car_service.get_cars(db)
+    response.headers["ETag"] = page_etag(page.total, params, [car.versions for car in page.items])
+    return page
+
+
+@router.delete("/{car_id}", response_model=bool)
+async def delete_car(
+    car_id: int,
+    db: AsyncDatabase,
+    car_service: AsyncCarService,
+):
+    """Delete car by ID using dependency injection"""
+    try:
+        return await car_service.delete_car(db, car_id=car_id)
+    except exceptions.CarNotFoundError as e:
+        raise HTTPException(status_code=404, detail=CAR_DOES_NOT_EXIST_ERROR)
+
+
+@router.get("/search/", response_model=List[schemas.Car])
+async def search_cars(
+    db: AsyncDatabase,
+    car_service: AsyncCarService,
+    brand: str = Query(..., description="Search cars by brand, ignoring case"),
+    prefix: bool = Query(default=False, description="Match brands starting with the given one"),
+    skip: int = Query(default=0, ge=0, description="Cars to skip"),
+    limit: int = Query(default=100, ge=1, le=100, description="Maximum number of cars"),
+):
+    """Search cars by brand"""
+    return await car_service.search_cars_by_brand(
+        db, brand=brand, prefix=prefix, skip=skip, limit=limit
+    )
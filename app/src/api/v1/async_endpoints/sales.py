@@ -0,0 +1,138 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi_pagination import Page, resolve_params
+
+from app.src.api.deps import AsyncDatabase, IfNoneMatch, AsyncSaleService, AsyncStockService
+from app.src.core.etag import NOT_MODIFIED_RESPONSES, entity_etag, etag_matches, not_modified, page_etag
+from app.src.core.unit_of_work import async_unit_of_work
+from app.src.domain.sale import exceptions as sale_exceptions
+from app.src.domain.car import exceptions as car_exceptions
+from app.src.domain.buyer import exceptions as buyer_exceptions
+from app.src.domain.seller import exceptions as seller_exceptions
+from app.src.domain.stock import exceptions as stock_exceptions
+from app.src.domain.sale import schemas
+from app.resources.strings import (
+    BUYER_DOES_NOT_EXIST_ERROR,
+    CAR_DOES_NOT_EXIST_ERROR,
+    INVALID_SALE_ERROR,
+    SALES_DOES_NOT_EXIST_ERROR,
+    SELLER_DOES_NOT_EXIST_ERROR,
+    STOCK_DOES_NOT_EXIST_ERROR,
+    STOCK_OUT_OF_STOCK_ERROR,
+)
+
+router = APIRouter()
+
+
+@router.post("/", response_model=schemas.Sale, status_code=201)
+async def create_sale(
+    sale: schemas.SaleCreate,
+    db: AsyncDatabase,
+    sale_service: AsyncSaleService,
+    stock_service: AsyncStockService,
+):
+    """Create new sale using dependency injection"""
+    try:
+        # Reduce stock quantity and register the sale in one transaction
+        async with async_unit_of_work(db):
+            await stock_service.buy_car_from_stock(db, car_id=sale.car_id, quantity=1)
+            db_sale = await sale_service.create_sale(db=db, sale=sale)
+        return db_sale
+    except car_exceptions.CarNotFoundError as e:
+        raise HTTPException(status_code=404, detail=CAR_DOES_NOT_EXIST_ERROR)
+    except buyer_exceptions.BuyerNotFoundError as e:
+        raise HTTPException(status_code=404, detail=BUYER_DOES_NOT_EXIST_ERROR)
+    except seller_exceptions.SellerNotFoundError as e:
+        raise HTTPException(status_code=404, detail=SELLER_DOES_NOT_EXIST_ERROR)
+    except stock_exceptions.StockNotFoundError as e:
+        raise HTTPException(status_code=404, detail=STOCK_DOES_NOT_EXIST_ERROR)
+    except stock_exceptions.InsufficientStockError as e:
+        raise HTTPException(status_code=422, detail=STOCK_OUT_OF_STOCK_ERROR)
+    except sale_exceptions.SaleNotFoundError as e:
+        raise HTTPException(status_code=404, detail=SALES_DOES_NOT_EXIST_ERROR)
+    except sale_exceptions.InvalidSaleError as e:
+        raise HTTPException(status_code=400, detail=INVALID_SALE_ERROR)
+
+
+@router.get("/{sale_id}", response_model=schemas.Sale, responses=NOT_MODIFIED_RESPONSES)
+async def read_sale(
+    sale_id: int,
+    response: Response,
+    db: AsyncDatabase,
+    sale_service: AsyncSaleService,
+    if_none_match: IfNoneMatch = None,
+):
+    """Get sale by ID using dependency injection, 304 while If-None-Match holds its ETag"""
+    try:
+        if if_none_match is not None:
+            etag = entity_etag(await sale_service.get_sale_versions(db, sale_id=sale_id))
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        db_sale = schemas.Sale.model_validate(await sale_service.get_sale(db, sale_id=sale_id))
+    except sale_exceptions.SaleNotFoundError as e:
+        raise HTTPException(status_code=404, detail=SALES_DOES_NOT_EXIST_ERROR)
+    response.headers["ETag"] = entity_etag(db_sale.versions)
+    return db_sale
+
+
+@router.get("/", response_model=Page[schemas.Sale], responses=NOT_MODIFIED_RESPONSES)
+async def read_sales(
+    response: Response,
+    db: AsyncDatabase,
+    sale_service: AsyncSaleService,
+    if_none_match: IfNoneMatch = None,
+):
+    """Get all sales with automatic pagination, 304 while If-None-Match holds the ETag of the page"""
+    params = resolve_params().to_raw_params()
+    if if_none_match is not None:
+        total, versions = await sale_service.get_sales_versions(db, limit=params.limit, offset=params.offset)
+        etag = page_etag(total, params, versions)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    page = await sale_service.get_sales(db)
+    response.headers["ETag"] = page_etag(page.total, params, [sale.versions for sale in page.items])
+    return page
+
+
+@router.delete("/{sale_id}", response_model=bool)
+async def delete_sale(
+    sale_id: int,
+    db: AsyncDatabase,
+    sale_service: AsyncSaleService,
+):
+    """Delete sale by ID using dependency injection"""
+    try:
+        return await sale_service.delete_sale(db, sale_id=sale_id)
+    except sale_exceptions.SaleNotFoundError as e:
+        raise HTTPException(status_code=404, detail=SALES_DOES_NOT_EXIST_ERROR)
+
+
+@router.get("/search/by-car/", response_model=List[schemas.Sale])
+async def search_sales_by_car(
+    db: AsyncDatabase,
+    sale_service: AsyncSaleService,
+    car_id: int = Query(..., description="Search sales by car ID"),
+):
+    """Get sales by car ID"""
+    return await sale_service.get_sales_by_car(db, car_id=car_id)
+
+
+@router.get("/search/by-buyer/", response_model=List[schemas.Sale])
+async def search_sales_by_buyer(
+    db: AsyncDatabase,
+    sale_service: AsyncSaleService,
+    buyer_id: int = Query(..., description="Search sales by buyer ID"),
+):
+    """Get sales by buyer ID"""
+    return await sale_service.get_sales_by_buyer(db, buyer_id=buyer_id)
+
+
+@router.get("/search/by-seller/", response_model=List[schemas.Sale])
+async def search_sales_by_seller(
+    db: AsyncDatabase,
+    sale_service: AsyncSaleService,
+    seller_id: int = Query(..., description="Search sales by seller ID"),
+):
+    """Get sales by seller ID"""
+    return await sale_service.get_sales_by_seller(db, seller_id=seller_id)
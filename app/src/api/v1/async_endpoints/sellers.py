@@ -0,0 +1,91 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi_pagination import Page, resolve_params
+
+from app.src.api.deps import AsyncDatabase, IfNoneMatch, AsyncSellerService
+from app.src.core.etag import NOT_MODIFIED_RESPONSES, entity_etag, etag_matches, not_modified, page_etag
+from app.src.domain.seller import exceptions, schemas
+from app.resources.strings import SELLER_ALREADY_EXISTS_ERROR, SELLER_DOES_NOT_EXIST_ERROR, INVALID_SELLER_ERROR
+
+router = APIRouter()
+
+
+@router.post("/", response_model=schemas.Seller, status_code=201)
+async def create_seller(
+    seller: schemas.SellerCreate,
+    db: AsyncDatabase,
+    seller_service: AsyncSellerService,
+):
+    """Create new seller using dependency injection"""
+    try:
+        return await seller_service.create_seller(db=db, seller=seller)
+    except exceptions.SellerAlreadyExistsError as e:
+        raise HTTPException(status_code=409, detail=SELLER_ALREADY_EXISTS_ERROR)
+    except exceptions.InvalidSellerError as e:
+        raise HTTPException(status_code=400, detail=INVALID_SELLER_ERROR)
+
+
+@router.get("/{seller_id}", response_model=schemas.Seller, responses=NOT_MODIFIED_RESPONSES)
+async def read_seller(
+    seller_id: int,
+    response: Response,
+    db: AsyncDatabase,
+    seller_service: AsyncSellerService,
+    if_none_match: IfNoneMatch = None,
+):
+    """Get seller by ID using dependency injection, 304 while If-None-Match holds its ETag"""
+    try:
+        if if_none_match is not None:
+            etag = entity_etag(await seller_service.get_seller_versions(db, seller_id=seller_id))
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        db_seller = schemas.Seller.model_validate(await seller_service.get_seller(db, seller_id=seller_id))
+    except exceptions.SellerNotFoundError as e:
+        raise HTTPException(status_code=404, detail=SELLER_DOES_NOT_EXIST_ERROR)
+    response.headers["ETag"] = entity_etag(db_seller.versions)
+    return db_seller
+
+
+@router.get("/", response_model=Page[schemas.Seller], responses=NOT_MODIFIED_RESPONSES)
+async def read_sellers(
+    response: Response,
+    db: AsyncDatabase,
+    seller_service: AsyncSellerService,
+    if_none_match: IfNoneMatch = None,
+):
+    """Get all sellers with automatic pagination, 304 while If-None-Match holds the ETag of the page"""
+    params = resolve_params().to_raw_params()
+    if if_none_match is not None:
+        total, versions = await seller_service.get_sellers_versions(db, limit=params.limit, offset=params.offset)
+        etag = page_etag(total, params, versions)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    page = await seller_service.get_sellers(db)
+    response.headers["ETag"] = page_etag(page.total, params, [seller.versions for seller in page.items])
+    return page
+
+
+@router.delete("/{seller_id}", response_model=bool)
+async def delete_seller(
+    seller_id: int,
+    db: AsyncDatabase,
+    seller_service: AsyncSellerService,
+):
+    """Delete seller by ID using dependency injection"""
+    try:
+        return await seller_service.delete_seller(db, seller_id=seller_id)
+    except exceptions.SellerNotFoundError as e:
+        raise HTTPException(status_code=404, detail=SELLER_DOES_NOT_EXIST_ERROR)
+
+
+@router.get("/search/", response_model=List[schemas.Seller])
+async def search_sellers(
+    db: AsyncDatabase,
+    seller_service: AsyncSellerService,
+    name: str = Query(..., description="Search sellers by name"),
+    skip: int = Query(default=0, ge=0, description="Sellers to skip"),
+    limit: int = Query(default=100, ge=1, le=100, description="Maximum number of sellers"),
+):
+    """Search sellers by name, best matches first"""
+    return await seller_service.search_sellers_by_name(db, name=name, skip=skip, limit=limit)
@@ -0,0 +1,101 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi_pagination import Page, resolve_params
+
+from app.src.api.deps import AsyncDatabase, IfNoneMatch, AsyncStockService
+from app.src.core.etag import NOT_MODIFIED_RESPONSES, entity_etag, etag_matches, not_modified, page_etag
+from app.src.domain.car import exceptions as car_exceptions
+from app.src.domain.stock import exceptions, schemas
+from app.resources.strings import CAR_DOES_NOT_EXIST_ERROR, STOCK_ALREADY_EXISTS_ERROR, STOCK_DOES_NOT_EXIST_ERROR, INVALID_STOCK_ERROR
+
+router = APIRouter()
+
+
+@router.post("/", response_model=schemas.Stock, status_code=201)
+async def create_stock(
+    stock: schemas.StockCreate,
+    db: AsyncDatabase,
+    stock_service: AsyncStockService,
+):
+    """Create new stock using dependency injection"""
+    try:
+        return await stock_service.create_stock(db=db, stock=stock)
+    except car_exceptions.CarNotFoundError as e:
+        raise HTTPException(status_code=404, detail=CAR_DOES_NOT_EXIST_ERROR)
+    except exceptions.StockAlreadyExistsError as e:
+        raise HTTPException(status_code=409, detail=STOCK_ALREADY_EXISTS_ERROR)
+    except exceptions.InvalidStockError as e:
+        raise HTTPException(status_code=400, detail=INVALID_STOCK_ERROR)
+
+
+@router.get("/{stock_id}", response_model=schemas.Stock, responses=NOT_MODIFIED_RESPONSES)
+async def read_stock(
+    stock_id: int,
+    response: Response,
+    db: AsyncDatabase,
+    stock_service: AsyncStockService,
+    if_none_match: IfNoneMatch = None,
+):
+    """Get stock by ID using dependency injection, 304 while If-None-Match holds its ETag"""
+    try:
+        if if_none_match is not None:
+            etag = entity_etag(await stock_service.get_stock_versions(db, stock_id=stock_id))
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        db_stock = schemas.Stock.model_validate(await stock_service.get_stock(db, stock_id=stock_id))
+    except exceptions.StockNotFoundError as e:
+        raise HTTPException(status_code=404, detail=STOCK_DOES_NOT_EXIST_ERROR)
+    response.headers["ETag"] = entity_etag(db_stock.versions)
+    return db_stock
+
+
+@router.get("/", response_model=Page[schemas.Stock], responses=NOT_MODIFIED_RESPONSES)
+async def read_stocks(
+    response: Response,
+    db: AsyncDatabase,
+    stock_service: AsyncStockService,
+    if_none_match: IfNoneMatch = None,
+):
+    """Get all stocks with automatic pagination, 304 while If-None-Match holds the ETag of the page"""
+    params = resolve_params().to_raw_params()
+    if if_none_match is not None:
+        total, versions = await stock_service.get_stocks_versions(db, limit=params.limit, offset=params.offset)
+        etag = page_etag(total, params, versions)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    page = await stock_service.get_stocks(db)
+    response.headers["ETag"] = page_etag(page.total, params, [stock.versions for stock in page.items])
+    return page
+
+
+@router.delete("/{stock_id}", response_model=bool)
+async def delete_stock(
+    stock_id: int,
+    db: AsyncDatabase,
+    stock_service: AsyncStockService,
+):
+    """Delete stock by ID using dependency injection"""
+    try:
+        return await stock_service.delete_stock(db, stock_id=stock_id)
+    except exceptions.StockNotFoundError as e:
+        raise HTTPException(status_code=404, detail=STOCK_DOES_NOT_EXIST_ERROR)
+
+
+@router.get("/search/low-stock/", response_model=List[schemas.Stock])
+async def search_low_stock(
+    db: AsyncDatabase,
+    stock_service: AsyncStockService,
+    threshold: int = Query(default=5, description="Available quantity threshold"),
+):
+    """Get stocks with at most threshold units available outside reservations"""
+    return await stock_service.get_low_stock_items(db, threshold=threshold)
+
+
+@router.get("/search/available/", response_model=List[schemas.Stock])
+async def search_available_stock(
+    db: AsyncDatabase,
+    stock_service: AsyncStockService,
+):
+    """Get all stocks with units left outside reservations"""
+    return await stock_service.get_available_stocks(db)
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException
+from fastapi_pagination import Page
+
+from app.src.api.deps import AsyncDatabase, AsyncUserService
+from app.src.core.security import PasswordHasherBusyError
+from app.src.domain.user import exceptions, schemas
+from app.resources.strings import (
+    INVALID_USER_ERROR, PASSWORD_HASHER_BUSY_ERROR, USER_ALREADY_EXISTS_ERROR, USER_DOES_NOT_EXIST_ERROR,
+)
+
+router = APIRouter()
+
+
+@router.post("/", response_model=schemas.User, status_code=201)
+async def create_user(
+    user: schemas.UserCreate,
+    db: AsyncDatabase,
+    user_service: AsyncUserService,
+):
+    """Create new user using dependency injection"""
+    try:
+        return await user_service.create_user(db=db, user=user)
+    except exceptions.UserAlreadyExistsError as e:
+        raise HTTPException(status_code=409, detail=USER_ALREADY_EXISTS_ERROR)
+    except exceptions.InvalidUserError as e:
+        raise HTTPException(status_code=400, detail=INVALID_USER_ERROR)
+    except PasswordHasherBusyError:
+        raise HTTPException(status_code=503, detail=PASSWORD_HASHER_BUSY_ERROR, headers={"Retry-After": "1"})
+
+
+@router.get("/{user_id}", response_model=schemas.User)
+async def read_user(
+    user_id: int,
+    db: AsyncDatabase,
+    user_service: AsyncUserService,
+):
+    """Get user by ID using dependency injection"""
+    try:
+        return await user_service.get_user(db, user_id=user_id)
+    except exceptions.UserNotFoundError as e:
+        raise HTTPException(status_code=404, detail=USER_DOES_NOT_EXIST_ERROR)
+
+
+@router.get("/", response_model=Page[schemas.User])
+async def read_users(
+    db: AsyncDatabase,
+    user_service: AsyncUserService,
+):
+    """Get all users with automatic pagination"""
+    return await user_service.get_users(db)
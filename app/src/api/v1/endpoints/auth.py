@@ -1,23 +1,33 @@
 from datetime import timedelta
-from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 
 from ...deps import Database, UserService
-from ....domain.user import schemas
+from ....domain.user import exceptions, schemas
 from ....core.security import (
-    create_access_token, 
-    verify_password, 
-    get_password_hash,
-    get_current_user
+    PasswordHasherBusyError,
+    create_access_token,
+    get_current_user,
+    password_hasher,
 )
 from ....core.config import settings
-from app.resources.strings import EMAIL_ALREADY_REGISTERED_ERROR
+from app.resources.strings import EMAIL_ALREADY_REGISTERED_ERROR, PASSWORD_HASHER_BUSY_ERROR
 
 router = APIRouter()
 
 
+# bcrypt runs on the password hasher pool and queries on the threadpool,
+# the event loop keeps serving other requests meanwhile
+def hasher_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=PASSWORD_HASHER_BUSY_ERROR,
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/login/", response_model=dict)
 async def login(
     db: Database,
@@ -26,20 +36,33 @@ async def login(
 ):
     """User login endpoint"""
     # Authenticate user
-    user = user_service.get_user_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    try:
+        user = await run_in_threadpool(user_service.get_user_by_email, db, form_data.username)
+    except exceptions.UserNotFoundError:
+        user = None
+    try:
+        verified, new_hash = await password_hasher.verify(
+            form_data.password, user.hashed_password if user else None
+        )
+    except PasswordHasherBusyError:
+        raise hasher_busy_exception()
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
+    # Hashed with another cost than BCRYPT_ROUNDS, store the new hash
+    if new_hash:
+        await run_in_threadpool(user_service.update_password_hash, db, user.id, new_hash)
+
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
     )
-    
+
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -54,24 +77,25 @@ async def register(
     user: schemas.UserCreate,
 ):
     """User registration endpoint"""
-    # Check if user already exists
-    db_user = user_service.get_user_by_email(db, email=user.email)
-    if db_user:
+    # Hash password and create user, failing if the email is already registered
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except PasswordHasherBusyError:
+        raise hasher_busy_exception()
+    try:
+        db_user = await run_in_threadpool(user_service.create_user, db, user, hashed_password)
+    except exceptions.UserAlreadyExistsError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=EMAIL_ALREADY_REGISTERED_ERROR
         )
-    
-    # Hash password and create user
-    user.hashed_password = get_password_hash(user.hashed_password)
-    db_user = user_service.create_user(db=db, user=user)
-    
+
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": db_user.email}, expires_delta=access_token_expires
     )
-    
+
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -1,12 +1,17 @@
-from typing import List
+from typing import Annotated, List
 from fastapi_pagination import Page
 from fastapi_pagination.ext.sqlalchemy import paginate
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi_pagination import Page
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from fastapi_pagination import Page, resolve_params
 from fastapi_pagination.ext.sqlalchemy import paginate
 
-from app.src.api.deps import Database, BuyerService
+from app.src.api.deps import Database, IfNoneMatch, ReadDatabase, BuyerService
+from app.src.core.bulk import BulkBody, BulkResult, BulkRows, bulk_openapi
+from app.src.core.etag import NOT_MODIFIED_RESPONSES, entity_etag, etag_matches, not_modified, page_etag
+from app.src.core.export import EXPORT_RESPONSES, ExportFormat, export_response
+from app.src.core.pagination import CursorPage, CursorParams
 from app.src.domain.buyer import exceptions, schemas
 from app.resources.strings import BUYER_ALREADY_EXISTS_ERROR, BUYER_DOES_NOT_EXIST_ERROR, INVALID_BUYER_ERROR
 
@@ -29,27 +34,85 @@ def create_buyer(
         raise HTTPException(status_code=400, detail=INVALID_BUYER_ERROR)
 
 
-@router.get("/{buyer_id}", response_model=schemas.Buyer)
+@router.post(
+    "/bulk",
+    response_model=BulkResult[schemas.Buyer],
+    status_code=201,
+    responses={207: {"description": "Some rows were rejected, see errors"}},
+    openapi_extra=bulk_openapi(schemas.BuyerCreate),
+)
+def create_buyers(
+    buyers: Annotated[BulkRows[schemas.BuyerCreate], Depends(BulkBody(schemas.BuyerCreate))],
+    response: Response,
+    db: Database,
+    buyer_service: BuyerService,
+):
+    """Create buyers in bulk from a JSON array or NDJSON, errors are reported per row"""
+    result = buyer_service.create_buyers(db=db, buyers=buyers)
+    if result.errors:
+        response.status_code = 207
+    return result
+
+
+@router.get("/export", response_class=StreamingResponse, responses=EXPORT_RESPONSES)
+def export_buyers(
+    db: ReadDatabase,
+    buyer_service: BuyerService,
+    export_format: ExportFormat = Query(default=ExportFormat.ndjson, alias="format", description="Export format"),
+):
+    """Stream all buyers as NDJSON or CSV through a server-side cursor"""
+    rows = buyer_service.export_buyers(db, export_format=export_format)
+    return export_response(rows, export_format, "buyers")
+
+
+@router.get("/cursor", response_model=CursorPage[schemas.Buyer])
+def read_buyers_page(
+    db: ReadDatabase,
+    buyer_service: BuyerService,
+    params: Annotated[CursorParams, Depends()],
+):
+    """Get buyers with keyset pagination, pass next_cursor back to get the next page"""
+    return buyer_service.get_buyers_page(db, params)
+
+
+@router.get("/{buyer_id}", response_model=schemas.Buyer, responses=NOT_MODIFIED_RESPONSES)
 def read_buyer(
     buyer_id: int,
-    db: Database,
+    response: Response,
+    db: ReadDatabase,
     buyer_service: BuyerService,
+    if_none_match: IfNoneMatch = None,
 ):
-    """Get buyer by ID using dependency injection"""
+    """Get buyer by ID using dependency injection, 304 while If-None-Match holds its ETag"""
     try:
+        if if_none_match is not None:
+            etag = entity_etag(buyer_service.get_buyer_versions(db, buyer_id=buyer_id))
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
         db_buyer = buyer_service.get_buyer(db, buyer_id=buyer_id)
-        return db_buyer
     except exceptions.BuyerNotFoundError as e:
         raise HTTPException(status_code=404, detail=BUYER_DOES_NOT_EXIST_ERROR)
+    response.headers["ETag"] = entity_etag(db_buyer.versions)
+    return db_buyer
 
 
-@router.get("/", response_model=Page[schemas.Buyer])
+@router.get("/", response_model=Page[schemas.Buyer], responses=NOT_MODIFIED_RESPONSES)
 def read_buyers(
-    db: Database,
+    response: Response,
+    db: ReadDatabase,
     buyer_service: BuyerService,
+    if_none_match: IfNoneMatch = None,
 ):
-    """Get all buyers with automatic pagination"""
-    return buyer_service.get_buyers(db)
+    """Get all buyers with automatic pagination, 304 while If-None-Match holds the ETag of the page"""
+    params = resolve_params().to_raw_params()
+    if if_none_match is not None:
+        total, versions = buyer_service.get_buyers_versions(db, limit=params.limit, offset=params.offset)
+        etag = page_etag(total, params, versions)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    page = buyer_service.get_buyers(db)
+    response.headers["ETag"] = page_etag(page.total, params, [buyer.versions for buyer in page.items])
+    return page
 
 
 @router.delete("/{buyer_id}", response_model=bool)
@@ -67,9 +130,11 @@ def delete_buyer(
 
 @router.get("/search/", response_model=List[schemas.Buyer])
 def search_buyers(
-    db: Database,
+    db: ReadDatabase,
     buyer_service: BuyerService,
     name: str = Query(..., description="Search buyers by name"),
+    skip: int = Query(default=0, ge=0, description="Buyers to skip"),
+    limit: int = Query(default=100, ge=1, le=100, description="Maximum number of buyers"),
 ):
-    """Search buyers by name"""
-    return buyer_service.search_buyers_by_name(db, name=name)
+    """Search buyers by name, best matches first"""
+    return buyer_service.search_buyers_by_name(db, name=name, skip=skip, limit=limit)
@@ -1,12 +1,17 @@
-from typing import List
+from typing import Annotated, List
 from fastapi_pagination import Page
 from fastapi_pagination.ext.sqlalchemy import paginate
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi_pagination import Page
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from fastapi_pagination import Page, resolve_params
 from fastapi_pagination.ext.sqlalchemy import paginate
 
-from app.src.api.deps import Database, CarService
+from app.src.api.deps import Database, IfNoneMatch, ReadDatabase, CarService
+from app.src.core.bulk import BulkBody, BulkResult, BulkRows, bulk_openapi
+from app.src.core.etag import NOT_MODIFIED_RESPONSES, entity_etag, etag_matches, not_modified, page_etag
+from app.src.core.export import EXPORT_RESPONSES, ExportFormat, export_response
+from app.src.core.pagination import CursorPage, CursorParams
 from app.src.domain.car import exceptions, schemas
 from app.resources.strings import CAR_ALREADY_EXISTS_ERROR, CAR_DOES_NOT_EXIST_ERROR
 
@@ -26,26 +31,85 @@ def create_car(
         raise HTTPException(status_code=409, detail=CAR_ALREADY_EXISTS_ERROR)
 
 
-@router.get("/{car_id}", response_model=schemas.Car)
+@router.post(
+    "/bulk",
+    response_model=BulkResult[schemas.Car],
+    status_code=201,
+    responses={207: {"description": "Some rows were rejected, see errors"}},
+    openapi_extra=bulk_openapi(schemas.CarCreate),
+)
+def create_cars(
+    cars: Annotated[BulkRows[schemas.CarCreate], Depends(BulkBody(schemas.CarCreate))],
+    response: Response,
+    db: Database,
+    car_service: CarService,
+):
+    """Create cars in bulk from a JSON array or NDJSON, errors are reported per row"""
+    result = car_service.create_cars(db=db, cars=cars)
+    if result.errors:
+        response.status_code = 207
+    return result
+
+
+@router.get("/export", response_class=StreamingResponse, responses=EXPORT_RESPONSES)
+def export_cars(
+    db: ReadDatabase,
+    car_service: CarService,
+    export_format: ExportFormat = Query(default=ExportFormat.ndjson, alias="format", description="Export format"),
+):
+    """Stream all cars as NDJSON or CSV through a server-side cursor"""
+    rows = car_service.export_cars(db, export_format=export_format)
+    return export_response(rows, export_format, "cars")
+
+
+@router.get("/cursor", response_model=CursorPage[schemas.Car])
+def read_cars_page(
+    db: ReadDatabase,
+    car_service: CarService,
+    params: Annotated[CursorParams, Depends()],
+):
+    """Get cars with keyset pagination, pass next_cursor back to get the next page"""
+    return car_service.get_cars_page(db, params)
+
+
+@router.get("/{car_id}", response_model=schemas.Car, responses=NOT_MODIFIED_RESPONSES)
 def read_car(
     car_id: int,
-    db: Database,
+    response: Response,
+    db: ReadDatabase,
     car_service: CarService,
+    if_none_match: IfNoneMatch = None,
 ):
-    """Get car by ID using dependency injection"""
+    """Get car by ID using dependency injection, 304 while If-None-Match holds its ETag"""
     try:
-        return car_service.get_car(db, car_id=car_id)
+        if if_none_match is not None:
+            etag = entity_etag(car_service.get_car_versions(db, car_id=car_id))
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        db_car = car_service.get_car(db, car_id=car_id)
     except exceptions.CarNotFoundError as e:
         raise HTTPException(status_code=404, detail=CAR_DOES_NOT_EXIST_ERROR)
+    response.headers["ETag"] = entity_etag(db_car.versions)
+    return db_car
 
 
-@router.get("/", response_model=Page[schemas.Car])
+@router.get("/", response_model=Page[schemas.Car], responses=NOT_MODIFIED_RESPONSES)
 def read_cars(
-    db: Database,
+    response: Response,
+    db: ReadDatabase,
     car_service: CarService,
+    if_none_match: IfNoneMatch = None,
 ):
-    """Get all cars with automatic pagination"""
-    return car_service.get_cars(db)
+    """Get all cars with automatic pagination, 304 while If-None-Match holds the ETag of the page"""
+    params = resolve_params().to_raw_params()
+    if if_none_match is not None:
+        total, versions = car_service.get_cars_versions(db, limit=params.limit, offset=params.offset)
+        etag = page_etag(total, params, versions)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    page = car_service.get_cars(db)
+    response.headers["ETag"] = page_etag(page.total, params, [car.versions for car in page.items])
+    return page
 
 
 @router.delete("/{car_id}", response_model=bool)
@@ -63,9 +127,14 @@ def delete_car(
 
 @router.get("/search/", response_model=List[schemas.Car])
 def search_cars(
-    db: Database,
+    db: ReadDatabase,
     car_service: CarService,
-    brand: str = Query(..., description="Search cars by brand"),
+    brand: str = Query(..., description="Search cars by brand, ignoring case"),
+    prefix: bool = Query(default=False, description="Match brands starting with the given one"),
+    skip: int = Query(default=0, ge=0, description="Cars to skip"),
+    limit: int = Query(default=100, ge=1, le=100, description="Maximum number of cars"),
 ):
     """Search cars by brand"""
-    return car_service.search_cars_by_brand(db, brand=brand)
+    return car_service.search_cars_by_brand(
+        db, brand=brand, prefix=prefix, skip=skip, limit=limit
+    )
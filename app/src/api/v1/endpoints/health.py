@@ -1,75 +1,32 @@
 from datetime import datetime
 from typing import Dict, Any
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi import APIRouter, Response, status
 
-from ...deps import Database
+from ....core.cache import entity_cache
 from ....core.config import settings
+from ....core.pool import pool_metrics
+from app.src.api.deps import HealthMonitor
 
 router = APIRouter()
 
 
 @router.get("/health")
-async def health_check(db: Database) -> Dict[str, Any]:
+async def health_check(health_monitor: HealthMonitor) -> Dict[str, Any]:
     """
     Complete health check endpoint
-    Returns service status, database connectivity, and pool information
+    Returns service status, database connectivity, pool and replica
+    information from the last health monitor snapshot
     """
-    health_status = {
-        "status": "healthy",
+    snapshot = await health_monitor.current()
+    return {
+        "status": "healthy" if snapshot["healthy"] else "unhealthy",
         "timestamp": datetime.utcnow().isoformat() + "Z",
+        "checked_at": datetime.utcfromtimestamp(snapshot["checked_at"]).isoformat() + "Z",
         "version": settings.VERSION,
         "service": settings.SERVICE_NAME,
-        "checks": {}
+        "checks": snapshot["checks"]
     }
-    
-    # Database connectivity check
-    try:
-        # Test database connection
-        result = db.execute(text("SELECT 1"))
-        if result.fetchone():
-            health_status["checks"]["database"] = {
-                "status": "healthy",
-                "message": "Database connection successful"
-            }
-        else:
-            health_status["checks"]["database"] = {
-                "status": "unhealthy",
-                "message": "Database connection failed"
-            }
-            health_status["status"] = "unhealthy"
-    except Exception as e:
-        health_status["checks"]["database"] = {
-            "status": "unhealthy",
-            "message": f"Database error: {str(e)}"
-        }
-        health_status["status"] = "unhealthy"
-    
-    # Database pool check
-    try:
-        pool = db.get_bind().pool
-        if pool:
-            health_status["checks"]["database_pool"] = {
-                "status": "healthy",
-                "pool_size": pool.size(),
-                "checked_in": pool.checkedin(),
-                "checked_out": pool.checkedout(),
-                "overflow": pool.overflow()
-            }
-        else:
-            health_status["checks"]["database_pool"] = {
-                "status": "unknown",
-                "message": "Pool information not available"
-            }
-    except Exception as e:
-        health_status["checks"]["database_pool"] = {
-            "status": "unknown",
-            "message": f"Pool check error: {str(e)}"
-        }
-    
-    return health_status
 
 
 @router.get("/health/live")
@@ -85,47 +42,52 @@ async def liveness_probe() -> Dict[str, Any]:
 
 
 @router.get("/health/ready")
-async def readiness_probe(db: Database) -> Dict[str, Any]:
+async def readiness_probe(response: Response, health_monitor: HealthMonitor) -> Dict[str, Any]:
     """
     Kubernetes readiness probe
-    Checks if service is ready to accept traffic
+    Checks if service is ready to accept traffic: database reachable within
+    the latency threshold, pool not exhausted and a fresh snapshot; answers
+    503 otherwise so the pod leaves the service endpoints
     """
-    try:
-        # Test database connection
-        result = db.execute(text("SELECT 1"))
-        if result.fetchone():
-            return {
-                "status": "ready",
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "checks": {
-                    "database": {
-                        "status": "healthy",
-                        "message": "Database connection successful"
-                    }
-                }
-            }
-        else:
-            return {
-                "status": "not_ready",
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "checks": {
-                    "database": {
-                        "status": "unhealthy",
-                        "message": "Database connection failed"
-                    }
-                }
-            }
-    except Exception as e:
-        return {
-            "status": "not_ready",
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "checks": {
-                "database": {
-                    "status": "unhealthy",
-                    "message": f"Database error: {str(e)}"
-                }
-            }
-        }
+    snapshot = await health_monitor.current()
+    stale = health_monitor.is_stale(snapshot)
+    ready = snapshot["ready"] and not stale
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    checks = {name: snapshot["checks"][name] for name in ("database", "database_pool")}
+    if stale:
+        checks["monitor"] = {"status": "stale", "message": "No health check completed recently"}
+    return {
+        "status": "ready" if ready else "not_ready",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "checked_at": datetime.utcfromtimestamp(snapshot["checked_at"]).isoformat() + "Z",
+        "checks": checks
+    }
+
+
+@router.get("/pool")
+async def pool_report() -> Dict[str, Any]:
+    """
+    Connection pool metrics
+    Cumulative checkout wait, checkout duration and overflow usage per pool
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "pools": {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+    }
+
+
+@router.get("/cache")
+async def cache_report() -> Dict[str, Any]:
+    """
+    Entity cache metrics
+    Hits, misses, stored entries and evictions per entity
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "backend": settings.CACHE_BACKEND,
+        **entity_cache.metrics.snapshot(),
+    }
 
 
 @router.get("/info")
@@ -168,6 +130,7 @@ async def api_root() -> Dict[str, Any]:
         "description": "FastAPI Car Shop ERP API",
         "endpoints": {
             "health": "/api/v1/system/health",
+            "pool": "/api/v1/system/pool",
             "info": "/api/v1/system/info",
             "auth": "/api/v1/auth/",
             "buyers": "/api/v1/buyers/",
@@ -0,0 +1,46 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Query
+
+from app.src.api.deps import ReadDatabase, ReportService
+from app.src.domain.report import schemas
+
+router = APIRouter()
+
+
+@router.get("/sales/by-day", response_model=List[schemas.SalesByDay])
+def read_sales_by_day(
+    db: ReadDatabase,
+    report_service: ReportService,
+    start: Optional[date] = Query(default=None, description="First day included"),
+    end: Optional[date] = Query(default=None, description="Last day included"),
+    seller_id: Optional[int] = Query(default=None, description="Only sales of this seller"),
+    brand: Optional[str] = Query(default=None, description="Only sales of cars of this brand"),
+):
+    """Number of sales per day, read from the sales rollups"""
+    return report_service.get_sales_by_day(db, start=start, end=end, seller_id=seller_id, brand=brand)
+
+
+@router.get("/sales/by-seller", response_model=List[schemas.SalesBySeller])
+def read_sales_by_seller(
+    db: ReadDatabase,
+    report_service: ReportService,
+    start: Optional[date] = Query(default=None, description="First day included"),
+    end: Optional[date] = Query(default=None, description="Last day included"),
+    brand: Optional[str] = Query(default=None, description="Only sales of cars of this brand"),
+):
+    """Number of sales per seller, read from the sales rollups"""
+    return report_service.get_sales_by_seller(db, start=start, end=end, brand=brand)
+
+
+@router.get("/sales/by-brand", response_model=List[schemas.SalesByBrand])
+def read_sales_by_brand(
+    db: ReadDatabase,
+    report_service: ReportService,
+    start: Optional[date] = Query(default=None, description="First day included"),
+    end: Optional[date] = Query(default=None, description="Last day included"),
+    seller_id: Optional[int] = Query(default=None, description="Only sales of this seller"),
+):
+    """Number of sales per car brand, read from the sales rollups"""
+    return report_service.get_sales_by_brand(db, start=start, end=end, seller_id=seller_id)
@@ -0,0 +1,88 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException
+
+from app.src.api.deps import Database, ReadDatabase, ReservationService
+from app.src.domain.reservation import exceptions, schemas
+from app.src.domain.car import exceptions as car_exceptions
+from app.src.domain.buyer import exceptions as buyer_exceptions
+from app.src.domain.seller import exceptions as seller_exceptions
+from app.src.domain.stock import exceptions as stock_exceptions
+from app.src.domain.sale import schemas as sale_schemas
+from app.resources.strings import (
+    BUYER_DOES_NOT_EXIST_ERROR,
+    CAR_DOES_NOT_EXIST_ERROR,
+    RESERVATION_DOES_NOT_EXIST_ERROR,
+    RESERVATION_NOT_ACTIVE_ERROR,
+    SELLER_DOES_NOT_EXIST_ERROR,
+    STOCK_DOES_NOT_EXIST_ERROR,
+    STOCK_OUT_OF_STOCK_ERROR,
+)
+
+router = APIRouter()
+
+
+@router.post("/", response_model=schemas.Reservation, status_code=201)
+def create_reservation(
+    reservation: schemas.ReservationCreate,
+    db: Database,
+    reservation_service: ReservationService,
+):
+    """Hold units of a car for a buyer, released when the reservation expires"""
+    try:
+        return reservation_service.create_reservation(db, reservation=reservation)
+    except car_exceptions.CarNotFoundError:
+        raise HTTPException(status_code=404, detail=CAR_DOES_NOT_EXIST_ERROR)
+    except buyer_exceptions.BuyerNotFoundError:
+        raise HTTPException(status_code=404, detail=BUYER_DOES_NOT_EXIST_ERROR)
+    except seller_exceptions.SellerNotFoundError:
+        raise HTTPException(status_code=404, detail=SELLER_DOES_NOT_EXIST_ERROR)
+    except stock_exceptions.StockNotFoundError:
+        raise HTTPException(status_code=404, detail=STOCK_DOES_NOT_EXIST_ERROR)
+    except stock_exceptions.InsufficientStockError:
+        raise HTTPException(status_code=422, detail=STOCK_OUT_OF_STOCK_ERROR)
+
+
+@router.get("/{reservation_id}", response_model=schemas.Reservation)
+def read_reservation(
+    reservation_id: int,
+    db: ReadDatabase,
+    reservation_service: ReservationService,
+):
+    """Get reservation by ID"""
+    try:
+        return reservation_service.get_reservation(db, reservation_id=reservation_id)
+    except exceptions.ReservationNotFoundError:
+        raise HTTPException(status_code=404, detail=RESERVATION_DOES_NOT_EXIST_ERROR)
+
+
+@router.post("/{reservation_id}/confirm", response_model=List[sale_schemas.Sale], status_code=201)
+def confirm_reservation(
+    reservation_id: int,
+    db: Database,
+    reservation_service: ReservationService,
+):
+    """Turn an active reservation into one sale per held unit"""
+    try:
+        return reservation_service.confirm_reservation(db, reservation_id=reservation_id)
+    except exceptions.ReservationNotFoundError:
+        raise HTTPException(status_code=404, detail=RESERVATION_DOES_NOT_EXIST_ERROR)
+    except exceptions.ReservationNotActiveError:
+        raise HTTPException(status_code=409, detail=RESERVATION_NOT_ACTIVE_ERROR)
+    except stock_exceptions.InsufficientStockError:
+        raise HTTPException(status_code=422, detail=STOCK_OUT_OF_STOCK_ERROR)
+
+
+@router.delete("/{reservation_id}", response_model=schemas.Reservation)
+def cancel_reservation(
+    reservation_id: int,
+    db: Database,
+    reservation_service: ReservationService,
+):
+    """Cancel an active reservation, its units go back to stock"""
+    try:
+        return reservation_service.cancel_reservation(db, reservation_id=reservation_id)
+    except exceptions.ReservationNotFoundError:
+        raise HTTPException(status_code=404, detail=RESERVATION_DOES_NOT_EXIST_ERROR)
+    except exceptions.ReservationNotActiveError:
+        raise HTTPException(status_code=409, detail=RESERVATION_NOT_ACTIVE_ERROR)
@@ -1,12 +1,19 @@
-from typing import List
+from datetime import datetime
+from typing import Annotated, List, Optional
 from fastapi_pagination import Page
 from fastapi_pagination.ext.sqlalchemy import paginate
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi_pagination import Page
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from fastapi_pagination import Page, resolve_params
 from fastapi_pagination.ext.sqlalchemy import paginate
 
-from app.src.api.deps import Database, SaleService, StockService
+from app.src.api.deps import Database, IfNoneMatch, ReadDatabase, SaleService, StockService
+from app.src.core.bulk import BulkBody, BulkResult, BulkRows, bulk_openapi
+from app.src.core.etag import NOT_MODIFIED_RESPONSES, entity_etag, etag_matches, not_modified, page_etag
+from app.src.core.export import EXPORT_RESPONSES, ExportFormat, export_response
+from app.src.core.pagination import CursorPage, CursorParams
+from app.src.core.unit_of_work import unit_of_work
 from app.src.domain.sale import exceptions as sale_exceptions
 from app.src.domain.car import exceptions as car_exceptions
 from app.src.domain.buyer import exceptions as buyer_exceptions
@@ -27,9 +34,10 @@ def create_sale(
 ):
     """Create new sale using dependency injection"""
     try:
-        # Reduce stock quantity
-        stock_service.buy_car_from_stock(db, car_id=sale.car_id, quantity=1)
-        db_sale = sale_service.create_sale(db=db, sale=sale)
+        # Reduce stock quantity and register the sale in one transaction
+        with unit_of_work(db):
+            stock_service.buy_car_from_stock(db, car_id=sale.car_id, quantity=1)
+            db_sale = sale_service.create_sale(db=db, sale=sale)
         return db_sale
     except car_exceptions.CarNotFoundError as e:
         raise HTTPException(status_code=404, detail="car does not exist")
@@ -47,27 +55,90 @@ def create_sale(
         raise HTTPException(status_code=400, detail=INVALID_SALE_ERROR)
 
 
-@router.get("/{sale_id}", response_model=schemas.Sale)
+@router.post(
+    "/batch",
+    response_model=BulkResult[schemas.Sale],
+    status_code=201,
+    responses={207: {"description": "Some sales were rejected, see errors"}},
+    openapi_extra=bulk_openapi(schemas.SaleCreate),
+)
+def create_sales(
+    sales: Annotated[BulkRows[schemas.SaleCreate], Depends(BulkBody(schemas.SaleCreate))],
+    response: Response,
+    db: Database,
+    sale_service: SaleService,
+):
+    """
+    Create sales in bulk from a JSON array or NDJSON, each taking one unit of its car from stock.
+    Created sales follow the request order, out of stock and missing rows are reported per row.
+    """
+    result = sale_service.create_sales(db=db, sales=sales)
+    if result.errors:
+        response.status_code = 207
+    return result
+
+
+@router.get("/export", response_class=StreamingResponse, responses=EXPORT_RESPONSES)
+def export_sales(
+    db: ReadDatabase,
+    sale_service: SaleService,
+    export_format: ExportFormat = Query(default=ExportFormat.ndjson, alias="format", description="Export format"),
+    created_after: Optional[datetime] = Query(default=None, description="Only sales created after this date"),
+):
+    """Stream sales as NDJSON or CSV through a server-side cursor"""
+    rows = sale_service.export_sales(db, export_format=export_format, created_after=created_after)
+    return export_response(rows, export_format, "sales")
+
+
+@router.get("/cursor", response_model=CursorPage[schemas.Sale])
+def read_sales_page(
+    db: ReadDatabase,
+    sale_service: SaleService,
+    params: Annotated[CursorParams, Depends()],
+    order_by: schemas.SaleOrder = Query(default=schemas.SaleOrder.id, description="Sort key"),
+):
+    """Get sales with keyset pagination, pass next_cursor back to get the next page"""
+    return sale_service.get_sales_page(db, params, order_by=order_by)
+
+
+@router.get("/{sale_id}", response_model=schemas.Sale, responses=NOT_MODIFIED_RESPONSES)
 def read_sale(
     sale_id: int,
-    db: Database,
+    response: Response,
+    db: ReadDatabase,
     sale_service: SaleService,
+    if_none_match: IfNoneMatch = None,
 ):
-    """Get sale by ID using dependency injection"""
+    """Get sale by ID using dependency injection, 304 while If-None-Match holds its ETag"""
     try:
+        if if_none_match is not None:
+            etag = entity_etag(sale_service.get_sale_versions(db, sale_id=sale_id))
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
         db_sale = sale_service.get_sale(db, sale_id=sale_id)
-        return db_sale
     except sale_exceptions.SaleNotFoundError as e:
         raise HTTPException(status_code=404, detail=SALES_DOES_NOT_EXIST_ERROR)
+    response.headers["ETag"] = entity_etag(db_sale.versions)
+    return db_sale
 
 
-@router.get("/", response_model=Page[schemas.Sale])
+@router.get("/", response_model=Page[schemas.Sale], responses=NOT_MODIFIED_RESPONSES)
 def read_sales(
-    db: Database,
+    response: Response,
+    db: ReadDatabase,
     sale_service: SaleService,
+    if_none_match: IfNoneMatch = None,
 ):
-    """Get all sales with automatic pagination"""
-    return sale_service.get_sales(db)
+    """Get all sales with automatic pagination, 304 while If-None-Match holds the ETag of the page"""
+    params = resolve_params().to_raw_params()
+    if if_none_match is not None:
+        total, versions = sale_service.get_sales_versions(db, limit=params.limit, offset=params.offset)
+        etag = page_etag(total, params, versions)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    page = sale_service.get_sales(db)
+    response.headers["ETag"] = page_etag(page.total, params, [sale.versions for sale in page.items])
+    return page
 
 
 @router.delete("/{sale_id}", response_model=bool)
@@ -85,7 +156,7 @@ def delete_sale(
 
 @router.get("/search/by-car/", response_model=List[schemas.Sale])
 def search_sales_by_car(
-    db: Database,
+    db: ReadDatabase,
     sale_service: SaleService,
     car_id: int = Query(..., description="Search sales by car ID"),
 ):
@@ -95,7 +166,7 @@ def search_sales_by_car(
 
 @router.get("/search/by-buyer/", response_model=List[schemas.Sale])
 def search_sales_by_buyer(
-    db: Database,
+    db: ReadDatabase,
     sale_service: SaleService,
     buyer_id: int = Query(..., description="Search sales by buyer ID"),
 ):
@@ -105,7 +176,7 @@ def search_sales_by_buyer(
 
 @router.get("/search/by-seller/", response_model=List[schemas.Sale])
 def search_sales_by_seller(
-    db: Database,
+    db: ReadDatabase,
     sale_service: SaleService,
     seller_id: int = Query(..., description="Search sales by seller ID"),
 ):
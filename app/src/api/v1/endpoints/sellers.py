@@ -1,12 +1,17 @@
-from typing import List
+from typing import Annotated, List
 from fastapi_pagination import Page
 from fastapi_pagination.ext.sqlalchemy import paginate
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi_pagination import Page
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi_pagination import Page, resolve_params
 from fastapi_pagination.ext.sqlalchemy import paginate
 
-from app.src.api.deps import Database, SellerService
+from app.src.api.deps import Database, IfNoneMatch, ReadDatabase, ReportService, SellerService
+from app.src.core.config import settings
+from app.src.core.bulk import BulkBody, BulkResult, BulkRows, bulk_openapi
+from app.src.core.etag import NOT_MODIFIED_RESPONSES, entity_etag, etag_matches, not_modified, page_etag
+from app.src.core.pagination import CursorPage, CursorParams
+from app.src.domain.report import schemas as report_schemas
 from app.src.domain.seller import exceptions, schemas
 from app.resources.strings import SELLER_ALREADY_EXISTS_ERROR, SELLER_DOES_NOT_EXIST_ERROR, INVALID_SELLER_ERROR
 
@@ -29,27 +34,84 @@ def create_seller(
         raise HTTPException(status_code=400, detail=INVALID_SELLER_ERROR)
 
 
-@router.get("/{seller_id}", response_model=schemas.Seller)
+@router.post(
+    "/bulk",
+    response_model=BulkResult[schemas.Seller],
+    status_code=201,
+    responses={207: {"description": "Some rows were rejected, see errors"}},
+    openapi_extra=bulk_openapi(schemas.SellerCreate),
+)
+def create_sellers(
+    sellers: Annotated[BulkRows[schemas.SellerCreate], Depends(BulkBody(schemas.SellerCreate))],
+    response: Response,
+    db: Database,
+    seller_service: SellerService,
+):
+    """Create sellers in bulk from a JSON array or NDJSON, errors are reported per row"""
+    result = seller_service.create_sellers(db=db, sellers=sellers)
+    if result.errors:
+        response.status_code = 207
+    return result
+
+
+@router.get("/leaderboard", response_model=List[report_schemas.SellerRank])
+def read_seller_leaderboard(
+    db: ReadDatabase,
+    report_service: ReportService,
+    limit: int = Query(default=settings.LEADERBOARD_SIZE, ge=1, le=settings.LEADERBOARD_SIZE),
+):
+    """Sellers with the most sales this month, served from memory"""
+    return report_service.get_seller_leaderboard(db, limit=limit)
+
+
+@router.get("/cursor", response_model=CursorPage[schemas.Seller])
+def read_sellers_page(
+    db: ReadDatabase,
+    seller_service: SellerService,
+    params: Annotated[CursorParams, Depends()],
+):
+    """Get sellers with keyset pagination, pass next_cursor back to get the next page"""
+    return seller_service.get_sellers_page(db, params)
+
+
+@router.get("/{seller_id}", response_model=schemas.Seller, responses=NOT_MODIFIED_RESPONSES)
 def read_seller(
     seller_id: int,
-    db: Database,
+    response: Response,
+    db: ReadDatabase,
     seller_service: SellerService,
+    if_none_match: IfNoneMatch = None,
 ):
-    """Get seller by ID using dependency injection"""
+    """Get seller by ID using dependency injection, 304 while If-None-Match holds its ETag"""
     try:
+        if if_none_match is not None:
+            etag = entity_etag(seller_service.get_seller_versions(db, seller_id=seller_id))
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
         db_seller = seller_service.get_seller(db, seller_id=seller_id)
-        return db_seller
     except exceptions.SellerNotFoundError as e:
         raise HTTPException(status_code=404, detail=SELLER_DOES_NOT_EXIST_ERROR)
+    response.headers["ETag"] = entity_etag(db_seller.versions)
+    return db_seller
 
 
-@router.get("/", response_model=Page[schemas.Seller])
+@router.get("/", response_model=Page[schemas.Seller], responses=NOT_MODIFIED_RESPONSES)
 def read_sellers(
-    db: Database,
+    response: Response,
+    db: ReadDatabase,
     seller_service: SellerService,
+    if_none_match: IfNoneMatch = None,
 ):
-    """Get all sellers with automatic pagination"""
-    return seller_service.get_sellers(db)
+    """Get all sellers with automatic pagination, 304 while If-None-Match holds the ETag of the page"""
+    params = resolve_params().to_raw_params()
+    if if_none_match is not None:
+        total, versions = seller_service.get_sellers_versions(db, limit=params.limit, offset=params.offset)
+        etag = page_etag(total, params, versions)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    page = seller_service.get_sellers(db)
+    response.headers["ETag"] = page_etag(page.total, params, [seller.versions for seller in page.items])
+    return page
 
 
 @router.delete("/{seller_id}", response_model=bool)
@@ -67,9 +129,11 @@ def delete_seller(
 
 @router.get("/search/", response_model=List[schemas.Seller])
 def search_sellers(
-    db: Database,
+    db: ReadDatabase,
     seller_service: SellerService,
     name: str = Query(..., description="Search sellers by name"),
+    skip: int = Query(default=0, ge=0, description="Sellers to skip"),
+    limit: int = Query(default=100, ge=1, le=100, description="Maximum number of sellers"),
 ):
-    """Search sellers by name"""
-    return seller_service.search_sellers_by_name(db, name=name)
+    """Search sellers by name, best matches first"""
+    return seller_service.search_sellers_by_name(db, name=name, skip=skip, limit=limit)
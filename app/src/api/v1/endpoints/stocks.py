@@ -1,13 +1,20 @@
-from typing import List
+from typing import Annotated, List, Optional
 from fastapi_pagination import Page
 from fastapi_pagination.ext.sqlalchemy import paginate
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi_pagination import Page
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from fastapi_pagination import Page, resolve_params
 from fastapi_pagination.ext.sqlalchemy import paginate
 
-from app.src.api.deps import Database, StockService
+from app.src.api.deps import Database, IfNoneMatch, ReadDatabase, StockService
+from app.src.core.bulk import BulkBody, BulkResult, BulkRows, bulk_openapi
+from app.src.core.etag import NOT_MODIFIED_RESPONSES, entity_etag, etag_matches, not_modified, page_etag
+from app.src.core.config import settings
+from app.src.core.export import EXPORT_RESPONSES, ExportFormat, export_response
+from app.src.core.pagination import CursorPage, CursorParams
 from app.src.domain.stock import exceptions, schemas
+from app.src.domain.stock.events import stock_events
 from app.resources.strings import STOCK_ALREADY_EXISTS_ERROR, STOCK_DOES_NOT_EXIST_ERROR, INVALID_STOCK_ERROR
 
 router = APIRouter()
@@ -34,27 +41,115 @@ def create_stock(
         raise
 
 
-@router.get("/{stock_id}", response_model=schemas.Stock)
+@router.post(
+    "/bulk",
+    response_model=BulkResult[schemas.Stock],
+    status_code=201,
+    responses={207: {"description": "Some rows were rejected, see errors"}},
+    openapi_extra=bulk_openapi(schemas.StockCreate),
+)
+def create_stocks(
+    stocks: Annotated[BulkRows[schemas.StockCreate], Depends(BulkBody(schemas.StockCreate))],
+    response: Response,
+    db: Database,
+    stock_service: StockService,
+):
+    """Create stocks in bulk from a JSON array or NDJSON, errors are reported per row"""
+    result = stock_service.create_stocks(db=db, stocks=stocks)
+    if result.errors:
+        response.status_code = 207
+    return result
+
+
+@router.get("/export", response_class=StreamingResponse, responses=EXPORT_RESPONSES)
+def export_stocks(
+    db: ReadDatabase,
+    stock_service: StockService,
+    export_format: ExportFormat = Query(default=ExportFormat.ndjson, alias="format", description="Export format"),
+):
+    """Stream all stocks as NDJSON or CSV through a server-side cursor"""
+    rows = stock_service.export_stocks(db, export_format=export_format)
+    return export_response(rows, export_format, "stocks")
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}, "description": "Stock changes as Server-Sent Events"}},
+)
+def stream_stock_events(
+    db: ReadDatabase,
+    stock_service: StockService,
+    car_id: Optional[int] = Query(default=None, description="Only changes of this car"),
+    brand: Optional[str] = Query(default=None, description="Only changes of cars of this brand"),
+    low_stock_threshold: Optional[int] = Query(default=None, description="Only changes at or below this available quantity"),
+    after: Optional[int] = Query(default=None, description="Resume after this event id"),
+    last_event_id: Optional[int] = Header(default=None),
+):
+    """Push stock changes once committed, resumed from Last-Event-ID (or after) on reconnection"""
+    event_filter = stock_service.get_event_filter(
+        db, car_id=car_id, brand=brand, low_stock_threshold=low_stock_threshold
+    )
+    # The stream outlives the request, its connection goes back to the pool now
+    db.close()
+    stream = stock_events.stream(
+        event_filter,
+        after=last_event_id if last_event_id is not None else after,
+        heartbeat=settings.STOCK_EVENTS_HEARTBEAT,
+    )
+    return StreamingResponse(
+        stream, media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/cursor", response_model=CursorPage[schemas.Stock])
+def read_stocks_page(
+    db: ReadDatabase,
+    stock_service: StockService,
+    params: Annotated[CursorParams, Depends()],
+):
+    """Get stocks with keyset pagination, pass next_cursor back to get the next page"""
+    return stock_service.get_stocks_page(db, params)
+
+
+@router.get("/{stock_id}", response_model=schemas.Stock, responses=NOT_MODIFIED_RESPONSES)
 def read_stock(
     stock_id: int,
-    db: Database,
+    response: Response,
+    db: ReadDatabase,
     stock_service: StockService,
+    if_none_match: IfNoneMatch = None,
 ):
-    """Get stock by ID using dependency injection"""
+    """Get stock by ID using dependency injection, 304 while If-None-Match holds its ETag"""
     try:
+        if if_none_match is not None:
+            etag = entity_etag(stock_service.get_stock_versions(db, stock_id=stock_id))
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
         db_stock = stock_service.get_stock(db, stock_id=stock_id)
-        return db_stock
     except exceptions.StockNotFoundError as e:
         raise HTTPException(status_code=404, detail=STOCK_DOES_NOT_EXIST_ERROR)
+    response.headers["ETag"] = entity_etag(db_stock.versions)
+    return db_stock
 
 
-@router.get("/", response_model=Page[schemas.Stock])
+@router.get("/", response_model=Page[schemas.Stock], responses=NOT_MODIFIED_RESPONSES)
 def read_stocks(
-    db: Database,
+    response: Response,
+    db: ReadDatabase,
     stock_service: StockService,
+    if_none_match: IfNoneMatch = None,
 ):
-    """Get all stocks with automatic pagination"""
-    return stock_service.get_stocks(db)
+    """Get all stocks with automatic pagination, 304 while If-None-Match holds the ETag of the page"""
+    params = resolve_params().to_raw_params()
+    if if_none_match is not None:
+        total, versions = stock_service.get_stocks_versions(db, limit=params.limit, offset=params.offset)
+        etag = page_etag(total, params, versions)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    page = stock_service.get_stocks(db)
+    response.headers["ETag"] = page_etag(page.total, params, [stock.versions for stock in page.items])
+    return page
 
 
 @router.delete("/{stock_id}", response_model=bool)
@@ -72,18 +167,18 @@ def delete_stock(
 
 @router.get("/search/low-stock/", response_model=List[schemas.Stock])
 def search_low_stock(
-    db: Database,
+    db: ReadDatabase,
     stock_service: StockService,
-    threshold: int = Query(default=5, description="Stock quantity threshold"),
+    threshold: int = Query(default=5, description="Available quantity threshold"),
 ):
-    """Get stocks with quantity below threshold"""
+    """Get stocks with at most threshold units available outside reservations"""
     return stock_service.get_low_stock_items(db, threshold=threshold)
 
 
 @router.get("/search/available/", response_model=List[schemas.Stock])
 def search_available_stock(
-    db: Database,
+    db: ReadDatabase,
     stock_service: StockService,
 ):
-    """Get all stocks with quantity > 0"""
+    """Get all stocks with units left outside reservations"""
     return stock_service.get_available_stocks(db)
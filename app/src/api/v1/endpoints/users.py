@@ -1,12 +1,16 @@
-from typing import List
+from typing import Annotated, List
 from fastapi_pagination import Page
 from fastapi_pagination.ext.sqlalchemy import paginate
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
-from app.src.api.deps import Database, UserService
+from app.src.api.deps import Database, ReadDatabase, UserService
+from app.src.core.pagination import CursorPage, CursorParams
+from app.src.core.security import PasswordHasherBusyError
 from app.src.domain.user import exceptions, schemas
-from app.resources.strings import USER_ALREADY_EXISTS_ERROR, USER_DOES_NOT_EXIST_ERROR, INVALID_USER_ERROR
+from app.resources.strings import (
+    INVALID_USER_ERROR, PASSWORD_HASHER_BUSY_ERROR, USER_ALREADY_EXISTS_ERROR, USER_DOES_NOT_EXIST_ERROR,
+)
 
 router = APIRouter()
 
@@ -24,12 +28,24 @@ def create_user(
         raise HTTPException(status_code=409, detail=USER_ALREADY_EXISTS_ERROR)
     except exceptions.InvalidUserError as e:
         raise HTTPException(status_code=400, detail=INVALID_USER_ERROR)
+    except PasswordHasherBusyError:
+        raise HTTPException(status_code=503, detail=PASSWORD_HASHER_BUSY_ERROR, headers={"Retry-After": "1"})
+
+
+@router.get("/cursor", response_model=CursorPage[schemas.User])
+def read_users_page(
+    db: ReadDatabase,
+    user_service: UserService,
+    params: Annotated[CursorParams, Depends()],
+):
+    """Get users with keyset pagination, pass next_cursor back to get the next page"""
+    return user_service.get_users_page(db, params)
 
 
 @router.get("/{user_id}", response_model=schemas.User)
 def read_user(
     user_id: int,
-    db: Database,
+    db: ReadDatabase,
     user_service: UserService,
 ):
     """Get user by ID using dependency injection"""
@@ -41,7 +57,7 @@ def read_user(
 
 @router.get("/", response_model=Page[schemas.User])
 def read_users(
-    db: Database,
+    db: ReadDatabase,
     user_service: UserService,
 ):
     """Get all users with automatic pagination"""
@@ -5,9 +5,37 @@ Following FastAPI best practices for API organization
 
 from fastapi import APIRouter
 
-from .endpoints import auth, users, cars, stocks, sellers, buyers, sales, health
+from .endpoints import auth, users, cars, stocks, sellers, buyers, sales, reservations, reports, health
+from .async_endpoints import (
+    buyers as async_buyers,
+    cars as async_cars,
+    sales as async_sales,
+    sellers as async_sellers,
+    stocks as async_stocks,
+    users as async_users,
+)
 from app.src.core.config import settings
 
+
+def with_async_routes(sync_router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """
+    Serve the async version of every route found in both routers (same path and methods)
+    Sync routes without async counterpart are kept, in the sync router order
+    """
+    if not settings.DATABASE_ASYNC:
+        return sync_router
+
+    async_routes = {
+        (route.path, frozenset(route.methods)): route for route in async_router.routes
+    }
+    router = APIRouter()
+    for route in sync_router.routes:
+        key = (route.path, frozenset(route.methods))
+        router.routes.append(async_routes.pop(key, route))
+    router.routes.extend(async_routes.values())
+    return router
+
+
 # Create main API router
 api_router = APIRouter()
 
@@ -25,10 +53,12 @@ async def api_root():
 
 # Include all endpoint routers
 api_router.include_router(auth.router, tags=["auth"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(cars.router, prefix="/cars", tags=["cars"])
-api_router.include_router(stocks.router, prefix="/stocks", tags=["stocks"])
-api_router.include_router(sellers.router, prefix="/sellers", tags=["sellers"])
-api_router.include_router(buyers.router, prefix="/buyers", tags=["buyers"])
-api_router.include_router(sales.router, prefix="/sales", tags=["sales"])
+api_router.include_router(with_async_routes(users.router, async_users.router), prefix="/users", tags=["users"])
+api_router.include_router(with_async_routes(cars.router, async_cars.router), prefix="/cars", tags=["cars"])
+api_router.include_router(with_async_routes(stocks.router, async_stocks.router), prefix="/stocks", tags=["stocks"])
+api_router.include_router(with_async_routes(sellers.router, async_sellers.router), prefix="/sellers", tags=["sellers"])
+api_router.include_router(with_async_routes(buyers.router, async_buyers.router), prefix="/buyers", tags=["buyers"])
+api_router.include_router(with_async_routes(sales.router, async_sales.router), prefix="/sales", tags=["sales"])
+api_router.include_router(reservations.router, prefix="/reservations", tags=["reservations"])
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
 api_router.include_router(health.router, prefix="/system", tags=["system"])
@@ -0,0 +1,133 @@
+"""
+Event broker
+In-process publish/subscribe for Server-Sent Events. Publishers run in
+worker threads (sync endpoints, commit hooks) and hand events to the
+subscribers' event loops with call_soon_threadsafe. Every event gets a
+sequence number and the latest ones are kept in a ring buffer, so a client
+reconnecting with Last-Event-ID resumes without gaps. Events are per
+process: behind several workers a stream only sees its worker's writes.
+"""
+
+import asyncio
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+
+@dataclass(frozen=True)
+class Event:
+    seq: int
+    data: Dict[str, Any]
+
+    def format(self, name: Optional[str] = None) -> str:
+        """The event in text/event-stream framing"""
+        lines = [f"id: {self.seq}"]
+        if name:
+            lines.append(f"event: {name}")
+        lines.append(f"data: {json.dumps(self.data, default=str)}")
+        return "\n".join(lines) + "\n\n"
+
+
+@dataclass(eq=False)
+class Subscription:
+    """Events matching a predicate, queued for one client on its event loop"""
+
+    loop: asyncio.AbstractEventLoop
+    predicate: Predicate
+    max_pending: int
+    queue: "asyncio.Queue[Optional[Event]]" = field(default_factory=asyncio.Queue)
+    overflowed: bool = False
+
+    def deliver(self, event: Event) -> None:
+        """Queue an event, runs on the subscriber loop"""
+        if self.overflowed:
+            return
+        if self.queue.qsize() >= self.max_pending:
+            # Too slow a client is disconnected, it resumes from the buffer
+            self.overflowed = True
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(event)
+
+
+class EventBroker:
+    """Sequence numbered events fanned out to subscriptions"""
+
+    def __init__(self, buffer_size: int = 1000, max_pending: int = 1000):
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._buffer: Deque[Event] = deque(maxlen=buffer_size)
+        self._subscriptions: Set[Subscription] = set()
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(self, data: Dict[str, Any]) -> Event:
+        """Number, buffer and fan out an event, callable from any thread"""
+        with self._lock:
+            self._seq += 1
+            event = Event(self._seq, data)
+            self._buffer.append(event)
+            # Scheduled under the lock so every subscriber gets events in sequence order
+            for subscription in list(self._subscriptions):
+                if not subscription.predicate(data):
+                    continue
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+                except RuntimeError:
+                    # The subscriber loop is closed
+                    self._subscriptions.discard(subscription)
+        return event
+
+    def subscribe(
+        self, predicate: Predicate, after: Optional[int] = None
+    ) -> Tuple[Subscription, List[Event], Optional[int]]:
+        """
+        Subscribe on the running loop. Returns the subscription and the buffered
+        events after the given sequence number; when events after that number
+        are no longer buffered, no backlog but the sequence number the client
+        must reload at
+        """
+        subscription = Subscription(asyncio.get_running_loop(), predicate, self.max_pending)
+        with self._lock:
+            self._subscriptions.add(subscription)
+            if after is None:
+                return subscription, [], None
+            oldest = self._buffer[0].seq if self._buffer else self._seq + 1
+            if after > self._seq or after < oldest - 1:
+                return subscription, [], self._seq
+            backlog = [event for event in self._buffer if event.seq > after and predicate(event.data)]
+        return subscription, backlog, None
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    async def stream(
+        self, predicate: Predicate, after: Optional[int] = None, heartbeat: float = 15.0
+    ) -> AsyncIterator[str]:
+        """text/event-stream of the events matching predicate, resumed after a sequence number"""
+        subscription, backlog, reset_seq = self.subscribe(predicate, after)
+        try:
+            yield "retry: 3000\n\n"
+            if reset_seq is not None:
+                yield Event(reset_seq, {"reason": "events were lost, reload the current state"}).format("reset")
+            for event in backlog:
+                yield event.format()
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    return
+                yield event.format()
+        finally:
+            self.unsubscribe(subscription)
@@ -0,0 +1,116 @@
+"""
+Bulk create support
+Request bodies are JSON arrays or NDJSON, rows are validated in one pass and
+failures are reported per row (by position in the request) instead of
+failing the whole batch
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Generic, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+
+from app.resources.strings import BULK_INVALID_BODY_ERROR, BULK_TOO_MANY_ROWS_ERROR, VALIDATION_ERROR
+from .config import settings
+
+T = TypeVar("T")
+SchemaType = TypeVar("SchemaType", bound=BaseModel)
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+class BulkRowError(BaseModel):
+    index: int
+    error: str
+    detail: Optional[Any] = None
+
+
+class BulkResult(BaseModel, Generic[T]):
+    created: List[T] = []
+    errors: List[BulkRowError] = []
+
+
+@dataclass
+class BulkRows(Generic[SchemaType]):
+    """Valid rows with their position in the request, plus the rows that failed validation"""
+
+    rows: List[Tuple[int, SchemaType]] = field(default_factory=list)
+    errors: List[BulkRowError] = field(default_factory=list)
+
+    def reject(self, index: int, error: str, detail: Any = None) -> None:
+        self.errors.append(BulkRowError(index=index, error=error, detail=detail))
+
+    def result(self, created: Sequence[Any]) -> BulkResult:
+        return BulkResult(created=list(created), errors=sorted(self.errors, key=lambda e: e.index))
+
+
+def chunked(items: Sequence[T], size: Optional[int] = None) -> Iterator[Sequence[T]]:
+    """Split a sequence in chunks of BULK_CHUNK_SIZE items"""
+    size = size or settings.BULK_CHUNK_SIZE
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BulkBody(Generic[SchemaType]):
+    """Dependency parsing and validating a bulk request body"""
+
+    def __init__(self, schema: Type[SchemaType]):
+        self.schema = schema
+
+    async def __call__(self, request: Request) -> BulkRows[SchemaType]:
+        body = await request.body()
+        content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        items = self._ndjson(body) if content_type in NDJSON_CONTENT_TYPES else self._json(body)
+        if len(items) > settings.BULK_MAX_ROWS:
+            raise HTTPException(status_code=413, detail=BULK_TOO_MANY_ROWS_ERROR)
+
+        bulk_rows: BulkRows[SchemaType] = BulkRows()
+        for index, item in enumerate(items):
+            if isinstance(item, BulkRowError):
+                bulk_rows.errors.append(item)
+                continue
+            try:
+                bulk_rows.rows.append((index, self.schema.model_validate(item)))
+            except ValidationError as error:
+                bulk_rows.reject(
+                    index, VALIDATION_ERROR, error.errors(include_url=False, include_context=False, include_input=False)
+                )
+        return bulk_rows
+
+    @staticmethod
+    def _json(body: bytes) -> List[Any]:
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=BULK_INVALID_BODY_ERROR)
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail=BULK_INVALID_BODY_ERROR)
+        return items
+
+    @staticmethod
+    def _ndjson(body: bytes) -> List[Any]:
+        items: List[Any] = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as error:
+                items.append(BulkRowError(index=len(items), error=BULK_INVALID_BODY_ERROR, detail=str(error)))
+        return items
+
+
+def bulk_openapi(schema: Type[BaseModel]) -> dict:
+    """OpenAPI request body of a bulk endpoint, the body is read by BulkBody"""
+    item = {"$ref": f"#/components/schemas/{schema.__name__}"}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": item}},
+                "application/x-ndjson": {"schema": item},
+            },
+        }
+    }
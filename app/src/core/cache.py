@@ -0,0 +1,461 @@
+"""
+Entity cache
+Read-through cache of single entities served by id, invalidated once writes
+commit. Entries carry tags, the entities they embed, so a write evicts every
+entry built from what it changed (a car update evicts the stocks and sales
+embedding the car). Two backends:
+- memory: LRU with a TTL in the worker process, writes in other workers are
+  only seen once entries expire
+- shared: entries, tags and invalidations in a shared store through a small
+  Redis compatible client, a local stand-in (CACHE_URL=local) or redis-py
+An entry loaded while an invalidation ran is not stored, so a read racing a
+write cannot put back what the write evicted.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Set, Tuple, Type, TypeVar, Union
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .events import on_commit
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+class CacheMetrics:
+    """Hits, misses and evictions per entity since start (or last reset)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self.counters: Dict[str, Dict[str, int]] = {}
+
+    def record(self, namespace: str, counter: str, count: int = 1) -> None:
+        with self._lock:
+            counters = self.counters.setdefault(namespace, {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0})
+            counters[counter] += count
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            entities = {}
+            for namespace, counters in self.counters.items():
+                reads = counters["hits"] + counters["misses"]
+                entities[namespace] = {**counters, "hit_ratio": round(counters["hits"] / reads, 4) if reads else None}
+        return {"since": self.started_at, "entities": entities}
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str, schema: Type[SchemaT]) -> Optional[SchemaT]:
+        ...
+
+    def set(self, key: str, value: BaseModel, tags: Iterable[str], generation: int) -> bool:
+        ...
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        ...
+
+    def generation(self) -> int:
+        ...
+
+    def clear(self) -> None:
+        ...
+
+
+class MemoryBackend:
+    """Least recently used entries of this process, expired after ttl seconds"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, BaseModel, Tuple[str, ...]]]" = OrderedDict()
+        self._tagged: Dict[str, Set[str]] = {}
+        self._generation = 0
+
+    def get(self, key: str, schema: Type[SchemaT]) -> Optional[SchemaT]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: BaseModel, tags: Iterable[str], generation: int) -> bool:
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._remove(key)
+            tags = tuple(tags)
+            self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            return True
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            self._generation += 1
+            keys = set()
+            for tag in tags:
+                keys |= self._tagged.get(tag, set())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tagged.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+
+class SharedClient(Protocol):
+    """The Redis commands the shared backend runs, redis-py clients satisfy it"""
+
+    def get(self, name: str) -> Optional[Union[str, bytes]]:
+        ...
+
+    def set(self, name: str, value: str, ex: Optional[int] = None) -> Any:
+        ...
+
+    def delete(self, *names: str) -> int:
+        ...
+
+    def incr(self, name: str) -> int:
+        ...
+
+    def sadd(self, name: str, *values: str) -> int:
+        ...
+
+    def smembers(self, name: str) -> Set[Union[str, bytes]]:
+        ...
+
+    def expire(self, name: str, seconds: int) -> Any:
+        ...
+
+    def flushdb(self) -> Any:
+        ...
+
+    def pipeline(self) -> Any:
+        ...
+
+
+class WatchError(Exception):
+    """A watched key changed before EXEC, raised like redis.exceptions.WatchError"""
+
+
+class LocalPipeline:
+    """WATCH/MULTI/EXEC on LocalSharedClient, the part of redis-py pipelines the backend uses"""
+
+    def __init__(self, client: "LocalSharedClient") -> None:
+        self.client = client
+        self._watched: Dict[str, int] = {}
+        self._queued: List[Tuple[Callable[..., Any], tuple, dict]] = []
+        self._buffered = False
+
+    def __enter__(self) -> "LocalPipeline":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.reset()
+
+    def __getattr__(self, command: str) -> Callable[..., Any]:
+        """Commands run at once after watch(), and are queued after multi()"""
+        method = getattr(self.client, command)
+        if not self._buffered:
+            return method
+
+        def queue(*args: Any, **kwargs: Any) -> "LocalPipeline":
+            self._queued.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    def watch(self, *names: str) -> None:
+        with self.client._lock:
+            for name in names:
+                self._watched[name] = self.client._versions.get(name, 0)
+
+    def multi(self) -> None:
+        self._buffered = True
+
+    def execute(self) -> List[Any]:
+        with self.client._lock:
+            try:
+                for name, version in self._watched.items():
+                    if self.client._versions.get(name, 0) != version:
+                        raise WatchError(f"Watched key '{name}' changed")
+                return [method(*args, **kwargs) for method, args, kwargs in self._queued]
+            finally:
+                self.reset()
+
+    def reset(self) -> None:
+        self._watched.clear()
+        self._queued.clear()
+        self._buffered = False
+
+
+class LocalSharedClient:
+    """In-process stand-in for a Redis server, for development and tests"""
+
+    def __init__(self) -> None:
+        # Reentrant so a pipeline runs its queued commands under the lock it checked with
+        self._lock = threading.RLock()
+        self._values: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        # Writes per key, compared by WATCH
+        self._versions: Dict[str, int] = {}
+
+    def _touch(self, name: str) -> None:
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    def _live(self, name: str) -> Any:
+        expires = self._expires.get(name)
+        if expires is not None and expires <= time.monotonic():
+            self._values.pop(name, None)
+            self._expires.pop(name, None)
+        return self._values.get(name)
+
+    def get(self, name: str) -> Optional[str]:
+        with self._lock:
+            return self._live(name)
+
+    def set(self, name: str, value: str, ex: Optional[int] = None) -> bool:
+        with self._lock:
+            self._touch(name)
+            self._values[name] = value
+            self._expires.pop(name, None)
+            if ex is not None:
+                self._expires[name] = time.monotonic() + ex
+            return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            deleted = 0
+            for name in names:
+                self._touch(name)
+                deleted += self._live(name) is not None
+                self._values.pop(name, None)
+                self._expires.pop(name, None)
+            return deleted
+
+    def incr(self, name: str) -> int:
+        with self._lock:
+            value = int(self._live(name) or 0) + 1
+            self._touch(name)
+            self._values[name] = str(value)
+            return value
+
+    def sadd(self, name: str, *values: str) -> int:
+        with self._lock:
+            members = self._live(name)
+            if members is None:
+                members = self._values[name] = set()
+            added = len(set(values) - members)
+            self._touch(name)
+            members.update(values)
+            return added
+
+    def smembers(self, name: str) -> Set[str]:
+        with self._lock:
+            return set(self._live(name) or ())
+
+    def expire(self, name: str, seconds: int) -> bool:
+        with self._lock:
+            if self._live(name) is None:
+                return False
+            self._touch(name)
+            self._expires[name] = time.monotonic() + seconds
+            return True
+
+    def flushdb(self) -> bool:
+        with self._lock:
+            for name in self._values:
+                self._touch(name)
+            self._values.clear()
+            self._expires.clear()
+            return True
+
+    def pipeline(self) -> LocalPipeline:
+        return LocalPipeline(self)
+
+
+class SharedBackend:
+    """
+    Entries as JSON in a shared store, each tag a set of the keys it evicts.
+    Every worker sees the invalidations of the others.
+    """
+
+    def __init__(
+        self, client: SharedClient, ttl: float, prefix: str = "cache:", watch_error: Type[Exception] = WatchError
+    ):
+        self.client = client
+        self.ttl = max(1, int(ttl))
+        self.prefix = prefix
+        # Raised by the client when EXEC finds a watched key changed
+        self.watch_error = watch_error
+
+    @property
+    def generation_key(self) -> str:
+        return self.prefix + "generation"
+
+    def get(self, key: str, schema: Type[SchemaT]) -> Optional[SchemaT]:
+        data = self.client.get(self.prefix + key)
+        if data is None:
+            return None
+        return schema.model_validate_json(data)
+
+    def set(self, key: str, value: BaseModel, tags: Iterable[str], generation: int) -> bool:
+        """
+        Store the entry and its tags unless an invalidation ran since generation.
+        The generation is watched, an invalidation landing between the check and
+        the write makes the transaction fail instead of being lost.
+        """
+        entry_key = self.prefix + key
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(self.generation_key)
+                if int(pipe.get(self.generation_key) or 0) != generation:
+                    return False
+                pipe.multi()
+                pipe.set(entry_key, value.model_dump_json(), ex=self.ttl)
+                for tag in tags:
+                    tag_key = self.prefix + "tag:" + tag
+                    pipe.sadd(tag_key, entry_key)
+                    pipe.expire(tag_key, self.ttl)
+                pipe.execute()
+            except self.watch_error:
+                return False
+        return True
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        self.client.incr(self.generation_key)
+        evicted = 0
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            keys = [_text(key) for key in self.client.smembers(tag_key)]
+            evicted += self.client.delete(*keys) if keys else 0
+            self.client.delete(tag_key)
+        return evicted
+
+    def generation(self) -> int:
+        return int(self.client.get(self.generation_key) or 0)
+
+    def clear(self) -> None:
+        """Empty the whole store database, meant for tests"""
+        self.client.flushdb()
+
+
+def _text(value: Union[str, bytes]) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class EntityCache:
+    """
+    Read-through cache of entity schemas, keyed and tagged as "<entity>:<id>".
+    Cached schemas are shared between requests, callers must not change them.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], metrics: Optional[CacheMetrics] = None):
+        self.backend = backend
+        self.metrics = metrics or CacheMetrics()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get_or_load(
+        self,
+        namespace: str,
+        id: Any,
+        schema: Type[SchemaT],
+        load: Callable[[], Any],
+        tags: Callable[[SchemaT], Iterable[str]] = lambda value: (),
+    ) -> SchemaT:
+        """
+        The cached entity, or the one load() returns stored under its own key
+        and tags. Errors of load() (not found) propagate and are not cached.
+        """
+        if self.backend is None:
+            return load()
+        key = f"{namespace}:{id}"
+        value = self.backend.get(key, schema)
+        if value is not None:
+            self.metrics.record(namespace, "hits")
+            return value
+
+        self.metrics.record(namespace, "misses")
+        generation = self.backend.generation()
+        value = schema.model_validate(load())
+        if self.backend.set(key, value, (key, *tags(value)), generation):
+            self.metrics.record(namespace, "stores")
+        return value
+
+    def invalidate_on_commit(self, db: Session, tag: str, *ids: Any) -> None:
+        """
+        Evict the entities, and the entries embedding them, once db commits.
+        The tag is an entity namespace, or a tag of its entries ("stock.car").
+        """
+        if self.backend is None or not ids:
+            return
+        tags = [f"{tag}:{id}" for id in ids]
+        on_commit(db, lambda: self.invalidate(tag.split(".")[0], tags))
+
+    def invalidate(self, namespace: str, tags: Iterable[str]) -> None:
+        evicted = self.backend.invalidate(tags)
+        self.metrics.record(namespace, "invalidations", evicted)
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.clear()
+
+
+def build_backend(backend: str, url: Optional[str] = None) -> Optional[CacheBackend]:
+    """Backend from its setting: memory, shared (CACHE_URL local or redis://) or none"""
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryBackend(max_entries=settings.CACHE_MAX_ENTRIES, ttl=settings.CACHE_TTL_SECONDS)
+    if backend == "shared":
+        watch_error: Type[Exception] = WatchError
+        if not url or url == "local":
+            client: SharedClient = LocalSharedClient()
+        else:
+            try:
+                import redis
+            except ImportError as error:
+                raise ValueError("CACHE_URL needs the redis package, install the 'cache' extra") from error
+            client = redis.Redis.from_url(url)
+            watch_error = redis.exceptions.WatchError
+        return SharedBackend(client, ttl=settings.CACHE_TTL_SECONDS, watch_error=watch_error)
+    raise ValueError(f"Unknown cache backend '{backend}'")
+
+
+entity_cache = EntityCache(build_backend(settings.CACHE_BACKEND, settings.CACHE_URL))
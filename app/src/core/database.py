@@ -1,16 +1,119 @@
 import os
+from typing import Any, Callable, Optional, Type
 
 from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
-from .config import DATABASE_URL
+from .config import DATABASE_URL, settings
+from .pool import pool_options
+from .replicas import ReplicaSet, RoutingSession
 
 ###
 # Database Configuration
 ###
 
-engine = create_engine(os.getenv("DB_URL", DATABASE_URL))
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SQLALCHEMY_DATABASE_URL = os.getenv("DB_URL", DATABASE_URL)
+
+# Asyncio drivers used when DATABASE_ASYNC is enabled
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its asyncio counterpart"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, **pool_options(SQLALCHEMY_DATABASE_URL, "primary")
+)
+replica_set = ReplicaSet.from_urls(
+    settings.DATABASE_REPLICA_URLS, cooldown=settings.DB_REPLICA_COOLDOWN
+)
+# Objects stay loaded after the unit of work commits, responses need no refresh queries
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    replicas=replica_set,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+)
+
+# The async engine is only built on demand so asyncpg stays optional for the sync path
+async_engine = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+if settings.DATABASE_ASYNC:
+    ASYNC_SQLALCHEMY_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(
+        SQLALCHEMY_DATABASE_URL
+    )
+    async_engine = create_async_engine(
+        ASYNC_SQLALCHEMY_DATABASE_URL,
+        **pool_options(ASYNC_SQLALCHEMY_DATABASE_URL, "primary_async", asyncio=True),
+    )
+    # Objects must stay loaded after commit, lazy loads are not allowed on AsyncSession
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+class RequestSession:
+    """
+    Request scoped holder creating its Session on first use.
+    Routes that never query (health, docs, auth only) never build a Session,
+    and the connection is only checked out once the Session executes SQL.
+    """
+
+    def __init__(self, factory: Callable[[], Session] = SessionLocal):
+        self.factory = factory
+        self._session: Optional[Session] = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def get(self) -> Session:
+        if self._session is None:
+            self._session = self.factory()
+        return self._session
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+async def run_sync(
+    db: AsyncSession,
+    fn: Callable[..., Any],
+    *args: Any,
+    schema: Optional[Type[Any]] = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    Run a sync service call on the session behind an AsyncSession.
+    When a schema is given the result is validated inside the call,
+    so nested relationships are loaded before leaving the greenlet.
+    """
+
+    def call(session: Session) -> Any:
+        result = fn(session, *args, **kwargs)
+        if schema is not None:
+            return schema.model_validate(result)
+        return result
+
+    return await db.run_sync(call)
 
 
 class Base(DeclarativeBase):
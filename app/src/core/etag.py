@@ -0,0 +1,46 @@
+"""
+Entity tags
+Conditional GETs answered from row versions. The ETag of a document is a
+digest of the versions of the rows it is built from (a stock and its car),
+the ETag of a page the digest of its total and of the versions of its
+items. If-None-Match is checked against versions read as plain columns, so
+a 304 loads no ORM objects and serializes nothing.
+"""
+
+import hashlib
+from typing import Any, Iterable, Optional, Sequence
+
+from fastapi import Response
+from fastapi_pagination.bases import RawParams
+
+NOT_MODIFIED_RESPONSES = {304: {"description": "Not modified, the If-None-Match ETag is current"}}
+
+
+def _etag(head: Any, items: Iterable[Sequence[Any]]) -> str:
+    digest = hashlib.blake2b(repr(head).encode(), digest_size=12)
+    for versions in items:
+        digest.update(repr(tuple(versions)).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def entity_etag(versions: Sequence[Any]) -> str:
+    """ETag of a document from the row versions behind it"""
+    return _etag(None, [versions])
+
+
+def page_etag(total: int, params: RawParams, items: Iterable[Sequence[Any]]) -> str:
+    """ETag of a page from its total, its window and the row versions of its items, in page order"""
+    return _etag((total, params.limit, params.offset), items)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names the ETag, compared weakly as RFC 9110 asks"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,37 @@
+"""
+Commit hooks
+Callbacks registered on a session run once its transaction commits and are
+dropped when it rolls back, so in-memory state (caches, counters) only sees
+writes that reached the database
+"""
+
+import logging
+from typing import Callable, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+AFTER_COMMIT_KEY = "after_commit"
+
+
+def on_commit(db: Session, callback: Callable[[], None]) -> None:
+    """Run callback after the current transaction of db commits"""
+    db.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_callbacks(session: Session) -> None:
+    callbacks: List[Callable[[], None]] = session.info.pop(AFTER_COMMIT_KEY, [])
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception:
+            # The transaction is committed, a failing hook must not fail the request
+            logger.exception("Commit callback failed")
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_commit_callbacks(session: Session) -> None:
+    session.info.pop(AFTER_COMMIT_KEY, None)
@@ -0,0 +1,95 @@
+"""
+Streaming exports
+Rows are read through a server-side cursor in batches of EXPORT_BATCH_SIZE
+and written out as NDJSON or CSV one batch at a time, so memory use does not
+grow with the size of the table
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Iterator, Optional
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+# OpenAPI responses of export endpoints
+EXPORT_RESPONSES = {
+    200: {"content": {media_type: {} for media_type in MEDIA_TYPES.values()}},
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+
+def stream_rows(
+    bind: Engine,
+    statement: Select,
+    export_format: ExportFormat,
+    batch_size: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Encoded rows of a Core select, one chunk per batch.
+    The export owns its connection because the request session is closed
+    before the response body has been fully streamed.
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    with bind.connect() as connection:
+        result = connection.execution_options(
+            stream_results=True, yield_per=batch_size
+        ).execute(statement)
+        columns = list(result.keys())
+
+        if export_format is ExportFormat.csv:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for batch in result.partitions():
+                writer.writerows(batch)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+            return
+
+        for batch in result.partitions():
+            yield "".join(
+                json.dumps(dict(zip(columns, row)), default=_json_default) + "\n"
+                for row in batch
+            )
+
+
+def export_response(
+    rows: Iterator[str], export_format: ExportFormat, name: str
+) -> StreamingResponse:
+    """StreamingResponse downloading the rows as <name>.<format>"""
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'
+        },
+    )
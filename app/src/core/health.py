@@ -0,0 +1,152 @@
+"""
+Health monitor
+Background task probing the primary database, the saturation of its pool and
+the read replicas every HEALTH_CHECK_INTERVAL seconds. Health endpoints and
+Kubernetes probes read the last snapshot instead of querying per request, so
+probe traffic costs one query per interval and worker; a probe runs inline
+only when no snapshot was taken yet, or the monitor is not running and the
+snapshot is older than the interval.
+Readiness fails when the database is unreachable or slower than
+HEALTH_DB_LATENCY_THRESHOLD_MS, when the pool is saturated or timed out
+checkouts since the previous round, or when the snapshot is stale.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+from .database import engine, replica_set
+from .replicas import ReplicaSet
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Periodic health checks of the database, its pool and the replicas"""
+
+    def __init__(
+        self,
+        engine: Engine,
+        replicas: Optional[ReplicaSet] = None,
+        interval: float = settings.HEALTH_CHECK_INTERVAL,
+        stale_after: float = settings.HEALTH_STALE_AFTER,
+        latency_threshold_ms: float = settings.HEALTH_DB_LATENCY_THRESHOLD_MS,
+        pool_saturation_threshold: float = settings.HEALTH_POOL_SATURATION_THRESHOLD,
+    ):
+        self.engine = engine
+        self.replicas = replicas
+        self.interval = interval
+        self.stale_after = stale_after
+        self.latency_threshold_ms = latency_threshold_ms
+        self.pool_saturation_threshold = pool_saturation_threshold
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self._timeouts = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def probe_database(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception as error:
+            return {"status": "unhealthy", "message": f"Database error: {error}"}
+        latency_ms = round((time.perf_counter() - started) * 1000, 3)
+        if latency_ms > self.latency_threshold_ms:
+            return {
+                "status": "degraded",
+                "message": f"Database answered in more than {self.latency_threshold_ms:g}ms",
+                "latency_ms": latency_ms,
+            }
+        return {"status": "healthy", "message": "Database connection successful", "latency_ms": latency_ms}
+
+    def probe_pool(self) -> Dict[str, Any]:
+        """Pool usage right now, saturated past the threshold or after new checkout timeouts"""
+        pool = self.engine.pool
+        if not isinstance(pool, QueuePool):
+            return {"status": "unknown", "message": "Pool information not available"}
+
+        max_overflow = pool._max_overflow
+        capacity = pool.size() + max_overflow if max_overflow >= 0 else None
+        check: Dict[str, Any] = {
+            "status": "healthy",
+            "pool_size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "saturation": round(pool.checkedout() / capacity, 4) if capacity else None,
+        }
+        metrics = getattr(pool, "metrics", None)
+        if metrics:
+            snapshot = metrics.snapshot()
+            new_timeouts = max(0, snapshot["timeouts"] - self._timeouts)
+            self._timeouts = snapshot["timeouts"]
+            check.update({
+                "checkout_wait_p95_ms": snapshot["checkout_wait"]["p95_ms"],
+                "timeouts": snapshot["timeouts"],
+                "new_timeouts": new_timeouts,
+                "max_overflow_in_use": snapshot["max_overflow_in_use"],
+            })
+            if new_timeouts:
+                check["status"] = "exhausted"
+        if check["saturation"] is not None and check["saturation"] >= self.pool_saturation_threshold:
+            check["status"] = "exhausted"
+        return check
+
+    def check(self) -> Dict[str, Any]:
+        """Run every probe and keep the result as the current snapshot"""
+        # The pool is read before the database probe takes a connection from it
+        checks: Dict[str, Any] = {"database_pool": self.probe_pool()}
+        checks["database"] = self.probe_database()
+        if self.replicas:
+            # Unhealthy replicas only fall back to the primary, they do not fail readiness
+            checks["replicas"] = self.replicas.check()
+
+        self.snapshot = {
+            "checked_at": time.time(),
+            "healthy": checks["database"]["status"] != "unhealthy",
+            "ready": checks["database"]["status"] == "healthy" and checks["database_pool"]["status"] != "exhausted",
+            "checks": checks,
+        }
+        return self.snapshot
+
+    async def current(self) -> Dict[str, Any]:
+        """The last snapshot, probing inline only when there is none to serve"""
+        snapshot = self.snapshot
+        if snapshot is None or (self._task is None and time.time() - snapshot["checked_at"] > self.interval):
+            snapshot = await run_in_threadpool(self.check)
+        return snapshot
+
+    def is_stale(self, snapshot: Dict[str, Any]) -> bool:
+        return time.time() - snapshot["checked_at"] > self.stale_after
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await run_in_threadpool(self.check)
+            except Exception:
+                logger.exception("Health check failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+health_monitor = HealthMonitor(engine, replica_set)
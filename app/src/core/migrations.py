@@ -0,0 +1,84 @@
+"""
+Schema migrations
+Alembic migrations run as a separate step before the workers start
+(python -m app.cli migrate, the release phase of the Procfile, the migrate
+service of docker-compose). Workers only compare the revision stored in the
+database with the head of migrations/ at startup: one query, no reflection
+of the schema and no workers racing each other to create tables.
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional, Set
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parents[3]
+
+SCHEMA_CHECK_MODES = ("error", "warn", "off")
+
+
+class SchemaVersionError(RuntimeError):
+    def __init__(self, current: Set[str], heads: Set[str]):
+        self.current = current
+        self.heads = heads
+        super().__init__(
+            f"Database schema at revision {', '.join(sorted(current)) or 'none'}, "
+            f"the application expects {', '.join(sorted(heads))}: run 'python -m app.cli migrate'"
+        )
+
+
+def alembic_config() -> Config:
+    """The project alembic.ini, usable from any working directory"""
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    return config
+
+
+def head_revisions() -> Set[str]:
+    """Revisions the code expects, read from the migration scripts"""
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def current_revisions(connection: Connection) -> Set[str]:
+    """Revisions stored in alembic_version, empty when never migrated"""
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def upgrade(revision: str = "head") -> None:
+    command.upgrade(alembic_config(), revision)
+
+
+def stamp(connection: Connection, revision: str = "head") -> None:
+    """Record a revision without running it, for schemas built by create_all"""
+    context = MigrationContext.configure(connection)
+    context.stamp(ScriptDirectory.from_config(alembic_config()), revision)
+
+
+def check_schema_version(engine: Engine, mode: str = "error") -> Optional[SchemaVersionError]:
+    """
+    Compare the database revision with the migration heads. A mismatch raises
+    in "error" mode, is logged in "warn" mode and is returned either way.
+    """
+    if mode not in SCHEMA_CHECK_MODES:
+        raise ValueError(f"Unknown schema check mode '{mode}'")
+    if mode == "off":
+        return None
+
+    with engine.connect() as connection:
+        current = current_revisions(connection)
+    heads = head_revisions()
+    if current == heads:
+        return None
+
+    error = SchemaVersionError(current, heads)
+    if mode == "error":
+        raise error
+    logger.warning(str(error))
+    return error
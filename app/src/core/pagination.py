@@ -0,0 +1,116 @@
+"""
+Keyset (cursor) pagination
+Pages seek past the last row seen, WHERE (key, id) > (:last_key, :last_id)
+LIMIT n, so every page costs the same no matter how deep it is; the count
+of all rows is only run when asked for
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Generic, List, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.resources.strings import INVALID_CURSOR_ERROR
+
+T = TypeVar("T")
+
+
+class SortDirection(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+class CursorParams:
+    """Query parameters of cursor paginated endpoints"""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(default=None, description="Cursor of the next page, from a previous response"),
+        size: int = Query(default=50, ge=1, le=100, description="Page size"),
+        include_total: bool = Query(default=False, description="Also count all rows, costs a COUNT query"),
+        direction: SortDirection = Query(default=SortDirection.asc, description="Sort direction"),
+    ):
+        self.cursor = cursor
+        self.size = size
+        self.include_total = include_total
+        self.direction = direction
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    size: int
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [value.isoformat() if isinstance(value, (datetime, date)) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[ColumnElement]) -> List[Any]:
+    """Values of the last row of the previous page, typed after the key columns"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list) or len(payload) != len(keys):
+            raise ValueError(cursor)
+        values = []
+        for key, value in zip(keys, payload):
+            python_type = key.type.python_type
+            if value is not None and python_type in (datetime, date):
+                value = python_type.fromisoformat(value)
+            elif value is not None and not isinstance(value, python_type):
+                raise ValueError(cursor)
+            values.append(value)
+        return values
+    except (ValueError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=400, detail=INVALID_CURSOR_ERROR)
+
+
+def _seek(keys: Sequence[ColumnElement], values: Sequence[Any], direction: SortDirection) -> ColumnElement:
+    """Lexicographic (k1, k2, ...) > (v1, v2, ...) spelled out, so it works on every backend"""
+    compare = (lambda key, value: key > value) if direction is SortDirection.asc else (lambda key, value: key < value)
+    clauses = []
+    for position, (key, value) in enumerate(zip(keys, values)):
+        equal_prefix = [k == v for k, v in zip(keys[:position], values[:position])]
+        clauses.append(and_(*equal_prefix, compare(key, value)))
+    return or_(*clauses)
+
+
+def paginate_cursor(
+    db: Session,
+    statement: Select,
+    keys: Sequence[ColumnElement],
+    params: CursorParams,
+) -> CursorPage:
+    """
+    One page of an ORM select ordered by the key columns.
+    The last key must be unique (the primary key) to keep the order stable.
+    """
+    page_statement = statement
+    if params.cursor:
+        page_statement = page_statement.where(
+            _seek(keys, decode_cursor(params.cursor, keys), params.direction)
+        )
+    ordering = [key.asc() if params.direction is SortDirection.asc else key.desc() for key in keys]
+    rows = db.scalars(page_statement.order_by(*ordering).limit(params.size + 1)).all()
+
+    items = list(rows[:params.size])
+    next_cursor = None
+    if len(rows) > params.size:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, key.key) for key in keys])
+
+    total = None
+    if params.include_total:
+        total = db.scalar(select(func.count()).select_from(statement.order_by(None).subquery()))
+
+    return CursorPage(items=items, size=params.size, next_cursor=next_cursor, total=total)
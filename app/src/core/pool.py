@@ -0,0 +1,205 @@
+"""
+Connection pool configuration and instrumentation
+Pools record how long callers wait for a connection, how long connections
+stay checked out and how much of the overflow is used, so pool sizes per
+worker can be chosen from data instead of point-in-time numbers
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+from .config import settings
+
+# Histogram upper bounds in milliseconds, the last bucket is unbounded
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+)
+
+CHECKOUT_STARTED_KEY = "pool_metrics_checkout_started"
+
+
+class LatencyHistogram:
+    """Fixed bucket latency histogram, cheap enough to update on every checkout"""
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        milliseconds = seconds * 1000
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, milliseconds)] += 1
+        self.count += 1
+        self.total_ms += milliseconds
+        self.max_ms = max(self.max_ms, milliseconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of observations"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return float(LATENCY_BUCKETS_MS[index])
+                return self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound:g}ms" for bound in LATENCY_BUCKETS_MS] + ["inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class PoolMetrics:
+    """Cumulative checkout statistics of one connection pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Optional[QueuePool] = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self.checkout_wait = LatencyHistogram()
+            self.checkout_duration = LatencyHistogram()
+            self.checkouts = 0
+            self.timeouts = 0
+            self.overflow_checkouts = 0
+            self.max_overflow_in_use = 0
+            self.max_checked_out = 0
+
+    def record_checkout(self, wait: float, overflow_in_use: int, checked_out: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait.observe(wait)
+            if overflow_in_use > 0:
+                self.overflow_checkouts += 1
+            self.max_overflow_in_use = max(self.max_overflow_in_use, overflow_in_use)
+            self.max_checked_out = max(self.max_checked_out, checked_out)
+
+    def record_timeout(self, wait: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.checkout_wait.observe(wait)
+
+    def record_checkin(self, duration: float) -> None:
+        with self._lock:
+            self.checkout_duration.observe(duration)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative metrics since start (or last reset) plus current pool status"""
+        with self._lock:
+            data: Dict[str, Any] = {
+                "since": self.started_at,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "overflow_checkouts": self.overflow_checkouts,
+                "max_overflow_in_use": self.max_overflow_in_use,
+                "max_checked_out": self.max_checked_out,
+                "checkout_wait": self.checkout_wait.snapshot(),
+                "checkout_duration": self.checkout_duration.snapshot(),
+            }
+        pool = self.pool
+        if pool is not None:
+            data["pool"] = {
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            }
+        return data
+
+
+class InstrumentedPoolMixin:
+    """QueuePool hooks feeding PoolMetrics on every checkout and checkin"""
+
+    def __init__(self, creator: Any, pool_metrics: Optional[PoolMetrics] = None, **kw: Any):
+        super().__init__(creator, **kw)
+        self.metrics = pool_metrics or PoolMetrics("unnamed")
+        self.metrics.pool = self
+
+    def connect(self) -> Any:
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        now = time.perf_counter()
+        connection.record_info[CHECKOUT_STARTED_KEY] = now
+        self.metrics.record_checkout(
+            wait=now - started,
+            overflow_in_use=max(self.overflow(), 0),
+            checked_out=self.checkedout(),
+        )
+        return connection
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        started = record.record_info.pop(CHECKOUT_STARTED_KEY, None)
+        if started is not None:
+            self.metrics.record_checkin(time.perf_counter() - started)
+        super()._do_return_conn(record)
+
+    def recreate(self) -> Any:
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        self.metrics.pool = pool
+        return pool
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    """QueuePool recording checkout metrics"""
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool recording checkout metrics"""
+
+
+# Metrics of every instrumented pool, by name
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def get_pool_metrics(name: str) -> PoolMetrics:
+    """Get or register the metrics of a named pool"""
+    if name not in pool_metrics:
+        pool_metrics[name] = PoolMetrics(name)
+    return pool_metrics[name]
+
+
+def pool_options(url: str, name: str, asyncio: bool = False) -> Dict[str, Any]:
+    """create_engine pool arguments from Settings, instrumented under the given name"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite keeps its single connection pool
+        return {}
+
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if asyncio else InstrumentedQueuePool,
+        "pool_metrics": get_pool_metrics(name),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
@@ -0,0 +1,199 @@
+"""
+Read replica routing
+Sessions flagged as read only run their queries on a healthy replica picked
+by weight, anything that writes (or reads after a write) stays on the primary
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .pool import pool_options
+
+# Session.info keys
+READ_ONLY_KEY = "read_only"
+REPLICA_KEY = "replica"
+WROTE_KEY = "wrote"
+PRIMARY_KEY = "primary"
+
+
+class Replica:
+    """Replica engine with its routing weight and health"""
+
+    def __init__(self, name: str, engine: Engine, weight: int = 1):
+        self.name = name
+        self.engine = engine
+        self.weight = weight
+        self.healthy = True
+        self.failed_at: Optional[float] = None
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    def available(self, cooldown: float, now: float) -> bool:
+        """Healthy, or failed long enough ago to be given another try"""
+        return self.healthy or (self.failed_at is not None and now - self.failed_at >= cooldown)
+
+    def mark_failed(self, error: BaseException) -> None:
+        self.healthy = False
+        self.failed_at = time.monotonic()
+        self.failures += 1
+        self.last_error = str(error)
+
+    def mark_healthy(self) -> None:
+        self.healthy = True
+        self.failed_at = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "url": self.engine.url.render_as_string(hide_password=True),
+            "weight": self.weight,
+            "status": "healthy" if self.healthy else "unhealthy",
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaSet:
+    """Weighted choice among the replicas that are currently available"""
+
+    def __init__(self, replicas: Optional[List[Replica]] = None, cooldown: float = 30.0):
+        self.replicas = replicas or []
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        for replica in self.replicas:
+            self._watch(replica)
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def _watch(self, replica: Replica) -> None:
+        """Take the replica out of rotation when its connections drop"""
+
+        @event.listens_for(replica.engine, "handle_error")
+        def on_error(context: Any) -> None:
+            if context.is_disconnect:
+                self.mark_failed(replica, context.original_exception)
+
+        @event.listens_for(replica.engine, "connect")
+        def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+            if not replica.healthy:
+                with self._lock:
+                    replica.mark_healthy()
+
+    def mark_failed(self, replica: Replica, error: BaseException) -> None:
+        with self._lock:
+            replica.mark_failed(error)
+
+    def choose(self) -> Optional[Replica]:
+        """Pick an available replica by weight, None to fall back to the primary"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                replica for replica in self.replicas
+                if replica.weight > 0 and replica.available(self.cooldown, now)
+            ]
+            if not candidates:
+                return None
+            replica = random.choices(candidates, weights=[r.weight for r in candidates])[0]
+            if not replica.healthy:
+                # Half open: one trial request, the next failure restarts the cooldown
+                replica.failed_at = now
+            return replica
+
+    def check(self) -> List[Dict[str, Any]]:
+        """Probe every replica with SELECT 1 and return their status"""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+            except Exception as error:
+                self.mark_failed(replica, error)
+            else:
+                with self._lock:
+                    replica.mark_healthy()
+        return self.status()
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [replica.status() for replica in self.replicas]
+
+    @classmethod
+    def from_urls(cls, urls: Optional[str], cooldown: float = 30.0) -> "ReplicaSet":
+        """Build replicas from 'url|weight,url|weight', weight defaults to 1"""
+        replicas = []
+        for index, entry in enumerate(filter(None, (u.strip() for u in (urls or "").split(",")))):
+            url, _, weight = entry.partition("|")
+            name = f"replica_{index}"
+            engine = create_engine(url, **pool_options(url, name))
+            replicas.append(Replica(name, engine, int(weight) if weight else 1))
+        return cls(replicas, cooldown)
+
+
+class RoutingSession(Session):
+    """
+    Session routing reads to replicas when flagged read only.
+    A session sticks to one replica for its lifetime and moves to the
+    primary for good once it flushes, so read-after-write stays consistent.
+    Queries inside read_primary() go to the primary either way.
+    """
+
+    def __init__(self, *args: Any, replicas: Optional[ReplicaSet] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Any:
+        if (
+            self.replicas
+            and self.info.get(READ_ONLY_KEY)
+            and not self.info.get(WROTE_KEY)
+            and not self.info.get(PRIMARY_KEY)
+            and not self._flushing
+        ):
+            if REPLICA_KEY not in self.info:
+                self.info[REPLICA_KEY] = self._connect_replica()
+            replica = self.info[REPLICA_KEY]
+            if replica is not None:
+                return replica.engine
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+    def _connect_replica(self) -> Optional[Replica]:
+        """Open the transaction on a replica, trying the next one on connection errors"""
+        while True:
+            replica = self.replicas.choose()
+            if replica is None:
+                return None
+            try:
+                self.connection(bind_arguments={"bind": replica.engine})
+            except exc.DBAPIError as error:
+                self.replicas.mark_failed(replica, error)
+                continue
+            return replica
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def stick_to_primary(session: Session, flush_context: Any) -> None:
+    session.info[WROTE_KEY] = True
+
+
+def use_replica(db: Session) -> Session:
+    """Flag a session as read only so it may be served by a replica"""
+    if not db.info.get(WROTE_KEY):
+        db.info[READ_ONLY_KEY] = True
+    return db
+
+
+@contextmanager
+def read_primary(db: Session) -> Iterator[Session]:
+    """Run the queries of the block on the primary, for reads that must not lag (cache fills)"""
+    previous = db.info.get(PRIMARY_KEY)
+    db.info[PRIMARY_KEY] = True
+    try:
+        yield db
+    finally:
+        db.info[PRIMARY_KEY] = previous
@@ -1,12 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import Generic, List, Optional, Type, TypeVar
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar
 
+from sqlalchemy import Select, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from .bulk import chunked
+
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType")
 UpdateSchemaType = TypeVar("UpdateSchemaType")
 
+# Dialects that support INSERT ... ON CONFLICT
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
 
 class BaseRepository(ABC, Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
@@ -18,13 +29,20 @@ class BaseRepository(ABC, Generic[ModelType, CreateSchemaType, UpdateSchemaType]
         pass
 
     @abstractmethod
-    def get_by_id(self, db: Session, *, id: int) -> Optional[ModelType]:
+    def get_by_id(
+        self, db: Session, *, id: int, options: Sequence[Any] = ()
+    ) -> Optional[ModelType]:
         """Get a record by ID"""
         pass
 
     @abstractmethod
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        options: Sequence[Any] = ()
     ) -> List[ModelType]:
         """Get multiple records with pagination"""
         pass
@@ -47,23 +65,74 @@ class BaseRepository(ABC, Generic[ModelType, CreateSchemaType, UpdateSchemaType]
 
 
 class CRUDBase(BaseRepository[ModelType, CreateSchemaType, UpdateSchemaType]):
-    """Base CRUD operations implementation"""
+    """
+    Base CRUD operations implementation.
+    Writes only flush, committing is left to the caller's unit of work;
+    generated keys come back through INSERT ... RETURNING on flush.
+    """
+
+    def to_row(self, obj_in: CreateSchemaType) -> dict:
+        """Column values of a new record"""
+        return obj_in.model_dump()
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
-        obj_data = obj_in.model_dump()
-        db_obj = self.model(**obj_data)
+        db_obj = self.model(**self.to_row(obj_in))
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        db.flush()
         return db_obj
 
-    def get_by_id(self, db: Session, *, id: int) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.id == id).first()
+    def create_many(
+        self, db: Session, *, objs_in: Sequence[CreateSchemaType], chunk_size: Optional[int] = None
+    ) -> List[ModelType]:
+        """Insert records with one multi-row INSERT ... RETURNING per chunk, ordered by id"""
+        rows = [self.to_row(obj_in) for obj_in in objs_in]
+        # RETURNING order is not guaranteed, asking for it falls back to one INSERT per row
+        statement = insert(self.model).returning(self.model)
+        created: List[ModelType] = []
+        for chunk in chunked(rows, chunk_size):
+            created.extend(db.scalars(statement, chunk).all())
+        return sorted(created, key=lambda obj: obj.id)
+
+    def export_statement(self) -> Select:
+        """Plain column select of every record, for streaming exports"""
+        return select(*self.model.__table__.columns).order_by(self.model.id)
+
+    def get_by_id(
+        self, db: Session, *, id: int, options: Sequence[Any] = ()
+    ) -> Optional[ModelType]:
+        return db.query(self.model).filter(self.model.id == id).options(*options).first()
+
+    def version_statement(self) -> Select:
+        """ID and row version of versioned records, with the versions of the rows their documents embed"""
+        return select(self.model.id, self.model.version)
+
+    def get_versions(self, db: Session, *, id: int) -> Optional[tuple]:
+        """Row versions of a record, read as plain columns without loading it"""
+        row = db.execute(self.version_statement().where(self.model.id == id)).first()
+        return tuple(row) if row is not None else None
+
+    def get_page_versions(self, db: Session, *, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+        """Total and row versions of a page of records ordered by id"""
+        total = db.scalar(select(func.count()).select_from(self.model))
+        rows = db.execute(self.version_statement().order_by(self.model.id).limit(limit).offset(offset))
+        return total, [tuple(row) for row in rows]
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        options: Sequence[Any] = ()
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return db.query(self.model).options(*options).offset(skip).limit(limit).all()
+
+    def get_by_ids(self, db: Session, *, ids: Sequence[int]) -> Dict[int, ModelType]:
+        """Records among the given IDs, by ID, one IN query per chunk"""
+        records: Dict[int, ModelType] = {}
+        for chunk in chunked(list(set(ids))):
+            records.update((obj.id, obj) for obj in db.scalars(select(self.model).where(self.model.id.in_(chunk))))
+        return records
 
     def update(
         self,
@@ -76,8 +145,7 @@ class CRUDBase(BaseRepository[ModelType, CreateSchemaType, UpdateSchemaType]):
         for field, value in obj_data.items():
             setattr(db_obj, field, value)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        db.flush()
         return db_obj
 
     def delete(self, db: Session, *, id: int) -> ModelType:
@@ -85,5 +153,76 @@ class CRUDBase(BaseRepository[ModelType, CreateSchemaType, UpdateSchemaType]):
         if obj is None:
             raise ValueError(f"Object with id {id} not found")
         db.delete(obj)
-        db.commit()
+        db.flush()
+        return obj
+
+
+class AsyncCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """Base CRUD operations implementation on top of AsyncSession, writes only flush"""
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        obj_data = obj_in.model_dump()
+        db_obj = self.model(**obj_data)
+        db.add(db_obj)
+        await db.flush()
+        return db_obj
+
+    async def get_by_id(
+        self, db: AsyncSession, *, id: int, options: Sequence[Any] = ()
+    ) -> Optional[ModelType]:
+        statement = select(self.model).where(self.model.id == id).options(*options)
+        result = await db.execute(statement)
+        return result.scalars().first()
+
+    def version_statement(self) -> Select:
+        """ID and row version of versioned records, with the versions of the rows their documents embed"""
+        return select(self.model.id, self.model.version)
+
+    async def get_versions(self, db: AsyncSession, *, id: int) -> Optional[tuple]:
+        """Row versions of a record, read as plain columns without loading it"""
+        result = await db.execute(self.version_statement().where(self.model.id == id))
+        row = result.first()
+        return tuple(row) if row is not None else None
+
+    async def get_page_versions(self, db: AsyncSession, *, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+        """Total and row versions of a page of records ordered by id"""
+        total = await db.scalar(select(func.count()).select_from(self.model))
+        result = await db.execute(self.version_statement().order_by(self.model.id).limit(limit).offset(offset))
+        return total, [tuple(row) for row in result]
+
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        options: Sequence[Any] = ()
+    ) -> List[ModelType]:
+        statement = select(self.model).options(*options).offset(skip).limit(limit)
+        result = await db.execute(statement)
+        return list(result.scalars().all())
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: UpdateSchemaType
+    ) -> ModelType:
+        obj_data = obj_in.model_dump(exclude_unset=True)
+        for field, value in obj_data.items():
+            setattr(db_obj, field, value)
+        db.add(db_obj)
+        await db.flush()
+        return db_obj
+
+    async def delete(self, db: AsyncSession, *, id: int) -> ModelType:
+        obj = await self.get_by_id(db, id=id)
+        if obj is None:
+            raise ValueError(f"Object with id {id} not found")
+        await db.delete(obj)
+        await db.flush()
         return obj
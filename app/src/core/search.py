@@ -0,0 +1,104 @@
+"""
+Name search
+Substring search on a text column served by an index instead of a
+sequential ILIKE '%x%' scan:
+- PostgreSQL: pg_trgm GIN index, ILIKE is answered from the index and
+  matches are ranked by trigram similarity
+- SQLite: FTS5 external content table with the trigram tokenizer, kept in
+  sync by triggers, matches ranked by bm25
+Both need at least 3 characters, shorter terms fall back to ILIKE.
+"""
+
+from dataclasses import dataclass
+from typing import Any, List
+
+from sqlalchemy import DDL, Select, Table, column, event, func, select, table
+from sqlalchemy.engine import Dialect
+
+# Trigram indexes only apply to terms of at least this many characters
+MIN_TRIGRAM_LENGTH = 3
+
+
+@dataclass(frozen=True)
+class NameSearchIndex:
+    """Search index on one text column of a model with an integer id"""
+
+    model: Any
+    column: str
+
+    @property
+    def table(self) -> Table:
+        return self.model.__table__
+
+    @property
+    def name(self) -> str:
+        return f"{self.table.name}_{self.column}_search"
+
+    def create_statements(self, dialect_name: str) -> List[str]:
+        """DDL building and filling the index, nothing on other dialects"""
+        table_name, column_name, name = self.table.name, self.column, self.name
+        if dialect_name == "postgresql":
+            return [
+                "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table_name} USING gin ({column_name} gin_trgm_ops)",
+            ]
+        if dialect_name == "sqlite":
+            return [
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5("
+                f"{column_name}, content='{table_name}', content_rowid='id', tokenize='trigram')",
+                f"CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {table_name} BEGIN "
+                f"INSERT INTO {name}(rowid, {column_name}) VALUES (new.id, new.{column_name}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {table_name} BEGIN "
+                f"INSERT INTO {name}({name}, rowid, {column_name}) VALUES ('delete', old.id, old.{column_name}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE OF {column_name} ON {table_name} BEGIN "
+                f"INSERT INTO {name}({name}, rowid, {column_name}) VALUES ('delete', old.id, old.{column_name}); "
+                f"INSERT INTO {name}(rowid, {column_name}) VALUES (new.id, new.{column_name}); END",
+                # Index the rows written before the table existed
+                f"INSERT INTO {name}({name}) VALUES ('rebuild')",
+            ]
+        return []
+
+    def drop_statements(self, dialect_name: str) -> List[str]:
+        """DDL removing the index"""
+        name = self.name
+        if dialect_name == "postgresql":
+            return [f"DROP INDEX IF EXISTS {name}"]
+        if dialect_name == "sqlite":
+            return [f"DROP TRIGGER IF EXISTS {name}_{suffix}" for suffix in ("ai", "ad", "au")] + [
+                f"DROP TABLE IF EXISTS {name}"
+            ]
+        return []
+
+    def statement(self, dialect: Dialect, term: str) -> Select:
+        """Models whose column contains the term ignoring case, best matches first"""
+        searched = getattr(self.model, self.column)
+        pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        contains = searched.ilike(pattern, escape="\\")
+        statement = select(self.model)
+        if len(term) < MIN_TRIGRAM_LENGTH:
+            return statement.where(contains).order_by(self.model.id)
+
+        if dialect.name == "postgresql":
+            return statement.where(contains).order_by(
+                func.similarity(searched, term).desc(), self.model.id
+            )
+        if dialect.name == "sqlite":
+            # A quoted FTS5 string is matched as a substring by the trigram tokenizer
+            match = '"' + term.replace('"', '""') + '"'
+            fts = table(self.name, column("rowid"), column("rank"), column(self.column))
+            return (
+                statement.join(fts, fts.c.rowid == self.model.id)
+                .where(fts.c[self.column].op("MATCH")(match))
+                .order_by(fts.c.rank, self.model.id)
+            )
+        return statement.where(contains).order_by(self.model.id)
+
+
+def install(index: NameSearchIndex) -> NameSearchIndex:
+    """Build the index alongside its table in metadata.create_all() and drop it with it"""
+    for dialect_name in ("postgresql", "sqlite"):
+        for statement in index.create_statements(dialect_name):
+            event.listen(index.table, "after_create", DDL(statement).execute_if(dialect=dialect_name))
+        for statement in index.drop_statements(dialect_name):
+            event.listen(index.table, "before_drop", DDL(statement).execute_if(dialect=dialect_name))
+    return index
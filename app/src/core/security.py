@@ -3,8 +3,14 @@ Security module for FastAPI application
 JWT token handling and authentication utilities
 """
 
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -13,8 +19,8 @@ from passlib.context import CryptContext
 
 from .config import settings
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing, hashes of another cost are rehashed on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
@@ -30,6 +36,67 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasherBusyError(Exception):
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        super().__init__(f"{max_pending} password hashes already pending")
+
+
+class PasswordHasher:
+    """
+    bcrypt off the event loop, on a bounded thread pool (bcrypt releases the GIL).
+    At most max_pending hashes run or wait at once, past that callers are refused
+    rather than queued, so a login storm cannot hold every request of the worker.
+    """
+
+    def __init__(self, context: CryptContext, workers: int, max_pending: int):
+        self.context = context
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hasher")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> "Future[Any]":
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHasherBusyError(self.max_pending)
+            self._pending += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: "Future[Any]") -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(self.context.hash, password))
+
+    def hash_blocking(self, password: str) -> str:
+        """Hash on the pool and wait, for sync code already off the event loop"""
+        return self.submit(self.context.hash, password).result()
+
+    async def verify(self, password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        Whether the password matches, and its new hash when the stored one has
+        another cost. Without a stored hash a dummy one is checked, so unknown
+        emails take as long as wrong passwords.
+        """
+        if hashed_password is None:
+            await asyncio.wrap_future(self.submit(self.context.dummy_verify))
+            return False, None
+        return await asyncio.wrap_future(self.submit(self.context.verify_and_update, password, hashed_password))
+
+
+password_hasher = PasswordHasher(
+    pwd_context, workers=settings.PASSWORD_HASH_WORKERS, max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token with expiration"""
     to_encode = data.copy()
@@ -46,6 +113,80 @@ def decode_token(token: str) -> dict:
     return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
 
 
+class TokenCache:
+    """
+    Claims of verified tokens keyed by the SHA-256 of the token, least recently
+    used first out past max_entries. An entry lives until the token's exp, tokens
+    without exp are not cached. Revoked tokens are refused until their exp.
+    Entries are per worker process, as is revocation.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+        self._revoked: Dict[bytes, float] = {}
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def verify(self, token: str) -> dict:
+        """Claims of the token, decoded and checked only when not cached"""
+        key = self.key(token)
+        now = time.time()
+        with self._lock:
+            if key in self._revoked:
+                raise jwt.JWTError("Token revoked")
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        claims = decode_token(token)
+        expires = claims.get("exp")
+        if self.max_entries > 0 and isinstance(expires, (int, float)) and expires > now:
+            with self._lock:
+                if key not in self._revoked:
+                    self._entries[key] = (expires, claims)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        return claims
+
+    def revoke(self, token: str) -> None:
+        """Evict the token and refuse it until it expires (for ever without exp)"""
+        key = self.key(token)
+        try:
+            expires = float(jwt.get_unverified_claims(token).get("exp") or "inf")
+        except (jwt.JWTError, TypeError, ValueError):
+            expires = float("inf")
+        now = time.time()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._revoked = {revoked: at for revoked, at in self._revoked.items() if at > now}
+            if expires > now:
+                self._revoked[key] = expires
+
+    def evict(self, token: str) -> None:
+        """Drop the cached claims of a token, the next request verifies it again"""
+        with self._lock:
+            self._entries.pop(self.key(token), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._revoked.clear()
+            self.hits = self.misses = 0
+
+
+token_cache = TokenCache(max_entries=settings.TOKEN_CACHE_SIZE)
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     """Get current user from JWT token"""
     credentials_exception = HTTPException(
@@ -54,7 +195,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = decode_token(token)
+        payload = token_cache.verify(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
@@ -0,0 +1,63 @@
+"""
+Unit of work
+Repositories only flush, the outermost unit of work commits once, so a
+service call (or an endpoint combining several) runs in a single transaction
+"""
+
+from contextlib import asynccontextmanager, contextmanager
+from functools import wraps
+from typing import Any, AsyncIterator, Callable, Iterator, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+UNIT_OF_WORK_KEY = "unit_of_work"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """Commit on success and roll back on error, nested blocks join the outer one"""
+    if db.info.get(UNIT_OF_WORK_KEY):
+        yield db
+        return
+
+    db.info[UNIT_OF_WORK_KEY] = True
+    try:
+        yield db
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.info.pop(UNIT_OF_WORK_KEY, None)
+
+
+@asynccontextmanager
+async def async_unit_of_work(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """unit_of_work for AsyncSession, shares the nesting flag of the sync session"""
+    if db.info.get(UNIT_OF_WORK_KEY):
+        yield db
+        return
+
+    db.info[UNIT_OF_WORK_KEY] = True
+    try:
+        yield db
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+    finally:
+        db.info.pop(UNIT_OF_WORK_KEY, None)
+
+
+def transactional(method: F) -> F:
+    """Run a service method taking (self, db, ...) inside a unit of work"""
+
+    @wraps(method)
+    def wrapper(self: Any, db: Session, *args: Any, **kwargs: Any) -> Any:
+        with unit_of_work(db):
+            return method(self, db, *args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
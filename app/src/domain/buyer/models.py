@@ -2,6 +2,7 @@ from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.src.core.database import Base
+from app.src.core.search import NameSearchIndex, install
 
 
 class Buyer(Base):
@@ -15,5 +16,12 @@ class Buyer(Base):
     address_city = Column(String)
     address_district = Column(String)
     address_state = Column(String)
+    version = Column(Integer, nullable=False, server_default="1")
 
     sale = relationship("Sale", back_populates="buyer")
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+# Trigram index behind the search by name, built with the table
+name_search = install(NameSearchIndex(Buyer, "name"))
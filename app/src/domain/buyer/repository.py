@@ -1,8 +1,11 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence, Set
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.src.core.repository import CRUDBase
+from app.src.core.bulk import chunked
+from app.src.core.repository import AsyncCRUDBase, CRUDBase
 from . import models, schemas
 
 
@@ -10,13 +13,13 @@ class BuyerRepository(CRUDBase[models.Buyer, schemas.BuyerCreate, schemas.BuyerU
     def __init__(self):
         super().__init__(models.Buyer)
 
-    def create(self, db: Session, *, obj_in: schemas.BuyerCreate) -> models.Buyer:
-        """Create buyer with address flattening"""
+    def to_row(self, obj_in: schemas.BuyerCreate) -> dict:
+        """Buyer columns with address flattening"""
         obj_data = obj_in.model_dump()
         address_data = obj_data.pop("address", {})
         
         # Flatten address into buyer fields
-        buyer_data = {
+        return {
             **obj_data,
             "address_cep": address_data.get("cep"),
             "address_public_place": address_data.get("public_place"),
@@ -24,23 +27,44 @@ class BuyerRepository(CRUDBase[models.Buyer, schemas.BuyerCreate, schemas.BuyerU
             "address_district": address_data.get("district"),
             "address_state": address_data.get("state"),
         }
-        
-        db_obj = self.model(**buyer_data)
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+
+    def get_existing_phones(self, db: Session, *, phones: Sequence[str]) -> Set[str]:
+        """Phones among the given ones already used by a buyer"""
+        existing: Set[str] = set()
+        for chunk in chunked(phones):
+            existing.update(db.scalars(select(self.model.phone).where(self.model.phone.in_(chunk))))
+        return existing
 
     def get_by_phone(self, db: Session, *, phone: str) -> Optional[models.Buyer]:
         """Get buyer by phone number"""
         return db.query(self.model).filter(self.model.phone == phone).first()
 
-    def get_by_name(self, db: Session, *, name: str) -> List[models.Buyer]:
-        """Get buyers by name (partial match)"""
-        return db.query(self.model).filter(
-            self.model.name.ilike(f"%{name}%")
-        ).all()
+    def get_by_name(
+        self, db: Session, *, name: str, skip: int = 0, limit: int = 100
+    ) -> List[models.Buyer]:
+        """Get buyers by name (partial match), best matches first"""
+        statement = models.name_search.statement(db.get_bind().dialect, name)
+        return list(db.scalars(statement.offset(skip).limit(limit)))
+
+
+class AsyncBuyerRepository(AsyncCRUDBase[models.Buyer, schemas.BuyerCreate, schemas.BuyerUpdate]):
+    def __init__(self):
+        super().__init__(models.Buyer)
+
+    async def get_by_phone(self, db: AsyncSession, *, phone: str) -> Optional[models.Buyer]:
+        """Get buyer by phone number"""
+        result = await db.execute(select(self.model).where(self.model.phone == phone))
+        return result.scalars().first()
+
+    async def get_by_name(
+        self, db: AsyncSession, *, name: str, skip: int = 0, limit: int = 100
+    ) -> List[models.Buyer]:
+        """Get buyers by name (partial match), best matches first"""
+        statement = models.name_search.statement(db.get_bind().dialect, name)
+        result = await db.execute(statement.offset(skip).limit(limit))
+        return list(result.scalars().all())
 
 
-# Create a singleton instance
+# Create singleton instances
 buyer_repository = BuyerRepository()
+async_buyer_repository = AsyncBuyerRepository()
@@ -45,5 +45,11 @@ class Buyer(BuyerBase):
     address_city: str
     address_district: str
     address_state: str
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
+
+    @property
+    def versions(self) -> tuple:
+        """Row versions behind the ETag of the document"""
+        return (self.id, self.version)
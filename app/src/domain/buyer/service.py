@@ -1,15 +1,27 @@
+from typing import Iterator, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination.ext.sqlalchemy import apaginate, paginate
 
-from . import exceptions, repository, schemas
+from app.src.core.bulk import BulkResult, BulkRows
+from app.src.core.cache import entity_cache
+from app.src.core.database import run_sync
+from app.src.core.export import ExportFormat, stream_rows
+from app.src.core.pagination import CursorPage, CursorParams, paginate_cursor
+from app.src.core.replicas import read_primary
+from app.src.core.unit_of_work import transactional
+from . import exceptions, models, repository, schemas
 
 
 class BuyerService:
     def __init__(self):
         self.buyer_repository = repository.buyer_repository
+        self.cache = entity_cache
 
+    @transactional
     def create_buyer(self, db: Session, buyer: schemas.BuyerCreate) -> schemas.Buyer:
         """Create a new buyer"""
         # Check if buyer with same phone already exists
@@ -21,19 +33,59 @@ class BuyerService:
         db_buyer = self.buyer_repository.create(db, obj_in=buyer)
         return db_buyer
 
+    @transactional
+    def create_buyers(self, db: Session, buyers: BulkRows[schemas.BuyerCreate]) -> BulkResult[schemas.Buyer]:
+        """Create buyers in bulk, rows repeating a phone are rejected"""
+        seen = self.buyer_repository.get_existing_phones(
+            db, phones=[buyer.phone for _, buyer in buyers.rows]
+        )
+        new_buyers = []
+        for index, buyer in buyers.rows:
+            if buyer.phone in seen:
+                buyers.reject(index, str(exceptions.BuyerAlreadyExistsError("phone", buyer.phone)))
+                continue
+            seen.add(buyer.phone)
+            new_buyers.append(buyer)
+
+        return buyers.result(self.buyer_repository.create_many(db, objs_in=new_buyers))
+
     def get_buyer(self, db: Session, buyer_id: int) -> schemas.Buyer:
-        """Get buyer by ID"""
-        db_buyer = self.buyer_repository.get_by_id(db, id=buyer_id)
-        if db_buyer is None:
+        """Get buyer by ID, read through the entity cache"""
+        def load():
+            with read_primary(db):
+                db_buyer = self.buyer_repository.get_by_id(db, id=buyer_id)
+                if db_buyer is None:
+                    raise exceptions.BuyerNotFoundError(buyer_id)
+                return db_buyer
+
+        return self.cache.get_or_load("buyer", buyer_id, schemas.Buyer, load)
+
+    def get_buyer_versions(self, db: Session, buyer_id: int) -> tuple:
+        """Row versions behind the ETag of a buyer, read without loading it"""
+        versions = self.buyer_repository.get_versions(db, id=buyer_id)
+        if versions is None:
             raise exceptions.BuyerNotFoundError(buyer_id)
-        
-        return db_buyer
+        return versions
+
+    def export_buyers(self, db: Session, export_format: ExportFormat) -> Iterator[str]:
+        """Stream all buyers as NDJSON or CSV"""
+        statement = self.buyer_repository.export_statement()
+        return stream_rows(db.get_bind(), statement, export_format)
 
     def get_buyers(self, db: Session) -> Page[schemas.Buyer]:
         """Get all buyers with pagination"""
         from .models import Buyer
         return paginate(db, select(Buyer).order_by(Buyer.id))
 
+    def get_buyers_versions(self, db: Session, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+        """Total and row versions of a page of buyers, behind the ETag of the page"""
+        return self.buyer_repository.get_page_versions(db, limit=limit, offset=offset)
+
+    def get_buyers_page(self, db: Session, params: CursorParams) -> CursorPage[schemas.Buyer]:
+        """Get a page of buyers after a cursor"""
+        return paginate_cursor(db, select(models.Buyer), [models.Buyer.id], params)
+
+    @transactional
     def update_buyer(self, db: Session, buyer_id: int, buyer_update: schemas.BuyerUpdate) -> schemas.Buyer:
         """Update buyer"""
         db_buyer = self.buyer_repository.get_by_id(db, id=buyer_id)
@@ -48,21 +100,82 @@ class BuyerService:
         
         # Update buyer
         updated_buyer = self.buyer_repository.update(db, db_obj=db_buyer, obj_in=buyer_update)
-        return schemas.Buyer.from_model(updated_buyer)
+        self.cache.invalidate_on_commit(db, "buyer", buyer_id)
+        return updated_buyer
 
+    @transactional
     def delete_buyer(self, db: Session, buyer_id: int) -> bool:
         """Delete buyer"""
         try:
             self.buyer_repository.delete(db, id=buyer_id)
-            return True
         except ValueError:
             raise exceptions.BuyerNotFoundError(buyer_id)
+        self.cache.invalidate_on_commit(db, "buyer", buyer_id)
+        return True
 
-    def search_buyers_by_name(self, db: Session, name: str) -> list[schemas.Buyer]:
-        """Search buyers by name"""
-        db_buyers = self.buyer_repository.get_by_name(db, name=name)
+    def search_buyers_by_name(
+        self, db: Session, name: str, skip: int = 0, limit: int = 100
+    ) -> list[schemas.Buyer]:
+        """Search buyers by name, best matches first"""
+        db_buyers = self.buyer_repository.get_by_name(db, name=name, skip=skip, limit=limit)
         return db_buyers
 
 
-# Create singleton instance
+class AsyncBuyerService:
+    """
+    BuyerService on AsyncSession.
+    Reads query natively, writes run the sync service rules through run_sync.
+    """
+
+    def __init__(self, service: BuyerService):
+        self.service = service
+        self.buyer_repository = repository.async_buyer_repository
+
+    async def create_buyer(self, db: AsyncSession, buyer: schemas.BuyerCreate) -> schemas.Buyer:
+        """Create a new buyer"""
+        return await run_sync(db, self.service.create_buyer, buyer, schema=schemas.Buyer)
+
+    async def get_buyer(self, db: AsyncSession, buyer_id: int) -> schemas.Buyer:
+        """Get buyer by ID"""
+        db_buyer = await self.buyer_repository.get_by_id(db, id=buyer_id)
+        if db_buyer is None:
+            raise exceptions.BuyerNotFoundError(buyer_id)
+
+        return db_buyer
+
+    async def get_buyer_versions(self, db: AsyncSession, buyer_id: int) -> tuple:
+        """Row versions behind the ETag of a buyer, read without loading it"""
+        versions = await self.buyer_repository.get_versions(db, id=buyer_id)
+        if versions is None:
+            raise exceptions.BuyerNotFoundError(buyer_id)
+        return versions
+
+    async def get_buyers(self, db: AsyncSession) -> Page[schemas.Buyer]:
+        """Get all buyers with pagination"""
+        from .models import Buyer
+        return await apaginate(db, select(Buyer).order_by(Buyer.id))
+
+    async def get_buyers_versions(self, db: AsyncSession, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+        """Total and row versions of a page of buyers, behind the ETag of the page"""
+        return await self.buyer_repository.get_page_versions(db, limit=limit, offset=offset)
+
+    async def update_buyer(self, db: AsyncSession, buyer_id: int, buyer_update: schemas.BuyerUpdate) -> schemas.Buyer:
+        """Update buyer"""
+        return await run_sync(
+            db, self.service.update_buyer, buyer_id, buyer_update, schema=schemas.Buyer
+        )
+
+    async def delete_buyer(self, db: AsyncSession, buyer_id: int) -> bool:
+        """Delete buyer"""
+        return await run_sync(db, self.service.delete_buyer, buyer_id)
+
+    async def search_buyers_by_name(
+        self, db: AsyncSession, name: str, skip: int = 0, limit: int = 100
+    ) -> list[schemas.Buyer]:
+        """Search buyers by name, best matches first"""
+        return await self.buyer_repository.get_by_name(db, name=name, skip=skip, limit=limit)
+
+
+# Create singleton instances
 buyer_service = BuyerService()
+async_buyer_service = AsyncBuyerService(buyer_service)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, UniqueConstraint
+from sqlalchemy import Column, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from app.src.core.database import Base
@@ -11,7 +11,19 @@ class Car(Base):
     name = Column(String, index=True)
     year = Column(Integer, index=True)
     brand = Column(String, index=True)
+    # Row version, checked and bumped by ORM updates, behind the ETags of cars and their stocks and sales
+    version = Column(Integer, nullable=False, server_default="1")
 
     stock = relationship("Stock", back_populates="car")
     sale = relationship("Sale", back_populates="car")
-    UniqueConstraint("year", "name", "brand", name="cars_year_name_brand_uk_idx1")
+
+    __table_args__ = (
+        # Natural key, backs duplicate checks and INSERT ... ON CONFLICT
+        Index("cars_year_name_brand_uk_idx1", "year", "name", "brand", unique=True),
+        # Case-insensitive brand search seeks on (lower(brand), id), already in page order.
+        # Prefix searches are ranges on lower(brand), exact only under code point
+        # ordering: SQLite's BINARY collation, or a PostgreSQL database created with
+        # LC_COLLATE "C" (or "C.UTF-8"); other collations can miss or add matches
+        Index("ix_cars_lower_brand_id", func.lower(brand), id),
+    )
+    __mapper_args__ = {"version_id_col": version}
@@ -1,23 +1,126 @@
-from typing import List, Optional
+import sys
+from typing import List, Optional, Sequence, Set, Tuple
 
+from sqlalchemy import ColumnElement, and_, exists, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.src.core.repository import CRUDBase
+from app.src.core.bulk import chunked
+from app.src.core.repository import UPSERT_INSERTS, AsyncCRUDBase, CRUDBase
 from . import models, schemas
 
 
+def brand_criteria(column: ColumnElement, brand: str, prefix: bool) -> ColumnElement:
+    """
+    lower(brand) equal to, or starting with, the searched brand.
+    A prefix is matched as the range [prefix, next prefix) instead of LIKE,
+    so both use the lower(brand) index on every backend. The range holds
+    exactly the strings starting with the prefix only under code point
+    ordering, see the collation note of ix_cars_lower_brand_id.
+    """
+    value = brand.lower()
+    lowered = func.lower(column)
+    if not prefix or not value:
+        return lowered == value
+    # The last character below U+10FFFF is bumped, the maximal ones after it dropped
+    stem = value.rstrip(chr(sys.maxunicode))
+    if not stem:
+        return lowered >= value
+    upper_bound = stem[:-1] + chr(ord(stem[-1]) + 1)
+    return and_(lowered >= value, lowered < upper_bound)
+
+
 class CarRepository(CRUDBase[models.Car, schemas.CarCreate, schemas.CarUpdate]):
     def __init__(self):
         super().__init__(models.Car)
 
-    def get_by_brand(self, db: Session, *, brand: str) -> List[models.Car]:
-        """Get cars by brand"""
-        return db.query(self.model).filter(self.model.brand.ilike(f"%{brand}%")).all()
+    @property
+    def natural_key(self) -> tuple:
+        """Columns of the unique (year, name, brand) index"""
+        return (self.model.year, self.model.name, self.model.brand)
+
+    def exists_by_key(
+        self, db: Session, *, name: str, year: int, brand: str, exclude_id: Optional[int] = None
+    ) -> bool:
+        """Whether another car has this name, year and brand, one unique index lookup"""
+        criteria = [self.model.year == year, self.model.name == name, self.model.brand == brand]
+        if exclude_id is not None:
+            criteria.append(self.model.id != exclude_id)
+        return db.scalar(select(exists().where(*criteria)))
+
+    def create_if_absent(self, db: Session, *, obj_in: schemas.CarCreate) -> Optional[models.Car]:
+        """
+        Insert a car unless its name, year and brand are taken, None if they are.
+        Uses INSERT ... ON CONFLICT DO NOTHING RETURNING where the dialect has it,
+        so concurrent creates cannot both pass the check.
+        """
+        upsert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if upsert is None:
+            if self.exists_by_key(db, name=obj_in.name, year=obj_in.year, brand=obj_in.brand):
+                return None
+            return self.create(db, obj_in=obj_in)
+
+        statement = (
+            upsert(self.model)
+            .values(**self.to_row(obj_in))
+            .on_conflict_do_nothing(index_elements=[column.key for column in self.natural_key])
+            .returning(self.model)
+        )
+        return db.scalars(statement).first()
+
+    def get_by_brand(
+        self, db: Session, *, brand: str, prefix: bool = False, skip: int = 0, limit: int = 100
+    ) -> List[models.Car]:
+        """Get cars by brand, ignoring case, ordered by id"""
+        return db.query(self.model).filter(
+            brand_criteria(self.model.brand, brand, prefix)
+        ).order_by(self.model.id).offset(skip).limit(limit).all()
+
+    def get_ids_by_brand(self, db: Session, *, brand: str) -> Set[int]:
+        """IDs of the cars of a brand, ignoring case, read from the lower(brand) index"""
+        return set(db.scalars(select(self.model.id).where(brand_criteria(self.model.brand, brand, False))))
 
     def get_by_year(self, db: Session, *, year: int) -> List[models.Car]:
         """Get cars by year"""
         return db.query(self.model).filter(self.model.year == year).all()
 
+    def get_existing_keys(
+        self, db: Session, *, keys: Sequence[Tuple[str, int, str]]
+    ) -> Set[Tuple[str, int, str]]:
+        """(name, year, brand) keys among the given ones already used by a car"""
+        columns = tuple_(self.model.name, self.model.year, self.model.brand)
+        existing: Set[Tuple[str, int, str]] = set()
+        for chunk in chunked(keys):
+            rows = db.execute(
+                select(self.model.name, self.model.year, self.model.brand).where(columns.in_(chunk))
+            )
+            existing.update(tuple(row) for row in rows)
+        return existing
+
+
+class AsyncCarRepository(AsyncCRUDBase[models.Car, schemas.CarCreate, schemas.CarUpdate]):
+    def __init__(self):
+        super().__init__(models.Car)
+
+    async def get_by_brand(
+        self, db: AsyncSession, *, brand: str, prefix: bool = False, skip: int = 0, limit: int = 100
+    ) -> List[models.Car]:
+        """Get cars by brand, ignoring case"""
+        result = await db.execute(
+            select(self.model)
+            .where(brand_criteria(self.model.brand, brand, prefix))
+            .order_by(self.model.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_by_year(self, db: AsyncSession, *, year: int) -> List[models.Car]:
+        """Get cars by year"""
+        result = await db.execute(select(self.model).where(self.model.year == year))
+        return list(result.scalars().all())
+
 
-# Create a singleton instance
+# Create singleton instances
 car_repository = CarRepository()
+async_car_repository = AsyncCarRepository()
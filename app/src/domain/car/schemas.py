@@ -22,5 +22,11 @@ class Car(CarBase):
     name: str
     year: int
     brand: str
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
+
+    @property
+    def versions(self) -> tuple:
+        """Row versions behind the ETag of the document"""
+        return (self.id, self.version)
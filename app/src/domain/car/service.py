@@ -1,42 +1,90 @@
+from typing import Iterator, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination.ext.sqlalchemy import apaginate, paginate
 
-from . import exceptions, repository, schemas
+from app.src.core.bulk import BulkResult, BulkRows
+from app.src.core.cache import entity_cache
+from app.src.core.database import run_sync
+from app.src.core.export import ExportFormat, stream_rows
+from app.src.core.pagination import CursorPage, CursorParams, paginate_cursor
+from app.src.core.replicas import read_primary
+from app.src.core.unit_of_work import transactional
+from app.src.domain.report.service import report_service
+from . import exceptions, models, repository, schemas
 
 
 class CarService:
     def __init__(self):
         self.car_repository = repository.car_repository
+        self.cache = entity_cache
 
+    @transactional
     def create_car(self, db: Session, car: schemas.CarCreate) -> schemas.Car:
         """Create a new car"""
-        # Check if car with same name, year, and brand already exists
-        existing_cars = self.car_repository.get_multi(db)
-        for existing_car in existing_cars:
-            if (existing_car.name == car.name and 
-                existing_car.year == car.year and 
-                existing_car.brand == car.brand):
-                raise exceptions.CarAlreadyExistsError("name, year, brand", f"{car.name} {car.year} {car.brand}")
-        
-        # Create car
-        db_car = self.car_repository.create(db, obj_in=car)
+        db_car = self.car_repository.create_if_absent(db, obj_in=car)
+        if db_car is None:
+            raise exceptions.CarAlreadyExistsError("name, year, brand", f"{car.name} {car.year} {car.brand}")
         return db_car
 
+    @transactional
+    def create_cars(self, db: Session, cars: BulkRows[schemas.CarCreate]) -> BulkResult[schemas.Car]:
+        """Create cars in bulk, rows repeating a name, year and brand are rejected"""
+        seen = self.car_repository.get_existing_keys(
+            db, keys=[(car.name, car.year, car.brand) for _, car in cars.rows]
+        )
+        new_cars = []
+        for index, car in cars.rows:
+            key = (car.name, car.year, car.brand)
+            if key in seen:
+                error = exceptions.CarAlreadyExistsError("name, year, brand", f"{car.name} {car.year} {car.brand}")
+                cars.reject(index, str(error))
+                continue
+            seen.add(key)
+            new_cars.append(car)
+
+        return cars.result(self.car_repository.create_many(db, objs_in=new_cars))
+
     def get_car(self, db: Session, car_id: int) -> schemas.Car:
-        """Get car by ID"""
-        db_car = self.car_repository.get_by_id(db, id=car_id)
-        if db_car is None:
+        """Get car by ID, read through the entity cache"""
+        def load():
+            with read_primary(db):
+                db_car = self.car_repository.get_by_id(db, id=car_id)
+                if db_car is None:
+                    raise exceptions.CarNotFoundError(car_id)
+                return db_car
+
+        return self.cache.get_or_load("car", car_id, schemas.Car, load)
+
+    def get_car_versions(self, db: Session, car_id: int) -> tuple:
+        """Row versions behind the ETag of a car, read without loading it"""
+        versions = self.car_repository.get_versions(db, id=car_id)
+        if versions is None:
             raise exceptions.CarNotFoundError(car_id)
-        
-        return db_car
+        return versions
+
+    def export_cars(self, db: Session, export_format: ExportFormat) -> Iterator[str]:
+        """Stream all cars as NDJSON or CSV"""
+        statement = self.car_repository.export_statement()
+        return stream_rows(db.get_bind(), statement, export_format)
 
     def get_cars(self, db: Session) -> Page[schemas.Car]:
         """Get all cars with pagination"""
         from .models import Car
         return paginate(db, select(Car).order_by(Car.id))
 
+    def get_cars_versions(self, db: Session, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+        """Total and row versions of a page of cars, behind the ETag of the page"""
+        return self.car_repository.get_page_versions(db, limit=limit, offset=offset)
+
+    def get_cars_page(self, db: Session, params: CursorParams) -> CursorPage[schemas.Car]:
+        """Get a page of cars after a cursor"""
+        return paginate_cursor(db, select(models.Car), [models.Car.id], params)
+
+    @transactional
     def update_car(self, db: Session, car_id: int, car_update: schemas.CarUpdate) -> schemas.Car:
         """Update car"""
         db_car = self.car_repository.get_by_id(db, id=car_id)
@@ -44,38 +92,95 @@ class CarService:
             raise exceptions.CarNotFoundError(car_id)
         
         # Check if update would create duplicate
-        if any([car_update.name, car_update.year, car_update.brand]):
-            update_data = car_update.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(db_car, field, value)
-            
-            # Check for duplicates after applying updates
-            existing_cars = self.car_repository.get_multi(db)
-            for existing_car in existing_cars:
-                if (existing_car.id != car_id and
-                    existing_car.name == db_car.name and 
-                    existing_car.year == db_car.year and 
-                    existing_car.brand == db_car.brand):
-                    raise exceptions.CarAlreadyExistsError("name, year, brand", f"{db_car.name} {db_car.year} {db_car.brand}")
+        update_data = car_update.model_dump(exclude_unset=True)
+        if update_data.keys() & {"name", "year", "brand"}:
+            key = {field: update_data.get(field, getattr(db_car, field)) for field in ("name", "year", "brand")}
+            if self.car_repository.exists_by_key(db, **key, exclude_id=car_id):
+                raise exceptions.CarAlreadyExistsError("name, year, brand", f"{key['name']} {key['year']} {key['brand']}")
         
         # Update car
+        old_brand = db_car.brand
         updated_car = self.car_repository.update(db, db_obj=db_car, obj_in=car_update)
+        if updated_car.brand != old_brand:
+            # Rollups are keyed by brand, the sales of the car move with it
+            report_service.move_car_sales(db, car_id=car_id, old_brand=old_brand, new_brand=updated_car.brand)
+        self.cache.invalidate_on_commit(db, "car", car_id)
         return updated_car
 
+    @transactional
     def delete_car(self, db: Session, car_id: int) -> bool:
         """Delete car"""
         try:
             self.car_repository.delete(db, id=car_id)
-            return True
         except ValueError:
             raise exceptions.CarNotFoundError(car_id)
+        self.cache.invalidate_on_commit(db, "car", car_id)
+        return True
+
+    def search_cars_by_brand(
+        self, db: Session, brand: str, prefix: bool = False, skip: int = 0, limit: int = 100
+    ) -> list[schemas.Car]:
+        """Search cars by brand, ignoring case"""
+        return self.car_repository.get_by_brand(
+            db, brand=brand, prefix=prefix, skip=skip, limit=limit
+        )
+
+
+class AsyncCarService:
+    """
+    CarService on AsyncSession.
+    Reads query natively, writes run the sync service rules through run_sync.
+    """
+
+    def __init__(self, service: CarService):
+        self.service = service
+        self.car_repository = repository.async_car_repository
+
+    async def create_car(self, db: AsyncSession, car: schemas.CarCreate) -> schemas.Car:
+        """Create a new car"""
+        return await run_sync(db, self.service.create_car, car, schema=schemas.Car)
+
+    async def get_car(self, db: AsyncSession, car_id: int) -> schemas.Car:
+        """Get car by ID"""
+        db_car = await self.car_repository.get_by_id(db, id=car_id)
+        if db_car is None:
+            raise exceptions.CarNotFoundError(car_id)
+
+        return db_car
+
+    async def get_car_versions(self, db: AsyncSession, car_id: int) -> tuple:
+        """Row versions behind the ETag of a car, read without loading it"""
+        versions = await self.car_repository.get_versions(db, id=car_id)
+        if versions is None:
+            raise exceptions.CarNotFoundError(car_id)
+        return versions
+
+    async def get_cars(self, db: AsyncSession) -> Page[schemas.Car]:
+        """Get all cars with pagination"""
+        from .models import Car
+        return await apaginate(db, select(Car).order_by(Car.id))
+
+    async def get_cars_versions(self, db: AsyncSession, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+        """Total and row versions of a page of cars, behind the ETag of the page"""
+        return await self.car_repository.get_page_versions(db, limit=limit, offset=offset)
+
+    async def update_car(self, db: AsyncSession, car_id: int, car_update: schemas.CarUpdate) -> schemas.Car:
+        """Update car"""
+        return await run_sync(db, self.service.update_car, car_id, car_update, schema=schemas.Car)
+
+    async def delete_car(self, db: AsyncSession, car_id: int) -> bool:
+        """Delete car"""
+        return await run_sync(db, self.service.delete_car, car_id)
 
-    def search_cars_by_brand(self, db: Session, brand: str) -> list[schemas.Car]:
-        """Search cars by brand"""
-        db_cars = self.car_repository.get_multi(db)
-        filtered_cars = [car for car in db_cars if car.brand.lower() == brand.lower()]
-        return filtered_cars
+    async def search_cars_by_brand(
+        self, db: AsyncSession, brand: str, prefix: bool = False, skip: int = 0, limit: int = 100
+    ) -> list[schemas.Car]:
+        """Search cars by brand, ignoring case"""
+        return await self.car_repository.get_by_brand(
+            db, brand=brand, prefix=prefix, skip=skip, limit=limit
+        )
 
 
-# Create singleton instance
+# Create singleton instances
 car_service = CarService()
+async_car_service = AsyncCarService(car_service)
@@ -0,0 +1,149 @@
+"""
+Seller leaderboard
+Sales per seller for the current month kept in process memory: committed
+sales add to the counts, reads serve a cached top K rebuilt with a heap
+only after a change. The counts are seeded from the sales rollups and
+reconciled with them periodically, which also brings in the sales of
+other worker processes.
+"""
+
+import asyncio
+import heapq
+import logging
+import threading
+from datetime import date, datetime
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.src.core.config import settings
+from app.src.core.database import SessionLocal
+from . import repository
+
+logger = logging.getLogger(__name__)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+class SellerLeaderboard:
+    """Top sellers of the month by number of sales"""
+
+    def __init__(self, size: int = settings.LEADERBOARD_SIZE):
+        self.size = size
+        self.month = month_start(datetime.utcnow().date())
+        self.seeded = False
+        self._counts: Dict[int, int] = {}
+        self._top: Optional[List[Tuple[int, int]]] = None
+        self._lock = threading.Lock()
+
+    def _roll_over(self, month: date) -> None:
+        """Start counting a new month, called with the lock held"""
+        self.month = month
+        self._counts = {}
+        self._top = None
+
+    def add(self, sales: Mapping[Tuple[date, int], int]) -> None:
+        """Add committed sales counts by (day, seller_id), other months are ignored"""
+        with self._lock:
+            for (day, seller_id), count in sales.items():
+                month = month_start(day)
+                if month > self.month:
+                    self._roll_over(month)
+                if month != self.month or not count:
+                    continue
+                self._counts[seller_id] = self._counts.get(seller_id, 0) + count
+                if self._counts[seller_id] <= 0:
+                    del self._counts[seller_id]
+                self._top = None
+
+    def replace(self, month: date, counts: Mapping[int, int]) -> None:
+        """Replace the counts of a month with the ones read from the database"""
+        with self._lock:
+            if month < self.month:
+                return
+            self._roll_over(month)
+            self._counts = {seller_id: count for seller_id, count in counts.items() if count > 0}
+            self.seeded = True
+
+    def top(self, limit: Optional[int] = None) -> List[Tuple[int, int]]:
+        """(seller_id, sales) of the best sellers, most sales first, ties by seller id"""
+        limit = min(limit or self.size, self.size)
+        current_month = month_start(datetime.utcnow().date())
+        top = self._top
+        if top is None or current_month != self.month:
+            with self._lock:
+                if current_month > self.month:
+                    self._roll_over(current_month)
+                if self._top is None:
+                    self._top = [
+                        (seller_id, count)
+                        for seller_id, count in heapq.nlargest(
+                            self.size, self._counts.items(), key=lambda item: (item[1], -item[0])
+                        )
+                    ]
+                top = self._top
+        return top[:limit]
+
+    def reset(self) -> None:
+        """Forget every count, the next read seeds again"""
+        with self._lock:
+            self._roll_over(month_start(datetime.utcnow().date()))
+            self.seeded = False
+
+    def reconcile(self, db: Session) -> None:
+        """Replace the counts with the month totals of the sales rollups, one query on the buckets"""
+        month = month_start(datetime.utcnow().date())
+        rollups = repository.sales_rollup_repository
+        totals = rollups.totals(db, group_by=rollups.model.seller_id, start=month)
+        self.replace(month, {row.seller_id: row.sales for row in totals})
+
+
+class LeaderboardReconciler:
+    """Background task seeding the leaderboard and reconciling it every interval"""
+
+    def __init__(
+        self,
+        leaderboard: SellerLeaderboard,
+        session_factory: Callable[[], Session] = SessionLocal,
+        interval: float = settings.LEADERBOARD_RECONCILE_INTERVAL,
+    ):
+        self.leaderboard = leaderboard
+        self.session_factory = session_factory
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def reconcile(self) -> None:
+        db = self.session_factory()
+        try:
+            self.leaderboard.reconcile(db)
+        finally:
+            db.close()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await run_in_threadpool(self.reconcile)
+            except Exception:
+                logger.exception("Leaderboard reconciliation failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+seller_leaderboard = SellerLeaderboard()
+leaderboard_reconciler = LeaderboardReconciler(seller_leaderboard)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Date, Index, Integer, String
+
+from app.src.core.database import Base
+
+
+class SalesRollup(Base):
+    """Number of sales per day, seller and car brand, kept up to date by the sale service"""
+
+    __tablename__ = "sales_rollups"
+
+    day = Column(Date, primary_key=True)
+    # 0 and "" stand for a sale without seller or a car without brand
+    seller_id = Column(Integer, primary_key=True, default=0)
+    brand = Column(String, primary_key=True, default="")
+    sales_count = Column(Integer, nullable=False, default=0)
+
+    # Reports of one seller seek on (seller_id, day), the primary key serves day ranges
+    __table_args__ = (Index("ix_sales_rollups_seller_id_day", "seller_id", "day"),)
@@ -0,0 +1,123 @@
+from datetime import date
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import ColumnElement, Date, Row, delete, func, select, text, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.src.core.bulk import chunked
+from app.src.core.repository import UPSERT_INSERTS
+from app.src.domain.car.models import Car
+from app.src.domain.sale.models import Sale
+from . import models
+
+# Rollup bucket of a sale: (day, seller_id, brand)
+RollupKey = Tuple[date, int, str]
+
+
+class SalesRollupRepository:
+    def __init__(self):
+        self.model = models.SalesRollup
+
+    @property
+    def key(self) -> tuple:
+        """Primary key columns of a bucket"""
+        return (self.model.day, self.model.seller_id, self.model.brand)
+
+    def add_counts(self, db: Session, *, counts: Mapping[RollupKey, int]) -> None:
+        """
+        Add to the sales count of many buckets with one upsert per chunk,
+        buckets left without sales are deleted
+        """
+        rows = [
+            {"day": day, "seller_id": seller_id, "brand": brand, "sales_count": count}
+            for (day, seller_id, brand), count in counts.items()
+            if count
+        ]
+        upsert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        for chunk in chunked(rows):
+            if upsert is not None:
+                statement = upsert(self.model)
+                statement = statement.on_conflict_do_update(
+                    index_elements=list(self.key),
+                    set_={"sales_count": self.model.sales_count + statement.excluded.sales_count},
+                )
+                db.execute(statement, chunk)
+                continue
+            for row in chunk:
+                updated = db.execute(
+                    update(self.model)
+                    .where(*(column == row[column.key] for column in self.key))
+                    .values(sales_count=self.model.sales_count + row["sales_count"])
+                )
+                if updated.rowcount == 0:
+                    db.execute(self.model.__table__.insert(), row)
+
+        emptied = [key for key, count in counts.items() if count < 0]
+        for chunk in chunked(emptied):
+            db.execute(delete(self.model).where(tuple_(*self.key).in_(chunk), self.model.sales_count <= 0))
+
+    def count_car_sales(self, db: Session, *, car_id: int) -> Dict[Tuple[date, int], int]:
+        """Sales of one car per (day, seller_id), the buckets they are counted in but the brand"""
+        day = func.date(Sale.created_at, type_=Date)
+        seller_id = func.coalesce(Sale.seller_id, 0)
+        statement = (
+            select(day, seller_id, func.count())
+            .where(Sale.car_id == car_id, Sale.created_at.is_not(None))
+            .group_by(day, seller_id)
+        )
+        return {(row[0], row[1]): row[2] for row in db.execute(statement)}
+
+    def rebuild(self, db: Session, *, chunk_size: int) -> int:
+        """
+        Recompute every bucket from the sales, aggregating one range of sale
+        IDs per query, returns the number of buckets
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            # Sales committing meanwhile wait for the rebuild before counting themselves
+            db.execute(text(f"LOCK TABLE {self.model.__tablename__} IN EXCLUSIVE MODE"))
+        db.execute(delete(self.model))
+
+        day = func.date(Sale.created_at, type_=Date)
+        seller_id = func.coalesce(Sale.seller_id, 0)
+        brand = func.coalesce(Car.brand, "")
+        last_id = db.scalar(select(func.max(Sale.id))) or 0
+        for start in range(0, last_id, chunk_size):
+            statement = (
+                select(day, seller_id, brand, func.count())
+                .select_from(Sale)
+                .outerjoin(Car, Car.id == Sale.car_id)
+                .where(Sale.id > start, Sale.id <= start + chunk_size, Sale.created_at.is_not(None))
+                .group_by(day, seller_id, brand)
+            )
+            self.add_counts(db, counts={(row[0], row[1], row[2]): row[3] for row in db.execute(statement)})
+        return db.scalar(select(func.count()).select_from(self.model))
+
+    def totals(
+        self,
+        db: Session,
+        *,
+        group_by: ColumnElement,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        seller_id: Optional[int] = None,
+        brand: Optional[str] = None,
+    ) -> List[Row]:
+        """Sales summed per group_by value over the buckets in [start, end]"""
+        statement = (
+            select(group_by, func.sum(self.model.sales_count).label("sales"))
+            .group_by(group_by)
+            .order_by(group_by)
+        )
+        if start is not None:
+            statement = statement.where(self.model.day >= start)
+        if end is not None:
+            statement = statement.where(self.model.day <= end)
+        if seller_id is not None:
+            statement = statement.where(self.model.seller_id == seller_id)
+        if brand is not None:
+            statement = statement.where(self.model.brand == brand)
+        return list(db.execute(statement))
+
+
+# Create singleton instances
+sales_rollup_repository = SalesRollupRepository()
@@ -0,0 +1,29 @@
+from datetime import date
+
+from pydantic import BaseModel, ConfigDict
+
+
+class SalesByDay(BaseModel):
+    day: date
+    sales: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SalesBySeller(BaseModel):
+    seller_id: int
+    sales: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SalesByBrand(BaseModel):
+    brand: str
+    sales: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SellerRank(BaseModel):
+    seller_id: int
+    sales: int
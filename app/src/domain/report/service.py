@@ -0,0 +1,107 @@
+from collections import Counter
+from datetime import date
+from typing import Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.src.core.events import on_commit
+from app.src.core.unit_of_work import transactional
+from app.src.domain.car.models import Car
+from app.src.domain.sale.models import Sale
+from . import models, repository, schemas
+from .leaderboard import seller_leaderboard
+from .repository import RollupKey
+
+
+def sale_bucket(db_sale: Sale, car: Optional[Car]) -> Optional[RollupKey]:
+    """Rollup bucket a sale is counted in, None for a sale without date"""
+    if db_sale.created_at is None:
+        return None
+    brand = car.brand if car is not None else None
+    return (db_sale.created_at.date(), db_sale.seller_id or 0, brand or "")
+
+
+class ReportService:
+    def __init__(self):
+        self.rollup_repository = repository.sales_rollup_repository
+
+    def record_sales(
+        self,
+        db: Session,
+        *,
+        added: Iterable[Optional[RollupKey]] = (),
+        removed: Iterable[Optional[RollupKey]] = (),
+    ) -> None:
+        """
+        Count sales in and out of their buckets, in the caller's transaction;
+        the leaderboard follows once the transaction commits
+        """
+        counts: Counter = Counter()
+        for bucket in added:
+            if bucket is not None:
+                counts[bucket] += 1
+        for bucket in removed:
+            if bucket is not None:
+                counts[bucket] -= 1
+        self.rollup_repository.add_counts(db, counts=counts)
+
+        by_seller: Counter = Counter()
+        for (day, seller_id, _), count in counts.items():
+            by_seller[(day, seller_id)] += count
+        on_commit(db, lambda: seller_leaderboard.add(by_seller))
+
+    def move_car_sales(self, db: Session, *, car_id: int, old_brand: Optional[str], new_brand: Optional[str]) -> None:
+        """
+        Move the sales of a car to the buckets of its new brand, in the caller's
+        transaction; seller totals, and so the leaderboard, do not change
+        """
+        counts: Counter = Counter()
+        for (day, seller_id), count in self.rollup_repository.count_car_sales(db, car_id=car_id).items():
+            counts[(day, seller_id, old_brand or "")] -= count
+            counts[(day, seller_id, new_brand or "")] += count
+        self.rollup_repository.add_counts(db, counts=counts)
+
+    @transactional
+    def rebuild_rollups(self, db: Session, chunk_size: int = 10000) -> int:
+        """Recompute the rollups from the sales table, returns the number of buckets"""
+        return self.rollup_repository.rebuild(db, chunk_size=chunk_size)
+
+    def get_seller_leaderboard(self, db: Session, limit: Optional[int] = None) -> List[schemas.SellerRank]:
+        """Best sellers of the month from memory, the database is only read to seed it"""
+        if not seller_leaderboard.seeded:
+            seller_leaderboard.reconcile(db)
+        return [
+            schemas.SellerRank(seller_id=seller_id, sales=sales)
+            for seller_id, sales in seller_leaderboard.top(limit)
+        ]
+
+    def get_sales_by_day(
+        self, db: Session, start: Optional[date] = None, end: Optional[date] = None,
+        seller_id: Optional[int] = None, brand: Optional[str] = None,
+    ) -> List[schemas.SalesByDay]:
+        """Sales per day"""
+        return self.rollup_repository.totals(
+            db, group_by=models.SalesRollup.day, start=start, end=end, seller_id=seller_id, brand=brand
+        )
+
+    def get_sales_by_seller(
+        self, db: Session, start: Optional[date] = None, end: Optional[date] = None,
+        brand: Optional[str] = None,
+    ) -> List[schemas.SalesBySeller]:
+        """Sales per seller"""
+        return self.rollup_repository.totals(
+            db, group_by=models.SalesRollup.seller_id, start=start, end=end, brand=brand
+        )
+
+    def get_sales_by_brand(
+        self, db: Session, start: Optional[date] = None, end: Optional[date] = None,
+        seller_id: Optional[int] = None,
+    ) -> List[schemas.SalesByBrand]:
+        """Sales per car brand"""
+        return self.rollup_repository.totals(
+            db, group_by=models.SalesRollup.brand, start=start, end=end, seller_id=seller_id
+        )
+
+
+# Create singleton instances
+report_service = ReportService()
@@ -0,0 +1,15 @@
+class ReservationNotFoundError(Exception):
+    """Raised when a reservation is not found"""
+
+    def __init__(self, reservation_id: int):
+        self.reservation_id = reservation_id
+        super().__init__(f"Reservation with id {reservation_id} not found")
+
+
+class ReservationNotActiveError(Exception):
+    """Raised when a reservation was already confirmed, cancelled or expired"""
+
+    def __init__(self, reservation_id: int, status: str):
+        self.reservation_id = reservation_id
+        self.status = status
+        super().__init__(f"Reservation with id {reservation_id} is {status}")
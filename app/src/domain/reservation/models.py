@@ -0,0 +1,41 @@
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, text
+from sqlalchemy.orm import relationship
+
+from app.src.core.database import Base
+
+
+class ReservationStatus(str, Enum):
+    active = "active"
+    confirmed = "confirmed"
+    expired = "expired"
+    cancelled = "cancelled"
+
+
+class Reservation(Base):
+    __tablename__ = "reservations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    car_id = Column(Integer, ForeignKey("cars.id"), nullable=False)
+    buyer_id = Column(Integer, ForeignKey("buyers.id"), nullable=False)
+    seller_id = Column(Integer, ForeignKey("sellers.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    status = Column(String(16), nullable=False, default=ReservationStatus.active.value)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    car = relationship("Car")
+    buyer = relationship("Buyer")
+    seller = relationship("Seller")
+
+    # The sweeper seeks the active holds in expiry order, settled ones are left out of the index
+    __table_args__ = (
+        Index(
+            "ix_reservations_active_expires_at",
+            "expires_at",
+            postgresql_where=text("status = 'active'"),
+            sqlite_where=text("status = 'active'"),
+        ),
+    )
@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import ColumnElement, func, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.src.core.bulk import chunked
+from app.src.core.repository import CRUDBase
+from . import models, schemas
+
+
+class ReservationRepository(CRUDBase[models.Reservation, schemas.ReservationCreate, schemas.ReservationCreate]):
+    def __init__(self):
+        super().__init__(models.Reservation)
+
+    @property
+    def active(self) -> ColumnElement[bool]:
+        """
+        Criterion of the active holds, rendered inline so SQLite can match it
+        against the WHERE clause of the partial expiry index
+        """
+        return self.model.status == literal(models.ReservationStatus.active.value, literal_execute=True)
+
+    def create_hold(
+        self, db: Session, *, obj_in: schemas.ReservationCreate, expires_at: datetime
+    ) -> models.Reservation:
+        """Create an active reservation expiring at expires_at"""
+        db_obj = self.model(
+            **obj_in.model_dump(exclude={"ttl_seconds"}),
+            status=models.ReservationStatus.active.value,
+            expires_at=expires_at,
+        )
+        db.add(db_obj)
+        db.flush()
+        return db_obj
+
+    def get_for_update(self, db: Session, *, id: int) -> Optional[models.Reservation]:
+        """Get a reservation, locking its row until the transaction ends"""
+        statement = select(self.model).where(self.model.id == id).with_for_update(of=self.model)
+        return db.scalars(statement).first()
+
+    def get_expired(self, db: Session, *, now: datetime, limit: int) -> List[models.Reservation]:
+        """
+        Active reservations expired at now, oldest first, served by the partial
+        expiry index; rows locked by another sweeper are skipped
+        """
+        statement = (
+            select(self.model)
+            .where(self.active, self.model.expires_at <= now)
+            .order_by(self.model.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(db.scalars(statement))
+
+    def next_expiry(self, db: Session) -> Optional[datetime]:
+        """Expiry of the next active reservation to expire, one index seek"""
+        return db.scalar(select(func.min(self.model.expires_at)).where(self.active))
+
+    def set_status(self, db: Session, *, ids: Sequence[int], status: models.ReservationStatus) -> None:
+        """Set the status of many reservations with one UPDATE per chunk"""
+        for chunk in chunked(list(ids)):
+            db.execute(
+                update(self.model).where(self.model.id.in_(chunk)).values(status=status.value),
+                execution_options={"synchronize_session": "evaluate"},
+            )
+
+
+# Create singleton instances
+reservation_repository = ReservationRepository()
@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from .models import ReservationStatus
+
+
+class ReservationBase(BaseModel):
+    id: int
+
+
+class ReservationCreate(BaseModel):
+    car_id: int
+    buyer_id: int
+    seller_id: int
+    quantity: int = Field(default=1, ge=1)
+    # Hold duration, RESERVATION_TTL_SECONDS when not given
+    ttl_seconds: Optional[int] = Field(default=None, ge=1)
+
+
+class Reservation(ReservationBase):
+    car_id: int
+    buyer_id: int
+    seller_id: int
+    quantity: int
+    status: ReservationStatus
+    created_at: datetime
+    expires_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,157 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.src.core.cache import entity_cache
+from app.src.core.config import settings
+from app.src.core.unit_of_work import transactional
+from app.src.domain.buyer.exceptions import BuyerNotFoundError
+from app.src.domain.car.exceptions import CarNotFoundError
+from app.src.domain.report.service import report_service, sale_bucket
+from app.src.domain.sale import schemas as sale_schemas
+from app.src.domain.sale.repository import sale_repository
+from app.src.domain.seller.exceptions import SellerNotFoundError
+from app.src.domain.stock.events import publish_on_commit
+from app.src.domain.stock.exceptions import InsufficientStockError, StockNotFoundError
+from app.src.domain.stock.repository import StockLevel, stock_repository
+from . import exceptions, models, repository, schemas
+
+
+class ReservationService:
+    def __init__(self):
+        self.reservation_repository = repository.reservation_repository
+        self.cache = entity_cache
+
+    @transactional
+    def create_reservation(self, db: Session, reservation: schemas.ReservationCreate) -> schemas.Reservation:
+        """Hold units of a car for a buyer until the reservation expires"""
+        car, buyer, seller = sale_repository.get_parties(
+            db, car_id=reservation.car_id, buyer_id=reservation.buyer_id, seller_id=reservation.seller_id
+        )
+        if car is None:
+            raise CarNotFoundError(reservation.car_id)
+        if buyer is None:
+            raise BuyerNotFoundError(reservation.buyer_id)
+        if seller is None:
+            raise SellerNotFoundError(reservation.seller_id)
+
+        level = stock_repository.reserve_quantity(db, car_id=reservation.car_id, quantity=reservation.quantity)
+        if level is None:
+            db_stock = stock_repository.get_by_car_id(db, car_id=reservation.car_id)
+            if db_stock is None:
+                raise StockNotFoundError(0)
+            raise InsufficientStockError(reservation.car_id, reservation.quantity, db_stock.available_quantity)
+        # Cached stocks and stock events show the reserved units
+        self.stock_changed(db, {reservation.car_id: level}, {reservation.car_id: (0, reservation.quantity)})
+
+        ttl_seconds = min(
+            reservation.ttl_seconds or settings.RESERVATION_TTL_SECONDS, settings.RESERVATION_MAX_TTL_SECONDS
+        )
+        return self.reservation_repository.create_hold(
+            db, obj_in=reservation, expires_at=datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        )
+
+    def get_reservation(self, db: Session, reservation_id: int) -> schemas.Reservation:
+        """Get reservation by ID"""
+        db_reservation = self.reservation_repository.get_by_id(db, id=reservation_id)
+        if db_reservation is None:
+            raise exceptions.ReservationNotFoundError(reservation_id)
+
+        return db_reservation
+
+    def _get_active(self, db: Session, reservation_id: int) -> models.Reservation:
+        """Lock an active reservation, holds past their expiry count as expired"""
+        db_reservation = self.reservation_repository.get_for_update(db, id=reservation_id)
+        if db_reservation is None:
+            raise exceptions.ReservationNotFoundError(reservation_id)
+        if db_reservation.status != models.ReservationStatus.active.value:
+            raise exceptions.ReservationNotActiveError(reservation_id, db_reservation.status)
+        if db_reservation.expires_at <= datetime.utcnow():
+            raise exceptions.ReservationNotActiveError(reservation_id, models.ReservationStatus.expired.value)
+        return db_reservation
+
+    @transactional
+    def confirm_reservation(self, db: Session, reservation_id: int) -> list[sale_schemas.Sale]:
+        """Turn a reservation into one sale per held unit"""
+        db_reservation = self._get_active(db, reservation_id)
+        car_id, quantity = db_reservation.car_id, db_reservation.quantity
+        level = stock_repository.take_reserved_quantity(db, car_id=car_id, quantity=quantity)
+        if level is None:
+            db_stock = stock_repository.get_by_car_id(db, car_id=car_id)
+            if db_stock is None:
+                raise StockNotFoundError(0)
+            raise InsufficientStockError(car_id, quantity, db_stock.available_quantity)
+        self.stock_changed(db, {car_id: level}, {car_id: (-quantity, -quantity)})
+
+        db_reservation.status = models.ReservationStatus.confirmed.value
+        db.flush()
+        sale = sale_schemas.SaleCreate(
+            car_id=car_id, buyer_id=db_reservation.buyer_id, seller_id=db_reservation.seller_id
+        )
+        db_sales = sale_repository.create_many(db, objs_in=[sale] * quantity)
+
+        # Sale responses embed car, buyer and seller, loaded with one query
+        car, buyer, seller = sale_repository.get_parties(
+            db, car_id=sale.car_id, buyer_id=sale.buyer_id, seller_id=sale.seller_id
+        )
+        for db_sale in db_sales:
+            set_committed_value(db_sale, "car", car)
+            set_committed_value(db_sale, "buyer", buyer)
+            set_committed_value(db_sale, "seller", seller)
+        report_service.record_sales(db, added=[sale_bucket(db_sale, car) for db_sale in db_sales])
+        return db_sales
+
+    @transactional
+    def cancel_reservation(self, db: Session, reservation_id: int) -> schemas.Reservation:
+        """Give the held units of a reservation back to stock"""
+        db_reservation = self._get_active(db, reservation_id)
+        levels = stock_repository.release_reserved_quantities(
+            db, released={db_reservation.car_id: db_reservation.quantity}
+        )
+        self.stock_changed(db, levels, {db_reservation.car_id: (0, -db_reservation.quantity)})
+        db_reservation.status = models.ReservationStatus.cancelled.value
+        db.flush()
+        return db_reservation
+
+    @transactional
+    def expire_reservations(self, db: Session, now: Optional[datetime] = None, limit: Optional[int] = None) -> int:
+        """Release one batch of expired holds, grouped per car, returns how many expired"""
+        db_reservations = self.reservation_repository.get_expired(
+            db, now=now or datetime.utcnow(), limit=limit or settings.RESERVATION_SWEEP_BATCH
+        )
+        released: Counter = Counter()
+        for db_reservation in db_reservations:
+            released[db_reservation.car_id] += db_reservation.quantity
+        levels = stock_repository.release_reserved_quantities(db, released=released)
+        self.stock_changed(db, levels, {car_id: (0, -units) for car_id, units in released.items()})
+        self.reservation_repository.set_status(
+            db, ids=[db_reservation.id for db_reservation in db_reservations],
+            status=models.ReservationStatus.expired,
+        )
+        return len(db_reservations)
+
+    def stock_changed(
+        self, db: Session, levels: Dict[int, StockLevel], deltas: Dict[int, Tuple[int, int]]
+    ) -> None:
+        """
+        Publish the new levels of the stocks held units moved in, and evict them
+        from the cache. deltas are the changes of quantity and reserved units by car ID.
+        """
+        for car_id, level in levels.items():
+            delta, reserved_delta = deltas[car_id]
+            publish_on_commit(
+                db, "updated", stock_id=level.stock_id, car_id=car_id, quantity=level.quantity, delta=delta,
+                available=level.available, reserved_delta=reserved_delta,
+            )
+        self.cache.invalidate_on_commit(db, "stock.car", *levels)
+
+    def get_next_expiry(self, db: Session) -> Optional[datetime]:
+        """When the next active reservation expires, None without active ones"""
+        return self.reservation_repository.next_expiry(db)
+
+
+# Create singleton instances
+reservation_service = ReservationService()
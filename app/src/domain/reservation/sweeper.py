@@ -0,0 +1,80 @@
+"""
+Reservation sweeper
+Background task releasing expired holds. Expired reservations are found
+through the partial expiry index, in batches, and the task sleeps until
+the next expiry (at most RESERVATION_SWEEP_INTERVAL) instead of scanning
+the table on a fixed period.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.src.core.config import settings
+from app.src.core.database import SessionLocal
+from .service import reservation_service
+
+logger = logging.getLogger(__name__)
+
+# Shortest wait between sweeps, holds locked by another sweeper are not polled for
+MIN_SWEEP_DELAY = 1.0
+
+
+class ReservationSweeper:
+    """Expire reservations from a background task of the application"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        interval: float = settings.RESERVATION_SWEEP_INTERVAL,
+        batch_size: int = settings.RESERVATION_SWEEP_BATCH,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def sweep(self) -> Optional[float]:
+        """Expire every reservation due, returns the seconds until the next expiry"""
+        db = self.session_factory()
+        try:
+            while reservation_service.expire_reservations(db, limit=self.batch_size) == self.batch_size:
+                pass
+            next_expiry = reservation_service.get_next_expiry(db)
+        finally:
+            db.close()
+        if next_expiry is None:
+            return None
+        return max(0.0, (next_expiry - datetime.utcnow()).total_seconds())
+
+    async def run(self) -> None:
+        while True:
+            try:
+                delay = await run_in_threadpool(self.sweep)
+            except Exception:
+                logger.exception("Reservation sweep failed")
+                delay = None
+            if delay is None:
+                delay = self.interval
+            await asyncio.sleep(min(max(delay, MIN_SWEEP_DELAY), self.interval))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+reservation_sweeper = ReservationSweeper()
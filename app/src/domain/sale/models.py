@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 
 from app.src.core.database import Base
@@ -14,7 +14,12 @@ class Sale(Base):
     buyer_id = Column(Integer, ForeignKey("buyers.id"))
     seller_id = Column(Integer, ForeignKey("sellers.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
+    version = Column(Integer, nullable=False, server_default="1")
 
     car = relationship("Car", back_populates="sale")
     buyer = relationship("Buyer", back_populates="sale")
     seller = relationship("Seller", back_populates="sale")
+
+    # Keyset pagination by creation date seeks on (created_at, id)
+    __table_args__ = (Index("ix_sales_created_at_id", "created_at", "id"),)
+    __mapper_args__ = {"version_id_col": version}
@@ -1,8 +1,14 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Any, Optional, List, Sequence, Tuple
 
+from sqlalchemy import Select, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.src.core.repository import CRUDBase
+from app.src.core.repository import AsyncCRUDBase, CRUDBase
+from app.src.domain.buyer.models import Buyer
+from app.src.domain.car.models import Car
+from app.src.domain.seller.models import Seller
 from . import models, schemas
 
 
@@ -10,18 +16,105 @@ class SaleRepository(CRUDBase[models.Sale, schemas.SaleCreate, schemas.SaleUpdat
     def __init__(self):
         super().__init__(models.Sale)
 
-    def get_by_car_id(self, db: Session, *, car_id: int) -> List[models.Sale]:
+    def version_statement(self) -> Select:
+        """Versions of the sale and of its car, buyer and seller"""
+        return (
+            select(self.model.id, self.model.version, Car.version, Buyer.version, Seller.version)
+            .outerjoin(Car, Car.id == self.model.car_id)
+            .outerjoin(Buyer, Buyer.id == self.model.buyer_id)
+            .outerjoin(Seller, Seller.id == self.model.seller_id)
+        )
+
+    def get_parties(
+        self, db: Session, *, car_id: int, buyer_id: int, seller_id: int
+    ) -> Tuple[Optional[Car], Optional[Buyer], Optional[Seller]]:
+        """Car, buyer and seller of a sale in one query, None for the missing ones"""
+        anchor = select(literal(1).label("anchor")).subquery()
+        statement = (
+            select(Car, Buyer, Seller)
+            .select_from(anchor)
+            .outerjoin(Car, Car.id == car_id)
+            .outerjoin(Buyer, Buyer.id == buyer_id)
+            .outerjoin(Seller, Seller.id == seller_id)
+        )
+        return tuple(db.execute(statement).one())
+
+    def get_by_car_id(
+        self, db: Session, *, car_id: int, options: Sequence[Any] = ()
+    ) -> List[models.Sale]:
         """Get sales by car ID"""
-        return db.query(self.model).filter(self.model.car_id == car_id).all()
+        return db.query(self.model).filter(self.model.car_id == car_id).options(*options).all()
 
-    def get_by_buyer_id(self, db: Session, *, buyer_id: int) -> List[models.Sale]:
+    def get_by_buyer_id(
+        self, db: Session, *, buyer_id: int, options: Sequence[Any] = ()
+    ) -> List[models.Sale]:
         """Get sales by buyer ID"""
-        return db.query(self.model).filter(self.model.buyer_id == buyer_id).all()
+        return db.query(self.model).filter(self.model.buyer_id == buyer_id).options(*options).all()
 
-    def get_by_seller_id(self, db: Session, *, seller_id: int) -> List[models.Sale]:
+    def get_by_seller_id(
+        self, db: Session, *, seller_id: int, options: Sequence[Any] = ()
+    ) -> List[models.Sale]:
         """Get sales by seller ID"""
-        return db.query(self.model).filter(self.model.seller_id == seller_id).all()
+        return db.query(self.model).filter(self.model.seller_id == seller_id).options(*options).all()
+
+    def export_statement(self, created_after: Optional[datetime] = None) -> Select:
+        """Sales flattened with car, buyer and seller columns, without ORM hydration"""
+        statement = (
+            select(
+                self.model.id,
+                self.model.created_at,
+                self.model.car_id,
+                Car.name.label("car_name"),
+                Car.year.label("car_year"),
+                Car.brand.label("car_brand"),
+                self.model.buyer_id,
+                Buyer.name.label("buyer_name"),
+                Buyer.phone.label("buyer_phone"),
+                self.model.seller_id,
+                Seller.name.label("seller_name"),
+                Seller.cpf.label("seller_cpf"),
+            )
+            .outerjoin(Car, Car.id == self.model.car_id)
+            .outerjoin(Buyer, Buyer.id == self.model.buyer_id)
+            .outerjoin(Seller, Seller.id == self.model.seller_id)
+            .order_by(self.model.id)
+        )
+        if created_after is not None:
+            statement = statement.where(self.model.created_at > created_after)
+        return statement
+
+
+class AsyncSaleRepository(AsyncCRUDBase[models.Sale, schemas.SaleCreate, schemas.SaleUpdate]):
+    def __init__(self):
+        super().__init__(models.Sale)
+
+    version_statement = SaleRepository.version_statement
+
+    async def get_by_car_id(
+        self, db: AsyncSession, *, car_id: int, options: Sequence[Any] = ()
+    ) -> List[models.Sale]:
+        """Get sales by car ID"""
+        return await self._get_by(db, self.model.car_id == car_id, options)
+
+    async def get_by_buyer_id(
+        self, db: AsyncSession, *, buyer_id: int, options: Sequence[Any] = ()
+    ) -> List[models.Sale]:
+        """Get sales by buyer ID"""
+        return await self._get_by(db, self.model.buyer_id == buyer_id, options)
+
+    async def get_by_seller_id(
+        self, db: AsyncSession, *, seller_id: int, options: Sequence[Any] = ()
+    ) -> List[models.Sale]:
+        """Get sales by seller ID"""
+        return await self._get_by(db, self.model.seller_id == seller_id, options)
+
+    async def _get_by(
+        self, db: AsyncSession, criteria: Any, options: Sequence[Any]
+    ) -> List[models.Sale]:
+        result = await db.execute(select(self.model).where(criteria).options(*options))
+        return list(result.scalars().all())
 
 
-# Create a singleton instance
+# Create singleton instances
 sale_repository = SaleRepository()
+async_sale_repository = AsyncSaleRepository()
@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from typing import Optional
 
 from pydantic import BaseModel, ConfigDict
@@ -28,10 +29,23 @@ class SaleCreateResponse(SaleCreate):
     id: int
 
 
+class SaleOrder(str, Enum):
+    """Sort keys of sale pages, backed by indexes"""
+
+    id = "id"
+    created_at = "created_at"
+
+
 class Sale(SaleBase):
     car: Car
     buyer: Buyer
     seller: Seller
     created_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
+
+    @property
+    def versions(self) -> tuple:
+        """Row versions behind the ETag of the document"""
+        return (self.id, self.version, self.car.version, self.buyer.version, self.seller.version)
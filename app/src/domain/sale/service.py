@@ -1,87 +1,323 @@
-from sqlalchemy.orm import Session
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import QueryableAttribute, set_committed_value
 from sqlalchemy import select
 from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination.ext.sqlalchemy import apaginate, paginate
 
-from . import exceptions, repository, schemas
+from app.src.core.bulk import BulkResult, BulkRows
+from app.src.core.cache import entity_cache
+from app.src.core.database import run_sync
+from app.src.core.export import ExportFormat, stream_rows
+from app.src.core.pagination import CursorPage, CursorParams, paginate_cursor
+from app.src.core.replicas import read_primary
+from app.src.core.unit_of_work import transactional
+from app.src.domain.buyer.exceptions import BuyerNotFoundError
+from app.src.domain.buyer.repository import buyer_repository
+from app.src.domain.car.exceptions import CarNotFoundError
+from app.src.domain.car.repository import car_repository
+from app.src.domain.report.service import report_service, sale_bucket
+from app.src.domain.seller.exceptions import SellerNotFoundError
+from app.src.domain.seller.repository import seller_repository
+from app.src.domain.stock.exceptions import InsufficientStockError, StockNotFoundError
+from app.src.domain.stock.service import stock_service
+from . import exceptions, models, repository, schemas
 
 
 class SaleService:
     def __init__(self):
         self.sale_repository = repository.sale_repository
+        self.cache = entity_cache
+
+    @property
+    def load_options(self) -> tuple:
+        """Sale responses embed car, buyer and seller, joined into the query of the sales"""
+        return (
+            joinedload(models.Sale.car),
+            joinedload(models.Sale.buyer),
+            joinedload(models.Sale.seller),
+        )
 
+    def search_options(self, shared: QueryableAttribute) -> tuple:
+        """
+        Options of a search by one related row: that row is the same for every
+        sale found, so it is selected once instead of joined into each result row
+        """
+        return tuple(
+            selectinload(relationship) if relationship is shared else joinedload(relationship)
+            for relationship in (models.Sale.car, models.Sale.buyer, models.Sale.seller)
+        )
+
+    @transactional
     def create_sale(self, db: Session, sale: schemas.SaleCreate) -> schemas.Sale:
         """Create a new sale"""
-        # Validate that car exists
-        from app.src.domain.car.repository import car_repository
-        from app.src.domain.car.exceptions import CarNotFoundError
-        car = car_repository.get_by_id(db, id=sale.car_id)
-        if not car:
+        # Car, buyer and seller are checked with one query and embedded in the response
+        car, buyer, seller = self.sale_repository.get_parties(
+            db, car_id=sale.car_id, buyer_id=sale.buyer_id, seller_id=sale.seller_id
+        )
+        if car is None:
             raise CarNotFoundError(sale.car_id)
-        
-        # Validate that buyer exists
-        from app.src.domain.buyer.repository import buyer_repository
-        from app.src.domain.buyer.exceptions import BuyerNotFoundError
-        buyer = buyer_repository.get_by_id(db, id=sale.buyer_id)
-        if not buyer:
+        if buyer is None:
             raise BuyerNotFoundError(sale.buyer_id)
-        
-        # Validate that seller exists
-        from app.src.domain.seller.repository import seller_repository
-        from app.src.domain.seller.exceptions import SellerNotFoundError
-        seller = seller_repository.get_by_id(db, id=sale.seller_id)
-        if not seller:
+        if seller is None:
             raise SellerNotFoundError(sale.seller_id)
-        
-        # Create sale using repository
+
         db_sale = self.sale_repository.create(db, obj_in=sale)
+        set_committed_value(db_sale, "car", car)
+        set_committed_value(db_sale, "buyer", buyer)
+        set_committed_value(db_sale, "seller", seller)
+        report_service.record_sales(db, added=[sale_bucket(db_sale, car)])
         return db_sale
 
+    @transactional
+    def create_sales(self, db: Session, sales: BulkRows[schemas.SaleCreate]) -> BulkResult[schemas.Sale]:
+        """
+        Create sales in bulk, each taking one unit of its car from stock.
+        Rows are decided in request order as if posted one by one: a missing
+        stock or an empty one fails first, then a missing car, buyer or seller,
+        which leaves the unit in stock.
+        """
+        rows = [sale for _, sale in sales.rows]
+        cars, buyers, sellers = parties = self._get_parties(db, rows)
+
+        # One unit per sale, decrements grouped per car
+        demand = Counter(sale.car_id for sale in rows if self._party_error(parties, sale) is None)
+        for sale in rows:
+            demand.setdefault(sale.car_id, 0)
+        remaining = stock_service.buy_cars_from_stock(db, demand)
+
+        new_sales = []
+        for index, sale in sales.rows:
+            error = self._row_error(parties, remaining, sale)
+            if error is not None:
+                sales.reject(index, str(error))
+                continue
+            remaining[sale.car_id] -= 1
+            new_sales.append(sale)
+
+        db_sales = self.sale_repository.create_many(db, objs_in=new_sales)
+        for db_sale in db_sales:
+            set_committed_value(db_sale, "car", cars[db_sale.car_id])
+            set_committed_value(db_sale, "buyer", buyers[db_sale.buyer_id])
+            set_committed_value(db_sale, "seller", sellers[db_sale.seller_id])
+        report_service.record_sales(
+            db, added=[sale_bucket(db_sale, cars[db_sale.car_id]) for db_sale in db_sales]
+        )
+        return sales.result(db_sales)
+
+    def _get_parties(self, db: Session, sales: List[schemas.SaleCreate]) -> Tuple[dict, dict, dict]:
+        """Cars, buyers and sellers of many sales by ID, one query each"""
+        return (
+            car_repository.get_by_ids(db, ids=[sale.car_id for sale in sales]),
+            buyer_repository.get_by_ids(db, ids=[sale.buyer_id for sale in sales]),
+            seller_repository.get_by_ids(db, ids=[sale.seller_id for sale in sales]),
+        )
+
+    @staticmethod
+    def _party_error(parties: Tuple[dict, dict, dict], sale: schemas.SaleCreate) -> Optional[Exception]:
+        """The error of a sale whose car, buyer or seller is missing"""
+        cars, buyers, sellers = parties
+        if sale.car_id not in cars:
+            return CarNotFoundError(sale.car_id)
+        if sale.buyer_id not in buyers:
+            return BuyerNotFoundError(sale.buyer_id)
+        if sale.seller_id not in sellers:
+            return SellerNotFoundError(sale.seller_id)
+        return None
+
+    def _row_error(
+        self, parties: Tuple[dict, dict, dict], remaining: Dict[int, int], sale: schemas.SaleCreate
+    ) -> Optional[Exception]:
+        """The error of one bulk row, stock first as when posted alone"""
+        if sale.car_id not in remaining:
+            return StockNotFoundError(0)
+        if remaining[sale.car_id] == 0:
+            return InsufficientStockError(sale.car_id, 1, 0)
+        return self._party_error(parties, sale)
+
     def get_sale(self, db: Session, sale_id: int) -> schemas.Sale:
-        """Get sale by ID"""
-        db_sale = self.sale_repository.get_by_id(db, id=sale_id)
-        if db_sale is None:
+        """Get sale by ID, read through the entity cache and evicted with its car, buyer or seller"""
+        def load():
+            with read_primary(db):
+                db_sale = self.sale_repository.get_by_id(db, id=sale_id, options=self.load_options)
+                if db_sale is None:
+                    raise exceptions.SaleNotFoundError(sale_id)
+                return db_sale
+
+        return self.cache.get_or_load(
+            "sale", sale_id, schemas.Sale, load,
+            tags=lambda sale: (f"car:{sale.car.id}", f"buyer:{sale.buyer.id}", f"seller:{sale.seller.id}"),
+        )
+
+    def get_sale_versions(self, db: Session, sale_id: int) -> tuple:
+        """Row versions behind the ETag of a sale, read without loading it"""
+        versions = self.sale_repository.get_versions(db, id=sale_id)
+        if versions is None:
             raise exceptions.SaleNotFoundError(sale_id)
-        
-        return db_sale
+        return versions
+
+    def export_sales(
+        self, db: Session, export_format: ExportFormat, created_after: Optional[datetime] = None
+    ) -> Iterator[str]:
+        """Stream sales, optionally only those created after a date, as NDJSON or CSV"""
+        statement = self.sale_repository.export_statement(created_after=created_after)
+        return stream_rows(db.get_bind(), statement, export_format)
 
     def get_sales(self, db: Session) -> Page[schemas.Sale]:
         """Get all sales with pagination"""
-        from .models import Sale
-        return paginate(db, select(Sale).order_by(Sale.id))
+        return paginate(
+            db, select(models.Sale).options(*self.load_options).order_by(models.Sale.id)
+        )
+
+    def get_sales_versions(self, db: Session, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+        """Total and row versions of a page of sales, behind the ETag of the page"""
+        return self.sale_repository.get_page_versions(db, limit=limit, offset=offset)
+
+    def get_sales_page(
+        self, db: Session, params: CursorParams, order_by: schemas.SaleOrder = schemas.SaleOrder.id
+    ) -> CursorPage[schemas.Sale]:
+        """Get a page of sales after a cursor, ordered by id or created_at"""
+        keys = [models.Sale.id]
+        if order_by is schemas.SaleOrder.created_at:
+            keys = [models.Sale.created_at, models.Sale.id]
+        return paginate_cursor(db, select(models.Sale).options(*self.load_options), keys, params)
 
+    @transactional
     def update_sale(self, db: Session, sale_id: int, sale_update: schemas.SaleUpdate) -> schemas.Sale:
         """Update sale"""
-        db_sale = self.sale_repository.get_by_id(db, id=sale_id)
+        db_sale = self.sale_repository.get_by_id(
+            db, id=sale_id, options=(joinedload(models.Sale.car),)
+        )
         if db_sale is None:
             raise exceptions.SaleNotFoundError(sale_id)
         
+        # The sale moves between rollup buckets when its car or seller changes
+        old_bucket = sale_bucket(db_sale, db_sale.car)
         updated_sale = self.sale_repository.update(db, db_obj=db_sale, obj_in=sale_update)
+        car = db_sale.car
+        if car is None or car.id != updated_sale.car_id:
+            car = car_repository.get_by_id(db, id=updated_sale.car_id)
+        report_service.record_sales(
+            db, added=[sale_bucket(updated_sale, car)], removed=[old_bucket]
+        )
+        self.cache.invalidate_on_commit(db, "sale", sale_id)
         return updated_sale
 
+    @transactional
     def delete_sale(self, db: Session, sale_id: int) -> bool:
         """Delete sale"""
-        try:
-            self.sale_repository.delete(db, id=sale_id)
-            return True
-        except ValueError:
+        db_sale = self.sale_repository.get_by_id(
+            db, id=sale_id, options=(joinedload(models.Sale.car),)
+        )
+        if db_sale is None:
             raise exceptions.SaleNotFoundError(sale_id)
 
+        report_service.record_sales(db, removed=[sale_bucket(db_sale, db_sale.car)])
+        self.sale_repository.delete(db, id=sale_id)
+        self.cache.invalidate_on_commit(db, "sale", sale_id)
+        return True
+
     def get_sales_by_car(self, db: Session, car_id: int) -> list[schemas.Sale]:
         """Get sales by car ID"""
-        db_sales = self.sale_repository.get_by_car_id(db, car_id=car_id)
+        db_sales = self.sale_repository.get_by_car_id(
+            db, car_id=car_id, options=self.search_options(models.Sale.car)
+        )
         return db_sales
 
     def get_sales_by_buyer(self, db: Session, buyer_id: int) -> list[schemas.Sale]:
         """Get sales by buyer ID"""
-        db_sales = self.sale_repository.get_by_buyer_id(db, buyer_id=buyer_id)
+        db_sales = self.sale_repository.get_by_buyer_id(
+            db, buyer_id=buyer_id, options=self.search_options(models.Sale.buyer)
+        )
         return db_sales
 
     def get_sales_by_seller(self, db: Session, seller_id: int) -> list[schemas.Sale]:
         """Get sales by seller ID"""
-        db_sales = self.sale_repository.get_by_seller_id(db, seller_id=seller_id)
+        db_sales = self.sale_repository.get_by_seller_id(
+            db, seller_id=seller_id, options=self.search_options(models.Sale.seller)
+        )
         return db_sales
 
 
-# Create singleton instance
+class AsyncSaleService:
+    """
+    SaleService on AsyncSession.
+    Reads query natively, writes run the sync service rules through run_sync.
+    """
+
+    def __init__(self, service: SaleService):
+        self.service = service
+        self.sale_repository = repository.async_sale_repository
+
+    @property
+    def load_options(self) -> tuple:
+        """Sale responses embed car, buyer and seller, which cannot be lazy loaded on AsyncSession"""
+        return self.service.load_options
+
+    async def create_sale(self, db: AsyncSession, sale: schemas.SaleCreate) -> schemas.Sale:
+        """Create a new sale"""
+        return await run_sync(db, self.service.create_sale, sale, schema=schemas.Sale)
+
+    async def get_sale(self, db: AsyncSession, sale_id: int) -> schemas.Sale:
+        """Get sale by ID"""
+        db_sale = await self.sale_repository.get_by_id(
+            db, id=sale_id, options=self.load_options
+        )
+        if db_sale is None:
+            raise exceptions.SaleNotFoundError(sale_id)
+
+        return db_sale
+
+    async def get_sale_versions(self, db: AsyncSession, sale_id: int) -> tuple:
+        """Row versions behind the ETag of a sale, read without loading it"""
+        versions = await self.sale_repository.get_versions(db, id=sale_id)
+        if versions is None:
+            raise exceptions.SaleNotFoundError(sale_id)
+        return versions
+
+    async def get_sales(self, db: AsyncSession) -> Page[schemas.Sale]:
+        """Get all sales with pagination"""
+        return await apaginate(
+            db, select(models.Sale).options(*self.load_options).order_by(models.Sale.id)
+        )
+
+    async def get_sales_versions(self, db: AsyncSession, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+        """Total and row versions of a page of sales, behind the ETag of the page"""
+        return await self.sale_repository.get_page_versions(db, limit=limit, offset=offset)
+
+    async def update_sale(self, db: AsyncSession, sale_id: int, sale_update: schemas.SaleUpdate) -> schemas.Sale:
+        """Update sale"""
+        return await run_sync(
+            db, self.service.update_sale, sale_id, sale_update, schema=schemas.Sale
+        )
+
+    async def delete_sale(self, db: AsyncSession, sale_id: int) -> bool:
+        """Delete sale"""
+        return await run_sync(db, self.service.delete_sale, sale_id)
+
+    async def get_sales_by_car(self, db: AsyncSession, car_id: int) -> list[schemas.Sale]:
+        """Get sales by car ID"""
+        return await self.sale_repository.get_by_car_id(
+            db, car_id=car_id, options=self.service.search_options(models.Sale.car)
+        )
+
+    async def get_sales_by_buyer(self, db: AsyncSession, buyer_id: int) -> list[schemas.Sale]:
+        """Get sales by buyer ID"""
+        return await self.sale_repository.get_by_buyer_id(
+            db, buyer_id=buyer_id, options=self.service.search_options(models.Sale.buyer)
+        )
+
+    async def get_sales_by_seller(self, db: AsyncSession, seller_id: int) -> list[schemas.Sale]:
+        """Get sales by seller ID"""
+        return await self.sale_repository.get_by_seller_id(
+            db, seller_id=seller_id, options=self.service.search_options(models.Sale.seller)
+        )
+
+
+# Create singleton instances
 sale_service = SaleService()
+async_sale_service = AsyncSaleService(sale_service)
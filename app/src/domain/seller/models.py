@@ -2,6 +2,7 @@ from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.src.core.database import Base
+from app.src.core.search import NameSearchIndex, install
 
 
 class Seller(Base):
@@ -11,5 +12,12 @@ class Seller(Base):
     name = Column(String)
     cpf = Column(String, index=True)
     phone = Column(String)
+    version = Column(Integer, nullable=False, server_default="1")
 
     sale = relationship("Sale", back_populates="seller")
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+# Trigram index behind the search by name, built with the table
+name_search = install(NameSearchIndex(Seller, "name"))
@@ -1,8 +1,11 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence, Set
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.src.core.repository import CRUDBase
+from app.src.core.bulk import chunked
+from app.src.core.repository import AsyncCRUDBase, CRUDBase
 from . import models, schemas
 
 
@@ -14,16 +17,43 @@ class SellerRepository(CRUDBase[models.Seller, schemas.SellerCreate, schemas.Sel
         """Get seller by CPF"""
         return db.query(self.model).filter(self.model.cpf == cpf).first()
 
+    def get_existing_cpfs(self, db: Session, *, cpfs: Sequence[str]) -> Set[str]:
+        """CPFs among the given ones already used by a seller"""
+        existing: Set[str] = set()
+        for chunk in chunked(cpfs):
+            existing.update(db.scalars(select(self.model.cpf).where(self.model.cpf.in_(chunk))))
+        return existing
+
     def get_by_phone(self, db: Session, *, phone: str) -> Optional[models.Seller]:
         """Get seller by phone number"""
         return db.query(self.model).filter(self.model.phone == phone).first()
 
-    def get_by_name(self, db: Session, *, name: str) -> List[models.Seller]:
-        """Get sellers by name (partial match)"""
-        return db.query(self.model).filter(
-            self.model.name.ilike(f"%{name}%")
-        ).all()
+    def get_by_name(
+        self, db: Session, *, name: str, skip: int = 0, limit: int = 100
+    ) -> List[models.Seller]:
+        """Get sellers by name (partial match), best matches first"""
+        statement = models.name_search.statement(db.get_bind().dialect, name)
+        return list(db.scalars(statement.offset(skip).limit(limit)))
+
+
+class AsyncSellerRepository(AsyncCRUDBase[models.Seller, schemas.SellerCreate, schemas.SellerUpdate]):
+    def __init__(self):
+        super().__init__(models.Seller)
+
+    async def get_by_cpf(self, db: AsyncSession, *, cpf: str) -> Optional[models.Seller]:
+        """Get seller by CPF"""
+        result = await db.execute(select(self.model).where(self.model.cpf == cpf))
+        return result.scalars().first()
+
+    async def get_by_name(
+        self, db: AsyncSession, *, name: str, skip: int = 0, limit: int = 100
+    ) -> List[models.Seller]:
+        """Get sellers by name (partial match), best matches first"""
+        statement = models.name_search.statement(db.get_bind().dialect, name)
+        result = await db.execute(statement.offset(skip).limit(limit))
+        return list(result.scalars().all())
 
 
-# Create a singleton instance
+# Create singleton instances
 seller_repository = SellerRepository()
+async_seller_repository = AsyncSellerRepository()
@@ -1,15 +1,26 @@
+from typing import List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination.ext.sqlalchemy import apaginate, paginate
 
-from . import exceptions, repository, schemas
+from app.src.core.bulk import BulkResult, BulkRows
+from app.src.core.cache import entity_cache
+from app.src.core.database import run_sync
+from app.src.core.pagination import CursorPage, CursorParams, paginate_cursor
+from app.src.core.replicas import read_primary
+from app.src.core.unit_of_work import transactional
+from . import exceptions, models, repository, schemas
 
 
 class SellerService:
     def __init__(self):
         self.seller_repository = repository.seller_repository
+        self.cache = entity_cache
 
+    @transactional
     def create_seller(self, db: Session, seller: schemas.SellerCreate) -> schemas.Seller:
         """Create a new seller"""
         # Check if seller with same CPF already exists
@@ -21,19 +32,54 @@ class SellerService:
         db_seller = self.seller_repository.create(db, obj_in=seller)
         return db_seller
 
+    @transactional
+    def create_sellers(self, db: Session, sellers: BulkRows[schemas.SellerCreate]) -> BulkResult[schemas.Seller]:
+        """Create sellers in bulk, rows repeating a CPF are rejected"""
+        seen = self.seller_repository.get_existing_cpfs(
+            db, cpfs=[seller.cpf for _, seller in sellers.rows]
+        )
+        new_sellers = []
+        for index, seller in sellers.rows:
+            if seller.cpf in seen:
+                sellers.reject(index, str(exceptions.SellerAlreadyExistsError("cpf", seller.cpf)))
+                continue
+            seen.add(seller.cpf)
+            new_sellers.append(seller)
+
+        return sellers.result(self.seller_repository.create_many(db, objs_in=new_sellers))
+
     def get_seller(self, db: Session, seller_id: int) -> schemas.Seller:
-        """Get seller by ID"""
-        db_seller = self.seller_repository.get_by_id(db, id=seller_id)
-        if db_seller is None:
+        """Get seller by ID, read through the entity cache"""
+        def load():
+            with read_primary(db):
+                db_seller = self.seller_repository.get_by_id(db, id=seller_id)
+                if db_seller is None:
+                    raise exceptions.SellerNotFoundError(seller_id)
+                return db_seller
+
+        return self.cache.get_or_load("seller", seller_id, schemas.Seller, load)
+
+    def get_seller_versions(self, db: Session, seller_id: int) -> tuple:
+        """Row versions behind the ETag of a seller, read without loading it"""
+        versions = self.seller_repository.get_versions(db, id=seller_id)
+        if versions is None:
             raise exceptions.SellerNotFoundError(seller_id)
-        
-        return db_seller
+        return versions
 
     def get_sellers(self, db: Session) -> Page[schemas.Seller]:
         """Get all sellers with pagination"""
         from .models import Seller
         return paginate(db, select(Seller).order_by(Seller.id))
 
+    def get_sellers_versions(self, db: Session, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+        """Total and row versions of a page of sellers, behind the ETag of the page"""
+        return self.seller_repository.get_page_versions(db, limit=limit, offset=offset)
+
+    def get_sellers_page(self, db: Session, params: CursorParams) -> CursorPage[schemas.Seller]:
+        """Get a page of sellers after a cursor"""
+        return paginate_cursor(db, select(models.Seller), [models.Seller.id], params)
+
+    @transactional
     def update_seller(self, db: Session, seller_id: int, seller_update: schemas.SellerUpdate) -> schemas.Seller:
         """Update seller"""
         db_seller = self.seller_repository.get_by_id(db, id=seller_id)
@@ -48,15 +94,18 @@ class SellerService:
         
         # Update seller
         updated_seller = self.seller_repository.update(db, db_obj=db_seller, obj_in=seller_update)
-        return schemas.Seller.from_model(updated_seller)
+        self.cache.invalidate_on_commit(db, "seller", seller_id)
+        return updated_seller
 
+    @transactional
     def delete_seller(self, db: Session, seller_id: int) -> bool:
         """Delete seller"""
         try:
             self.seller_repository.delete(db, id=seller_id)
-            return True
         except ValueError:
             raise exceptions.SellerNotFoundError(seller_id)
+        self.cache.invalidate_on_commit(db, "seller", seller_id)
+        return True
 
     def get_seller_by_cpf(self, db: Session, cpf: str) -> schemas.Seller:
         """Get seller by CPF"""
@@ -66,11 +115,77 @@ class SellerService:
         
         return db_seller
 
-    def search_sellers_by_name(self, db: Session, name: str) -> list[schemas.Seller]:
-        """Search sellers by name"""
-        db_sellers = self.seller_repository.get_by_name(db, name=name)
+    def search_sellers_by_name(
+        self, db: Session, name: str, skip: int = 0, limit: int = 100
+    ) -> list[schemas.Seller]:
+        """Search sellers by name, best matches first"""
+        db_sellers = self.seller_repository.get_by_name(db, name=name, skip=skip, limit=limit)
         return db_sellers
 
 
-# Create singleton instance
+class AsyncSellerService:
+    """
+    SellerService on AsyncSession.
+    Reads query natively, writes run the sync service rules through run_sync.
+    """
+
+    def __init__(self, service: SellerService):
+        self.service = service
+        self.seller_repository = repository.async_seller_repository
+
+    async def create_seller(self, db: AsyncSession, seller: schemas.SellerCreate) -> schemas.Seller:
+        """Create a new seller"""
+        return await run_sync(db, self.service.create_seller, seller, schema=schemas.Seller)
+
+    async def get_seller(self, db: AsyncSession, seller_id: int) -> schemas.Seller:
+        """Get seller by ID"""
+        db_seller = await self.seller_repository.get_by_id(db, id=seller_id)
+        if db_seller is None:
+            raise exceptions.SellerNotFoundError(seller_id)
+
+        return db_seller
+
+    async def get_seller_versions(self, db: AsyncSession, seller_id: int) -> tuple:
+        """Row versions behind the ETag of a seller, read without loading it"""
+        versions = await self.seller_repository.get_versions(db, id=seller_id)
+        if versions is None:
+            raise exceptions.SellerNotFoundError(seller_id)
+        return versions
+
+    async def get_sellers(self, db: AsyncSession) -> Page[schemas.Seller]:
+        """Get all sellers with pagination"""
+        from .models import Seller
+        return await apaginate(db, select(Seller).order_by(Seller.id))
+
+    async def get_sellers_versions(self, db: AsyncSession, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+        """Total and row versions of a page of sellers, behind the ETag of the page"""
+        return await self.seller_repository.get_page_versions(db, limit=limit, offset=offset)
+
+    async def update_seller(self, db: AsyncSession, seller_id: int, seller_update: schemas.SellerUpdate) -> schemas.Seller:
+        """Update seller"""
+        return await run_sync(
+            db, self.service.update_seller, seller_id, seller_update, schema=schemas.Seller
+        )
+
+    async def delete_seller(self, db: AsyncSession, seller_id: int) -> bool:
+        """Delete seller"""
+        return await run_sync(db, self.service.delete_seller, seller_id)
+
+    async def get_seller_by_cpf(self, db: AsyncSession, cpf: str) -> schemas.Seller:
+        """Get seller by CPF"""
+        db_seller = await self.seller_repository.get_by_cpf(db, cpf=cpf)
+        if db_seller is None:
+            raise exceptions.SellerNotFoundError(0)  # CPF lookup, no ID
+
+        return db_seller
+
+    async def search_sellers_by_name(
+        self, db: AsyncSession, name: str, skip: int = 0, limit: int = 100
+    ) -> list[schemas.Seller]:
+        """Search sellers by name, best matches first"""
+        return await self.seller_repository.get_by_name(db, name=name, skip=skip, limit=limit)
+
+
+# Create singleton instances
 seller_service = SellerService()
+async_seller_service = AsyncSellerService(seller_service)
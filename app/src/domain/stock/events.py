@@ -0,0 +1,78 @@
+"""
+Stock events
+Stock level changes published once their transaction commits, streamed to
+clients as Server-Sent Events
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.src.core.broker import EventBroker
+from app.src.core.config import settings
+from app.src.core.events import on_commit
+
+stock_events = EventBroker(
+    buffer_size=settings.STOCK_EVENTS_BUFFER_SIZE, max_pending=settings.STOCK_EVENTS_MAX_PENDING
+)
+
+
+def publish_on_commit(
+    db: Session,
+    kind: str,
+    *,
+    stock_id: int,
+    car_id: int,
+    quantity: int,
+    delta: int,
+    available: int,
+    reserved_delta: int = 0,
+    brand: Optional[str] = None,
+) -> None:
+    """
+    Publish a stock change once the transaction of db commits.
+    delta is the change of quantity, reserved_delta the change of reserved units,
+    available the units left outside reservations; brand is given by created events.
+    """
+    data = {
+        "event": kind,
+        "id": stock_id,
+        "car_id": car_id,
+        "quantity": quantity,
+        "delta": delta,
+        "available": available,
+        "available_delta": delta - reserved_delta,
+    }
+    if brand is not None:
+        data["brand"] = brand
+    on_commit(db, lambda: stock_events.publish(data))
+
+
+@dataclass
+class StockEventFilter:
+    """
+    Events of one car, of the cars of a brand, or of stocks with available units
+    at or below a threshold before or after the change (they enter or leave the
+    low stock list). Units held by reservations are not available.
+    Brands are matched on car IDs resolved at subscription, created events add theirs.
+    """
+
+    car_id: Optional[int] = None
+    brand: Optional[str] = None
+    brand_car_ids: Set[int] = field(default_factory=set)
+    low_stock_threshold: Optional[int] = None
+
+    def __call__(self, data: Dict[str, Any]) -> bool:
+        if self.car_id is not None and data["car_id"] != self.car_id:
+            return False
+        if self.brand is not None:
+            if (data.get("brand") or "").lower() == self.brand.lower():
+                self.brand_car_ids.add(data["car_id"])
+            if data["car_id"] not in self.brand_car_ids:
+                return False
+        if self.low_stock_threshold is not None:
+            previous = data["available"] - data["available_delta"]
+            if min(data["available"], previous) > self.low_stock_threshold:
+                return False
+        return True
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, ForeignKey, Integer
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 
 from app.src.core.database import Base
@@ -9,12 +10,22 @@ class Stock(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     quantity = Column(Integer)
+    # Units held by active reservations, still counted in quantity
+    reserved_quantity = Column(Integer, nullable=False, default=0, server_default="0")
     car_id = Column(Integer, ForeignKey("cars.id"), unique=True)
+    # Row version, set UPDATEs of the repository bump it themselves
+    version = Column(Integer, nullable=False, server_default="1")
 
     car = relationship("Car", back_populates="stock")
 
+    @hybrid_property
+    def available_quantity(self):
+        return self.quantity - self.reserved_quantity
+
     def hasStock(self, quantity):
-        return self.quantity >= quantity
+        return self.available_quantity >= quantity
 
     def reduce_quantity(self, quantity):
         self.quantity -= quantity
+
+    __mapper_args__ = {"version_id_col": version}
@@ -1,30 +1,194 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
 
+from sqlalchemy import Select, case, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.src.core.repository import CRUDBase
+from app.src.core.bulk import chunked
+from app.src.core.repository import AsyncCRUDBase, CRUDBase
+from app.src.domain.car.models import Car
 from . import models, schemas
 
 
+class StockLevel(NamedTuple):
+    """Stock of a car right after a set based UPDATE"""
+
+    stock_id: int
+    quantity: int
+    available: int
+
+
 class StockRepository(CRUDBase[models.Stock, schemas.StockCreate, schemas.StockUpdate]):
     def __init__(self):
         super().__init__(models.Stock)
 
-    def get_by_car_id(self, db: Session, *, car_id: int) -> Optional[models.Stock]:
+    def get_by_car_id(
+        self, db: Session, *, car_id: int, options: Sequence[Any] = ()
+    ) -> Optional[models.Stock]:
         """Get stock by car ID"""
-        return db.query(self.model).filter(self.model.car_id == car_id).first()
+        return db.query(self.model).filter(self.model.car_id == car_id).options(*options).first()
 
-    def get_low_stock(self, db: Session, *, threshold: int = 5) -> List[models.Stock]:
-        """Get stocks with quantity below threshold"""
+    def version_statement(self) -> Select:
+        """Versions of the stock and of its car"""
+        return select(self.model.id, self.model.version, Car.version).outerjoin(Car, Car.id == self.model.car_id)
+
+    def get_existing_car_ids(self, db: Session, *, car_ids: Sequence[int]) -> Set[int]:
+        """Car IDs among the given ones that already have a stock"""
+        existing: Set[int] = set()
+        for chunk in chunked(car_ids):
+            existing.update(db.scalars(select(self.model.car_id).where(self.model.car_id.in_(chunk))))
+        return existing
+
+    def get_low_stock(
+        self, db: Session, *, threshold: int = 5, options: Sequence[Any] = ()
+    ) -> List[models.Stock]:
+        """Get stocks with at most threshold units left once the active reservations are held"""
         return db.query(self.model).filter(
-            self.model.quantity <= threshold
-        ).all()
+            self.model.available_quantity <= threshold
+        ).options(*options).all()
 
-    def get_available_stock(self, db: Session) -> List[models.Stock]:
-        """Get all stocks with quantity > 0"""
+    def get_available_stock(
+        self, db: Session, *, options: Sequence[Any] = ()
+    ) -> List[models.Stock]:
+        """Get all stocks with units left once the active reservations are held"""
         return db.query(self.model).filter(
-            self.model.quantity > 0
-        ).all()
+            self.model.quantity > self.model.reserved_quantity
+        ).options(*options).all()
+
+    def export_statement(self) -> Select:
+        """Stocks flattened with their car columns, without ORM hydration"""
+        return (
+            select(
+                self.model.id,
+                self.model.car_id,
+                Car.name.label("car_name"),
+                Car.year.label("car_year"),
+                Car.brand.label("car_brand"),
+                self.model.quantity,
+            )
+            .outerjoin(Car, Car.id == self.model.car_id)
+            .order_by(self.model.id)
+        )
+
+    def expire_loaded(self, db: Session, *, car_ids: Iterable[int]) -> None:
+        """
+        Expire the stocks of these cars already loaded in db, after a set based
+        UPDATE changed their quantities and version behind the identity map
+        """
+        car_ids = set(car_ids)
+        for instance in list(db.identity_map.values()):
+            if not isinstance(instance, self.model):
+                continue
+            # Read without loading, stocks whose car_id is not loaded are expired too
+            car_id = inspect(instance).dict.get("car_id")
+            if car_id is None or car_id in car_ids:
+                db.expire(instance)
+
+    def decrement_quantity(self, db: Session, *, car_id: int, quantity: int) -> Optional[models.Stock]:
+        """
+        Take quantity units of a car from its stock in one conditional UPDATE,
+        None when the car has no stock or fewer units left outside reservations.
+        The row lock of the UPDATE serializes concurrent sales, no prior read.
+        """
+        statement = (
+            update(self.model)
+            .where(self.model.car_id == car_id, self.model.available_quantity >= quantity)
+            .values(quantity=self.model.quantity - quantity, version=self.model.version + 1)
+        )
+        # A stock loaded before is filled again from the returned row
+        self.expire_loaded(db, car_ids=[car_id])
+        if db.get_bind().dialect.update_returning:
+            return db.scalars(statement.returning(self.model)).first()
+
+        if db.execute(statement, execution_options={"synchronize_session": False}).rowcount == 0:
+            return None
+        return db.query(self.model).filter(self.model.car_id == car_id).populate_existing().first()
+
+    def get_quantities(self, db: Session, *, car_ids: Sequence[int], lock: bool = False) -> Dict[int, int]:
+        """Units in stock outside reservations by car ID, cars without a stock are left out"""
+        quantities: Dict[int, int] = {}
+        for chunk in chunked(car_ids):
+            statement = select(self.model.car_id, self.model.available_quantity).where(self.model.car_id.in_(chunk))
+            if lock:
+                statement = statement.with_for_update()
+            quantities.update((car_id, quantity or 0) for car_id, quantity in db.execute(statement))
+        return quantities
+
+    def decrement_quantities(self, db: Session, *, taken: Mapping[int, int]) -> Dict[int, StockLevel]:
+        """
+        Take taken[car_id] units from the stocks of many cars with one UPDATE per
+        chunk. Callers hold the row locks of these stocks, read through
+        get_quantities(lock=True), so the units taken are still there.
+        Returns the new levels by car ID of the stocks updated.
+        """
+        updated: Dict[int, StockLevel] = {}
+        for chunk in chunked(list(taken)):
+            statement = (
+                update(self.model)
+                .where(self.model.car_id.in_(chunk))
+                .values(
+                    quantity=self.model.quantity - case({car_id: taken[car_id] for car_id in chunk}, value=self.model.car_id),
+                    version=self.model.version + 1,
+                )
+            )
+            updated.update(self.execute_levels(db, statement, car_ids=chunk))
+        return updated
+
+    def reserve_quantity(self, db: Session, *, car_id: int, quantity: int) -> Optional[StockLevel]:
+        """Hold quantity units of a car in one conditional UPDATE, None when fewer are left"""
+        statement = (
+            update(self.model)
+            .where(self.model.car_id == car_id, self.model.available_quantity >= quantity)
+            .values(reserved_quantity=self.model.reserved_quantity + quantity, version=self.model.version + 1)
+        )
+        return self.execute_levels(db, statement, car_ids=[car_id]).get(car_id)
+
+    def take_reserved_quantity(self, db: Session, *, car_id: int, quantity: int) -> Optional[StockLevel]:
+        """Turn quantity held units of a car into sold ones, None when fewer are held"""
+        statement = (
+            update(self.model)
+            .where(self.model.car_id == car_id, self.model.reserved_quantity >= quantity)
+            .values(
+                quantity=self.model.quantity - quantity,
+                reserved_quantity=self.model.reserved_quantity - quantity,
+                version=self.model.version + 1,
+            )
+        )
+        return self.execute_levels(db, statement, car_ids=[car_id]).get(car_id)
+
+    def release_reserved_quantities(self, db: Session, *, released: Mapping[int, int]) -> Dict[int, StockLevel]:
+        """Give held units of many cars back with one UPDATE per chunk, new levels by car ID"""
+        updated: Dict[int, StockLevel] = {}
+        for chunk in chunked(list(released)):
+            statement = (
+                update(self.model)
+                .where(self.model.car_id.in_(chunk))
+                .values(
+                    reserved_quantity=self.model.reserved_quantity
+                    - case({car_id: released[car_id] for car_id in chunk}, value=self.model.car_id),
+                    version=self.model.version + 1,
+                )
+            )
+            updated.update(self.execute_levels(db, statement, car_ids=chunk))
+        return updated
+
+    def execute_levels(self, db: Session, statement: Any, *, car_ids: Sequence[int]) -> Dict[int, StockLevel]:
+        """
+        Run a set based UPDATE of the stocks of these cars, new levels by car ID
+        of the rows it changed, through RETURNING or a select after it
+        """
+        columns = (self.model.car_id, self.model.id, self.model.quantity, self.model.available_quantity)
+        options = {"synchronize_session": False}
+        if db.get_bind().dialect.update_returning:
+            rows = db.execute(statement.returning(*columns), execution_options=options)
+        elif db.execute(statement, execution_options=options).rowcount:
+            # Statements of one car are conditional, of many cars change every stock
+            rows = db.execute(select(*columns).where(self.model.car_id.in_(car_ids)))
+        else:
+            rows = []
+        levels = {car_id: StockLevel(stock_id, quantity, available) for car_id, stock_id, quantity, available in rows}
+        self.expire_loaded(db, car_ids=car_ids)
+        return levels
 
     def update_quantity(self, db: Session, *, stock_id: int, new_quantity: int) -> models.Stock:
         """Update stock quantity directly"""
@@ -34,10 +198,44 @@ class StockRepository(CRUDBase[models.Stock, schemas.StockCreate, schemas.StockU
         
         db_stock.quantity = new_quantity
         db.add(db_stock)
-        db.commit()
-        db.refresh(db_stock)
+        db.flush()
         return db_stock
 
 
-# Create a singleton instance
+class AsyncStockRepository(AsyncCRUDBase[models.Stock, schemas.StockCreate, schemas.StockUpdate]):
+    def __init__(self):
+        super().__init__(models.Stock)
+
+    version_statement = StockRepository.version_statement
+
+    async def get_by_car_id(
+        self, db: AsyncSession, *, car_id: int, options: Sequence[Any] = ()
+    ) -> Optional[models.Stock]:
+        """Get stock by car ID"""
+        result = await db.execute(
+            select(self.model).where(self.model.car_id == car_id).options(*options)
+        )
+        return result.scalars().first()
+
+    async def get_low_stock(
+        self, db: AsyncSession, *, threshold: int = 5, options: Sequence[Any] = ()
+    ) -> List[models.Stock]:
+        """Get stocks with at most threshold units left once the active reservations are held"""
+        result = await db.execute(
+            select(self.model).where(self.model.available_quantity <= threshold).options(*options)
+        )
+        return list(result.scalars().all())
+
+    async def get_available_stock(
+        self, db: AsyncSession, *, options: Sequence[Any] = ()
+    ) -> List[models.Stock]:
+        """Get all stocks with units left once the active reservations are held"""
+        result = await db.execute(
+            select(self.model).where(self.model.quantity > self.model.reserved_quantity).options(*options)
+        )
+        return list(result.scalars().all())
+
+
+# Create singleton instances
 stock_repository = StockRepository()
+async_stock_repository = AsyncStockRepository()
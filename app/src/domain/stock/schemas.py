@@ -20,5 +20,12 @@ class StockUpdate(BaseModel):
 class Stock(StockBase):
     car: Car
     quantity: int
+    reserved_quantity: int = 0
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
+
+    @property
+    def versions(self) -> tuple:
+        """Row versions behind the ETag of the document"""
+        return (self.id, self.version, self.car.version)
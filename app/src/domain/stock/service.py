@@ -1,15 +1,34 @@
-from sqlalchemy.orm import Session
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy import select
 from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination.ext.sqlalchemy import apaginate, paginate
 
-from . import exceptions, repository, schemas
+from app.src.core.bulk import BulkResult, BulkRows
+from app.src.core.cache import entity_cache
+from app.src.core.database import run_sync
+from app.src.core.export import ExportFormat, stream_rows
+from app.src.core.pagination import CursorPage, CursorParams, paginate_cursor
+from app.src.core.replicas import read_primary
+from app.src.core.unit_of_work import transactional
+from . import exceptions, models, repository, schemas
+from .events import StockEventFilter, publish_on_commit
 
 
 class StockService:
     def __init__(self):
         self.stock_repository = repository.stock_repository
+        self.cache = entity_cache
+
+    @property
+    def load_options(self) -> tuple:
+        """Stock responses embed the car, joined into the query of the stocks"""
+        return (joinedload(models.Stock.car),)
 
+    @transactional
     def create_stock(self, db: Session, stock: schemas.StockCreate) -> schemas.Stock:
         """Create a new stock"""
         # Check if car exists
@@ -26,47 +45,150 @@ class StockService:
         
         # Create stock
         db_stock = self.stock_repository.create(db, obj_in=stock)
-        # Refresh to load relationships
-        db.refresh(db_stock)
+        publish_on_commit(
+            db, "created", stock_id=db_stock.id, car_id=db_stock.car_id,
+            quantity=db_stock.quantity, delta=db_stock.quantity, available=db_stock.quantity, brand=car.brand,
+        )
         return db_stock
 
+    @transactional
+    def create_stocks(self, db: Session, stocks: BulkRows[schemas.StockCreate]) -> BulkResult[schemas.Stock]:
+        """Create stocks in bulk, rows for missing cars or cars with a stock are rejected"""
+        from app.src.domain.car.repository import car_repository
+        from app.src.domain.car.exceptions import CarNotFoundError
+        car_ids = [stock.car_id for _, stock in stocks.rows]
+        cars = car_repository.get_by_ids(db, ids=car_ids)
+        seen = self.stock_repository.get_existing_car_ids(db, car_ids=car_ids)
+        new_stocks = []
+        for index, stock in stocks.rows:
+            if stock.car_id not in cars:
+                stocks.reject(index, str(CarNotFoundError(stock.car_id)))
+                continue
+            if stock.car_id in seen:
+                stocks.reject(index, str(exceptions.StockAlreadyExistsError(stock.car_id)))
+                continue
+            seen.add(stock.car_id)
+            new_stocks.append(stock)
+
+        db_stocks = self.stock_repository.create_many(db, objs_in=new_stocks)
+        # Attach the cars already loaded, responses embed them
+        for db_stock in db_stocks:
+            set_committed_value(db_stock, "car", cars[db_stock.car_id])
+            publish_on_commit(
+                db, "created", stock_id=db_stock.id, car_id=db_stock.car_id,
+                quantity=db_stock.quantity, delta=db_stock.quantity, available=db_stock.quantity,
+                brand=cars[db_stock.car_id].brand,
+            )
+        return stocks.result(db_stocks)
+
     def get_stock(self, db: Session, stock_id: int) -> schemas.Stock:
-        """Get stock by ID"""
-        db_stock = self.stock_repository.get_by_id(db, id=stock_id)
-        if db_stock is None:
+        """Get stock by ID, read through the entity cache and evicted with its car"""
+        def load():
+            with read_primary(db):
+                db_stock = self.stock_repository.get_by_id(db, id=stock_id, options=self.load_options)
+                if db_stock is None:
+                    raise exceptions.StockNotFoundError(stock_id)
+                return db_stock
+
+        return self.cache.get_or_load(
+            "stock", stock_id, schemas.Stock, load,
+            tags=lambda stock: (f"car:{stock.car.id}", f"stock.car:{stock.car.id}"),
+        )
+
+    def get_stock_versions(self, db: Session, stock_id: int) -> tuple:
+        """Row versions behind the ETag of a stock, read without loading it"""
+        versions = self.stock_repository.get_versions(db, id=stock_id)
+        if versions is None:
             raise exceptions.StockNotFoundError(stock_id)
-        
-        return db_stock
+        return versions
 
     def get_stock_by_car(self, db: Session, car_id: int) -> schemas.Stock:
         """Get stock by car ID"""
-        db_stock = self.stock_repository.get_by_car_id(db, car_id=car_id)
+        db_stock = self.stock_repository.get_by_car_id(db, car_id=car_id, options=self.load_options)
         if db_stock is None:
             raise exceptions.StockNotFoundError(0)  # Car lookup, no stock ID
         
         return db_stock
 
+    @transactional
     def buy_car_from_stock(self, db: Session, car_id: int, quantity: int) -> schemas.Stock:
         """Buy car from stock (reduce quantity)"""
+        db_stock = self.stock_repository.decrement_quantity(db, car_id=car_id, quantity=quantity)
+        if db_stock is not None:
+            publish_on_commit(
+                db, "updated", stock_id=db_stock.id, car_id=car_id, quantity=db_stock.quantity, delta=-quantity,
+                available=db_stock.available_quantity,
+            )
+            self.cache.invalidate_on_commit(db, "stock", db_stock.id)
+            return db_stock
+
+        # Nothing was updated, tell a missing stock from a short one
         db_stock = self.stock_repository.get_by_car_id(db, car_id=car_id)
         if db_stock is None:
             raise exceptions.StockNotFoundError(0)
-        
-        if not db_stock.hasStock(quantity):
-            raise exceptions.InsufficientStockError(car_id, quantity, db_stock.quantity)
-        
-        # Reduce quantity
-        db_stock.reduce_quantity(quantity)
-        db.add(db_stock)
-        db.commit()
-        db.refresh(db_stock)
-        return db_stock
+        raise exceptions.InsufficientStockError(car_id, quantity, db_stock.available_quantity)
+
+    @transactional
+    def buy_cars_from_stock(self, db: Session, demand: Mapping[int, int]) -> Dict[int, int]:
+        """
+        Take up to demand[car_id] units of many cars with set-based UPDATEs.
+        Returns the units each stock held before, cars without a stock are left out.
+        """
+        # The stocks stay locked until commit, the units read are the ones taken.
+        # SQLite ignores FOR UPDATE, it fails a writer racing another instead.
+        available = self.stock_repository.get_quantities(db, car_ids=list(demand), lock=True)
+        taken = {
+            car_id: min(demand[car_id], quantity)
+            for car_id, quantity in available.items()
+            if min(demand[car_id], quantity) > 0
+        }
+        updated = self.stock_repository.decrement_quantities(db, taken=taken)
+        for car_id, level in updated.items():
+            publish_on_commit(
+                db, "updated", stock_id=level.stock_id, car_id=car_id, quantity=level.quantity, delta=-taken[car_id],
+                available=level.available,
+            )
+        self.cache.invalidate_on_commit(db, "stock", *(level.stock_id for level in updated.values()))
+        return available
+
+    def get_event_filter(
+        self,
+        db: Session,
+        car_id: Optional[int] = None,
+        brand: Optional[str] = None,
+        low_stock_threshold: Optional[int] = None,
+    ) -> StockEventFilter:
+        """Filter of a stock event stream, a brand is resolved to its car IDs once"""
+        brand_car_ids = set()
+        if brand is not None:
+            from app.src.domain.car.repository import car_repository
+            brand_car_ids = car_repository.get_ids_by_brand(db, brand=brand)
+        return StockEventFilter(
+            car_id=car_id, brand=brand, brand_car_ids=brand_car_ids, low_stock_threshold=low_stock_threshold
+        )
+
+    def export_stocks(self, db: Session, export_format: ExportFormat) -> Iterator[str]:
+        """Stream all stocks as NDJSON or CSV"""
+        statement = self.stock_repository.export_statement()
+        return stream_rows(db.get_bind(), statement, export_format)
 
     def get_stocks(self, db: Session) -> Page[schemas.Stock]:
         """Get all stocks with pagination"""
-        from .models import Stock
-        return paginate(db, select(Stock).order_by(Stock.id))
+        return paginate(
+            db, select(models.Stock).options(*self.load_options).order_by(models.Stock.id)
+        )
 
+    def get_stocks_versions(self, db: Session, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+        """Total and row versions of a page of stocks, behind the ETag of the page"""
+        return self.stock_repository.get_page_versions(db, limit=limit, offset=offset)
+
+    def get_stocks_page(self, db: Session, params: CursorParams) -> CursorPage[schemas.Stock]:
+        """Get a page of stocks after a cursor"""
+        return paginate_cursor(
+            db, select(models.Stock).options(*self.load_options), [models.Stock.id], params
+        )
+
+    @transactional
     def update_stock(self, db: Session, stock_id: int, stock_update: schemas.StockUpdate) -> schemas.Stock:
         """Update stock"""
         db_stock = self.stock_repository.get_by_id(db, id=stock_id)
@@ -80,27 +202,128 @@ class StockService:
                 raise exceptions.StockAlreadyExistsError(stock_update.car_id)
         
         # Update stock
+        old_quantity = db_stock.quantity
         updated_stock = self.stock_repository.update(db, db_obj=db_stock, obj_in=stock_update)
-        return schemas.Stock.from_model(updated_stock)
+        publish_on_commit(
+            db, "updated", stock_id=updated_stock.id, car_id=updated_stock.car_id,
+            quantity=updated_stock.quantity, delta=(updated_stock.quantity or 0) - (old_quantity or 0),
+            available=updated_stock.available_quantity,
+        )
+        self.cache.invalidate_on_commit(db, "stock", stock_id)
+        return updated_stock
 
+    @transactional
     def delete_stock(self, db: Session, stock_id: int) -> bool:
         """Delete stock"""
         try:
-            self.stock_repository.delete(db, id=stock_id)
-            return True
+            db_stock = self.stock_repository.delete(db, id=stock_id)
         except ValueError:
             raise exceptions.StockNotFoundError(stock_id)
+        publish_on_commit(
+            db, "deleted", stock_id=stock_id, car_id=db_stock.car_id, quantity=0, delta=-db_stock.quantity,
+            available=0, reserved_delta=-db_stock.reserved_quantity,
+        )
+        self.cache.invalidate_on_commit(db, "stock", stock_id)
+        return True
 
     def get_low_stock_items(self, db: Session, threshold: int = 5) -> list[schemas.Stock]:
-        """Get stocks with quantity below threshold"""
-        db_stocks = self.stock_repository.get_low_stock(db, threshold=threshold)
+        """Get stocks with at most threshold units available outside reservations"""
+        db_stocks = self.stock_repository.get_low_stock(
+            db, threshold=threshold, options=self.load_options
+        )
         return db_stocks
 
     def get_available_stocks(self, db: Session) -> list[schemas.Stock]:
-        """Get all stocks with quantity > 0"""
-        db_stocks = self.stock_repository.get_available_stock(db)
+        """Get all stocks with units left outside reservations"""
+        db_stocks = self.stock_repository.get_available_stock(db, options=self.load_options)
         return db_stocks
 
 
-# Create singleton instance
+class AsyncStockService:
+    """
+    StockService on AsyncSession.
+    Reads query natively, writes run the sync service rules through run_sync.
+    """
+
+    def __init__(self, service: StockService):
+        self.service = service
+        self.stock_repository = repository.async_stock_repository
+
+    @property
+    def load_options(self) -> tuple:
+        """Stock responses embed the car, which cannot be lazy loaded on AsyncSession"""
+        return self.service.load_options
+
+    async def create_stock(self, db: AsyncSession, stock: schemas.StockCreate) -> schemas.Stock:
+        """Create a new stock"""
+        return await run_sync(db, self.service.create_stock, stock, schema=schemas.Stock)
+
+    async def get_stock(self, db: AsyncSession, stock_id: int) -> schemas.Stock:
+        """Get stock by ID"""
+        db_stock = await self.stock_repository.get_by_id(
+            db, id=stock_id, options=self.load_options
+        )
+        if db_stock is None:
+            raise exceptions.StockNotFoundError(stock_id)
+
+        return db_stock
+
+    async def get_stock_versions(self, db: AsyncSession, stock_id: int) -> tuple:
+        """Row versions behind the ETag of a stock, read without loading it"""
+        versions = await self.stock_repository.get_versions(db, id=stock_id)
+        if versions is None:
+            raise exceptions.StockNotFoundError(stock_id)
+        return versions
+
+    async def get_stock_by_car(self, db: AsyncSession, car_id: int) -> schemas.Stock:
+        """Get stock by car ID"""
+        db_stock = await self.stock_repository.get_by_car_id(
+            db, car_id=car_id, options=self.load_options
+        )
+        if db_stock is None:
+            raise exceptions.StockNotFoundError(0)  # Car lookup, no stock ID
+
+        return db_stock
+
+    async def buy_car_from_stock(self, db: AsyncSession, car_id: int, quantity: int) -> schemas.Stock:
+        """Buy car from stock (reduce quantity)"""
+        return await run_sync(
+            db, self.service.buy_car_from_stock, car_id, quantity, schema=schemas.Stock
+        )
+
+    async def get_stocks(self, db: AsyncSession) -> Page[schemas.Stock]:
+        """Get all stocks with pagination"""
+        return await apaginate(
+            db, select(models.Stock).options(*self.load_options).order_by(models.Stock.id)
+        )
+
+    async def get_stocks_versions(self, db: AsyncSession, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+        """Total and row versions of a page of stocks, behind the ETag of the page"""
+        return await self.stock_repository.get_page_versions(db, limit=limit, offset=offset)
+
+    async def update_stock(self, db: AsyncSession, stock_id: int, stock_update: schemas.StockUpdate) -> schemas.Stock:
+        """Update stock"""
+        return await run_sync(
+            db, self.service.update_stock, stock_id, stock_update, schema=schemas.Stock
+        )
+
+    async def delete_stock(self, db: AsyncSession, stock_id: int) -> bool:
+        """Delete stock"""
+        return await run_sync(db, self.service.delete_stock, stock_id)
+
+    async def get_low_stock_items(self, db: AsyncSession, threshold: int = 5) -> list[schemas.Stock]:
+        """Get stocks with at most threshold units available outside reservations"""
+        return await self.stock_repository.get_low_stock(
+            db, threshold=threshold, options=self.load_options
+        )
+
+    async def get_available_stocks(self, db: AsyncSession) -> list[schemas.Stock]:
+        """Get all stocks with units left outside reservations"""
+        return await self.stock_repository.get_available_stock(
+            db, options=self.load_options
+        )
+
+
+# Create singleton instances
 stock_service = StockService()
+async_stock_service = AsyncStockService(stock_service)
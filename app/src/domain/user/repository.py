@@ -1,8 +1,10 @@
 from typing import List, Optional
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.src.core.repository import CRUDBase
+from app.src.core.repository import AsyncCRUDBase, CRUDBase
 from . import models, schemas
 
 
@@ -26,10 +28,36 @@ class UserRepository(CRUDBase[models.User, dict, schemas.UserUpdate]):
         
         db_user.is_active = False
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        db.flush()
         return db_user
 
+    def set_password_hash(self, db: Session, *, user_id: int, hashed_password: str) -> models.User:
+        """Replace the stored password hash of a user"""
+        db_user = self.get_by_id(db, id=user_id)
+        if db_user is None:
+            raise ValueError(f"User with id {user_id} not found")
+
+        db_user.hashed_password = hashed_password
+        db.add(db_user)
+        db.flush()
+        return db_user
+
+
+class AsyncUserRepository(AsyncCRUDBase[models.User, dict, schemas.UserUpdate]):
+    def __init__(self):
+        super().__init__(models.User)
+
+    async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[models.User]:
+        """Get user by email"""
+        result = await db.execute(select(self.model).where(self.model.email == email))
+        return result.scalars().first()
+
+    async def get_active_users(self, db: AsyncSession) -> List[models.User]:
+        """Get all active users"""
+        result = await db.execute(select(self.model).where(self.model.is_active == True))
+        return list(result.scalars().all())
+
 
-# Create singleton instance
+# Create singleton instances
 user_repository = UserRepository()
+async_user_repository = AsyncUserRepository()
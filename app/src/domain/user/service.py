@@ -1,35 +1,44 @@
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination.ext.sqlalchemy import apaginate, paginate
 
-from . import exceptions, repository, schemas
+from app.src.core.database import run_sync
+from app.src.core.pagination import CursorPage, CursorParams, paginate_cursor
+from app.src.core.security import password_hasher
+from app.src.core.unit_of_work import transactional
+from . import exceptions, models, repository, schemas
 
 
 class UserService:
     def __init__(self):
         self.user_repository = repository.user_repository
 
-    def create_user(self, db: Session, user: schemas.UserCreate) -> schemas.User:
-        """Create a new user"""
+    @transactional
+    def create_user(
+        self, db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None
+    ) -> schemas.User:
+        """Create a new user, hashing the password on the hasher pool unless the caller already did"""
+        if hashed_password is None:
+            hashed_password = password_hasher.hash_blocking(user.password)
+
         # Check if user with same email already exists
         existing_user = self.user_repository.get_by_email(db, email=user.email)
         if existing_user:
             raise exceptions.UserAlreadyExistsError("email", user.email)
         
-        # Create user (with fake hashing for now)
-        fake_hashed_password = user.password + "notreallyhashed"
-        
         # Create user directly with model data
         from .models import User
         db_user = User(
             email=user.email,
-            hashed_password=fake_hashed_password,
+            hashed_password=hashed_password,
             is_active=user.is_active if user.is_active is not None else True
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        db.flush()
         return db_user
 
     def get_user(self, db: Session, user_id: int) -> schemas.User:
@@ -53,8 +62,23 @@ class UserService:
         from .models import User
         return paginate(db, select(User).order_by(User.id))
 
-    def update_user(self, db: Session, user_id: int, user_update: schemas.UserUpdate) -> schemas.User:
-        """Update user"""
+    def get_users_page(self, db: Session, params: CursorParams) -> CursorPage[schemas.User]:
+        """Get a page of users after a cursor"""
+        return paginate_cursor(db, select(models.User), [models.User.id], params)
+
+    @transactional
+    def update_user(
+        self,
+        db: Session,
+        user_id: int,
+        user_update: schemas.UserUpdate,
+        hashed_password: Optional[str] = None,
+    ) -> schemas.User:
+        """Update user, a new password is hashed like in create_user"""
+        # Hashed before any query, no connection is held while bcrypt runs
+        if user_update.password and hashed_password is None:
+            hashed_password = password_hasher.hash_blocking(user_update.password)
+
         db_user = self.user_repository.get_by_id(db, id=user_id)
         if db_user is None:
             raise exceptions.UserNotFoundError(user_id)
@@ -65,15 +89,26 @@ class UserService:
             if existing_user:
                 raise exceptions.UserAlreadyExistsError("email", user_update.email)
         
-        # Handle password update
-        update_data = user_update.model_dump(exclude_unset=True)
-        if "password" in update_data:
-            update_data["hashed_password"] = update_data.pop("password") + "notreallyhashed"
-        
-        # Update user
-        updated_user = self.user_repository.update(db, db_obj=db_user, obj_in=update_data)
+        # Password update, stored as its hash
+        fields = schemas.UserUpdate(**user_update.model_dump(exclude_unset=True, exclude={"password"}))
+        updated_user = self.user_repository.update(db, db_obj=db_user, obj_in=fields)
+        if user_update.password:
+            updated_user = self.user_repository.set_password_hash(
+                db,
+                user_id=user_id,
+                hashed_password=hashed_password,
+            )
         return updated_user
 
+    @transactional
+    def update_password_hash(self, db: Session, user_id: int, hashed_password: str) -> schemas.User:
+        """Store a new hash of the same password, after a change of hashing cost"""
+        try:
+            return self.user_repository.set_password_hash(db, user_id=user_id, hashed_password=hashed_password)
+        except ValueError:
+            raise exceptions.UserNotFoundError(user_id)
+
+    @transactional
     def delete_user(self, db: Session, user_id: int) -> bool:
         """Delete user"""
         try:
@@ -82,6 +117,7 @@ class UserService:
         except ValueError:
             raise exceptions.UserNotFoundError(user_id)
 
+    @transactional
     def deactivate_user(self, db: Session, user_id: int) -> schemas.User:
         """Deactivate a user"""
         db_user = self.user_repository.get_by_id(db, id=user_id)
@@ -97,5 +133,63 @@ class UserService:
         return db_users
 
 
+class AsyncUserService:
+    """
+    UserService on AsyncSession.
+    Reads query natively, writes run the sync service rules through run_sync.
+    """
+
+    def __init__(self, service: UserService):
+        self.service = service
+        self.user_repository = repository.async_user_repository
+
+    async def create_user(self, db: AsyncSession, user: schemas.UserCreate) -> schemas.User:
+        """Create a new user, the password is hashed on the hasher pool"""
+        hashed_password = await password_hasher.hash(user.password)
+        return await run_sync(db, self.service.create_user, user, hashed_password, schema=schemas.User)
+
+    async def get_user(self, db: AsyncSession, user_id: int) -> schemas.User:
+        """Get user by ID"""
+        db_user = await self.user_repository.get_by_id(db, id=user_id)
+        if db_user is None:
+            raise exceptions.UserNotFoundError(user_id)
+
+        return db_user
+
+    async def get_user_by_email(self, db: AsyncSession, email: str) -> schemas.User:
+        """Get user by email"""
+        db_user = await self.user_repository.get_by_email(db, email=email)
+        if db_user is None:
+            raise exceptions.UserNotFoundError(0)  # Email lookup, no ID
+
+        return db_user
+
+    async def get_users(self, db: AsyncSession) -> Page[schemas.User]:
+        """Get all users with pagination"""
+        from .models import User
+        return await apaginate(db, select(User).order_by(User.id))
+
+    async def update_user(self, db: AsyncSession, user_id: int, user_update: schemas.UserUpdate) -> schemas.User:
+        """Update user, a new password is hashed on the hasher pool"""
+        # run_sync runs on the event loop, the hash must not be taken inside it
+        hashed_password = await password_hasher.hash(user_update.password) if user_update.password else None
+        return await run_sync(
+            db, self.service.update_user, user_id, user_update, hashed_password, schema=schemas.User
+        )
+
+    async def delete_user(self, db: AsyncSession, user_id: int) -> bool:
+        """Delete user"""
+        return await run_sync(db, self.service.delete_user, user_id)
+
+    async def deactivate_user(self, db: AsyncSession, user_id: int) -> schemas.User:
+        """Deactivate a user"""
+        return await run_sync(db, self.service.deactivate_user, user_id, schema=schemas.User)
+
+    async def get_active_users(self, db: AsyncSession) -> list[schemas.User]:
+        """Get all active users"""
+        return await self.user_repository.get_active_users(db)
+
+
 # Create singleton instances
 user_service = UserService()
+async_user_service = AsyncUserService(user_service)
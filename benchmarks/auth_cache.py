@@ -0,0 +1,72 @@
+"""
+Auth dependency benchmark
+Calls get_current_user at a fixed request rate, as the /admin routes do for
+every request, with a pool of bearer tokens:
+- uncached: every call verifies the HMAC signature and parses the claims
+- cached: calls after the first of each token are served by the token cache
+Requests are issued on one event loop the way a worker runs them; reports the
+rate reached, latency percentiles and the CPU time spent per request.
+
+    python -m benchmarks.auth_cache
+    python -m benchmarks.auth_cache --rate 10000 --duration 5 --tokens 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from app.src.core import security
+from app.src.core.security import TokenCache, create_access_token, get_current_user
+
+MODES = ("uncached", "cached")
+
+
+async def run(mode: str, tokens: List[str], rate: int, duration: float) -> dict:
+    security.token_cache = TokenCache(max_entries=len(tokens) if mode == "cached" else 0)
+    total = int(rate * duration)
+    interval = 1 / rate
+    latencies = []
+
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    for sent in range(total):
+        # Pace against the schedule rather than sleeping per request, so a slow
+        # dependency shows up as a lower achieved rate
+        delay = started + sent * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        call_started = time.perf_counter()
+        await get_current_user(tokens[sent % len(tokens)])
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "mode": mode,
+        "requests_per_second": round(total / elapsed, 1),
+        "p50_us": round(percentiles[49] * 1e6, 1),
+        "p99_us": round(percentiles[98] * 1e6, 1),
+        "cpu_us_per_request": round(cpu / total * 1e6, 1),
+        "hits": security.token_cache.hits,
+        "misses": security.token_cache.misses,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=int, default=10000, help="Requests per second offered")
+    parser.add_argument("--duration", type=float, default=3, help="Seconds per mode")
+    parser.add_argument("--tokens", type=int, default=100, help="Distinct bearer tokens in use")
+    args = parser.parse_args()
+
+    tokens = [create_access_token({"sub": f"user{n}@example.com"}) for n in range(args.tokens)]
+    print(f"rate={args.rate} duration={args.duration} tokens={args.tokens}")
+    for mode in MODES:
+        print(asyncio.run(run(mode, tokens, args.rate, args.duration)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.src.core.database import SQLALCHEMY_DATABASE_URL, Base
+
+# Register every table on Base.metadata for autogenerate
+from app.src.domain.buyer import models as buyer_models  # noqa: F401
+from app.src.domain.car import models as car_models  # noqa: F401
+from app.src.domain.report import models as report_models  # noqa: F401
+from app.src.domain.reservation import models as reservation_models  # noqa: F401
+from app.src.domain.sale import models as sale_models  # noqa: F401
+from app.src.domain.seller import models as seller_models  # noqa: F401
+from app.src.domain.stock import models as stock_models  # noqa: F401
+from app.src.domain.user import models as user_models  # noqa: F401
+
+###
+# Alembic migration environment
+###
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Search indexes and their FTS5 tables are raw DDL, unknown to the metadata
+SEARCH_INDEXES = (buyer_models.name_search.name, seller_models.name_search.name)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate from dropping the search indexes"""
+    return not (reflected and compare_to is None and name.startswith(SEARCH_INDEXES))
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL without connecting"""
+    context.configure(
+        url=SQLALCHEMY_DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+        render_as_batch=SQLALCHEMY_DATABASE_URL.startswith("sqlite"),
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run the migrations on a dedicated connection"""
+    connectable = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
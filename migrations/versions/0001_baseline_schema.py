@@ -0,0 +1,104 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:22:14.109784
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'buyers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('phone', sa.String(), nullable=True),
+        sa.Column('address_cep', sa.String(), nullable=True),
+        sa.Column('address_public_place', sa.String(), nullable=True),
+        sa.Column('address_city', sa.String(), nullable=True),
+        sa.Column('address_district', sa.String(), nullable=True),
+        sa.Column('address_state', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_buyers_id', 'buyers', ['id'], unique=False)
+
+    op.create_table(
+        'cars',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('year', sa.Integer(), nullable=True),
+        sa.Column('brand', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('cars_year_name_brand_uk_idx1', 'cars', ['year', 'name', 'brand'], unique=True)
+    op.create_index('ix_cars_brand', 'cars', ['brand'], unique=False)
+    op.create_index('ix_cars_id', 'cars', ['id'], unique=False)
+    op.create_index('ix_cars_lower_brand_id', 'cars', [sa.text('lower(brand)'), 'id'], unique=False)
+    op.create_index('ix_cars_name', 'cars', ['name'], unique=False)
+    op.create_index('ix_cars_year', 'cars', ['year'], unique=False)
+
+    op.create_table(
+        'sellers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('cpf', sa.String(), nullable=True),
+        sa.Column('phone', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_sellers_cpf', 'sellers', ['cpf'], unique=False)
+    op.create_index('ix_sellers_id', 'sellers', ['id'], unique=False)
+
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('hashed_password', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+
+    op.create_table(
+        'sales',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('car_id', sa.Integer(), nullable=True),
+        sa.Column('buyer_id', sa.Integer(), nullable=True),
+        sa.Column('seller_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['buyer_id'], ['buyers.id']),
+        sa.ForeignKeyConstraint(['car_id'], ['cars.id']),
+        sa.ForeignKeyConstraint(['seller_id'], ['sellers.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_sales_created_at_id', 'sales', ['created_at', 'id'], unique=False)
+    op.create_index('ix_sales_id', 'sales', ['id'], unique=False)
+
+    op.create_table(
+        'stocks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=True),
+        sa.Column('car_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['car_id'], ['cars.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('car_id'),
+    )
+    op.create_index('ix_stocks_id', 'stocks', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('stocks')
+    op.drop_table('sales')
+    op.drop_table('users')
+    op.drop_table('sellers')
+    op.drop_table('cars')
+    op.drop_table('buyers')
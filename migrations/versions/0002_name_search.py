@@ -0,0 +1,38 @@
+"""name search indexes for buyers and sellers
+
+pg_trgm GIN indexes on PostgreSQL, FTS5 trigram tables kept in sync by
+triggers on SQLite, filled with the existing rows.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:40:02.512318
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.src.domain.buyer.models import name_search as buyer_name_search
+from app.src.domain.seller.models import name_search as seller_name_search
+
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_INDEXES = (buyer_name_search, seller_name_search)
+
+
+def upgrade() -> None:
+    dialect_name = op.get_context().dialect.name
+    for index in SEARCH_INDEXES:
+        for statement in index.create_statements(dialect_name):
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect_name = op.get_context().dialect.name
+    for index in SEARCH_INDEXES:
+        for statement in index.drop_statements(dialect_name):
+            op.execute(statement)
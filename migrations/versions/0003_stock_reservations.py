@@ -0,0 +1,54 @@
+"""stock reservations
+
+Units held by reservations are tracked in stocks.reserved_quantity, the
+sweeper finds expired holds through a partial index on the active ones.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:05:37.204117
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('stocks', sa.Column('reserved_quantity', sa.Integer(), server_default='0', nullable=False))
+
+    op.create_table(
+        'reservations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('car_id', sa.Integer(), nullable=False),
+        sa.Column('buyer_id', sa.Integer(), nullable=False),
+        sa.Column('seller_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['buyer_id'], ['buyers.id']),
+        sa.ForeignKeyConstraint(['car_id'], ['cars.id']),
+        sa.ForeignKeyConstraint(['seller_id'], ['sellers.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_reservations_active_expires_at',
+        'reservations',
+        ['expires_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'active'"),
+        sqlite_where=sa.text("status = 'active'"),
+    )
+    op.create_index('ix_reservations_id', 'reservations', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('reservations')
+    with op.batch_alter_table('stocks') as batch_op:
+        batch_op.drop_column('reserved_quantity')
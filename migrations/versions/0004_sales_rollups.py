@@ -0,0 +1,43 @@
+"""sales rollups
+
+Sales counted per day, seller and car brand for the reports, filled from
+the existing sales.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:31:50.846201
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sales_rollups',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('seller_id', sa.Integer(), nullable=False),
+        sa.Column('brand', sa.String(), nullable=False),
+        sa.Column('sales_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'seller_id', 'brand'),
+    )
+    op.create_index('ix_sales_rollups_seller_id_day', 'sales_rollups', ['seller_id', 'day'], unique=False)
+
+    op.execute(
+        "INSERT INTO sales_rollups (day, seller_id, brand, sales_count) "
+        "SELECT date(sales.created_at), coalesce(sales.seller_id, 0), coalesce(cars.brand, ''), count(*) "
+        "FROM sales LEFT OUTER JOIN cars ON cars.id = sales.car_id "
+        "WHERE sales.created_at IS NOT NULL "
+        "GROUP BY date(sales.created_at), coalesce(sales.seller_id, 0), coalesce(cars.brand, '')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sales_rollups')
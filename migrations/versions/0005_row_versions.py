@@ -0,0 +1,33 @@
+"""row versions
+
+Version columns of cars, buyers, sellers, stocks and sales, checked and
+bumped by updates and behind the ETags of their documents. Existing rows
+start at version 1.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:05:37.204915
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ('cars', 'buyers', 'sellers', 'stocks', 'sales')
+
+
+def upgrade() -> None:
+    for table_name in VERSIONED_TABLES:
+        op.add_column(table_name, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    for table_name in reversed(VERSIONED_TABLES):
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column('version')
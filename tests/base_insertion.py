@@ -94,8 +94,8 @@ def insert_into_sales(input):
 
 def read_stock_by_id(id):
     with engine.connect() as con:
-        statement = text("SELECT * FROM stocks WHERE id = :id")
-        keys = ("id", "quantity", "car_id")
+        statement = text("SELECT id, quantity, car_id, reserved_quantity FROM stocks WHERE id = :id")
+        keys = ("id", "quantity", "car_id", "reserved_quantity")
         for row in con.execute(statement, {"id": id}):
             return dict(zip(keys, row))
     return None
@@ -2,16 +2,24 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.src.core.database import Base
+from app.src.core.health import HealthMonitor
+from app.src.core.migrations import stamp
+from app.src.core.pool import pool_options
 from app.src.api.deps import get_db
 
 ## Configure SQLite
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
+# Instrumented as the primary pool, the one the pool metrics and health probes report
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    **pool_options(SQLALCHEMY_DATABASE_URL, "primary"),
 )
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 
 
 def override_get_db():
@@ -27,8 +35,15 @@ def configure_test_database(app):
     """Override default database for test embedded database"""
 
     Base.metadata.create_all(bind=engine)
+    # Built from the models, recorded at the migration head for the startup check
+    with engine.begin() as connection:
+        stamp(connection)
 
     app.dependency_overrides[get_db] = override_get_db
+    # Schema check and health probes of the lifespan run against the test database
+    app.state.engine = engine
+    if app.state.health_monitor.engine is not engine:
+        app.state.health_monitor = HealthMonitor(engine)
 
 
 def truncate_tables(tables):
@@ -3,9 +3,10 @@
 ###
 
 tables = (
+    "sales_rollups",  # No dependencies
+    "reservations",   # Depends on cars, buyers, sellers
     "sales",      # Depends on cars, buyers, sellers
     "stocks",     # Depends on cars
-    "items",      # Depends on users
     "buyers",     # No dependencies
     "sellers",    # No dependencies
     "cars",       # No dependencies
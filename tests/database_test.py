@@ -1,3 +1,9 @@
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import event
+
+from app.src.core.cache import entity_cache
 from .config import database_test_config
 from .database_tables import tables
 
@@ -12,5 +18,22 @@ def configure_test_database(app):
 
 
 def clear_database():
-    """Clear test database"""
+    """Clear test database, and the entity cache filled from it"""
     database_test_config.truncate_tables(tables)
+    entity_cache.clear()
+
+
+@contextmanager
+def count_queries() -> Iterator[List[str]]:
+    """Collect the SQL statements run on the test database inside the block"""
+    statements: List[str] = []
+
+    def on_execute(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = database_test_config.engine
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
@@ -3,7 +3,7 @@ import pytest
 
 @pytest.fixture
 def car_json():
-    return {"id": 1, "name": "Galardo", "year": 1999, "brand": "lamborghini"}
+    return {"id": 1, "name": "Galardo", "year": 1999, "brand": "lamborghini", "version": 1}
 
 
 @pytest.fixture
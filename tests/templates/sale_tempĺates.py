@@ -18,7 +18,7 @@ def sale_request_json():
 def sale_response_json():
     return {
         "id": 1,
-        "car": {"id": 1, "name": "Galardo", "year": 1999, "brand": "lamborghini"},
+        "car": {"id": 1, "name": "Galardo", "year": 1999, "brand": "lamborghini", "version": 1},
         "buyer": {
             "id": 1,
             "name": "Bruce Lee",
@@ -28,14 +28,17 @@ def sale_response_json():
             "address_district": "Cidade Baixa",
             "address_state": "Goias",
             "phone": "12996651234",
+            "version": 1,
         },
         "seller": {
             "id": 1,
             "name": "João da Silva",
             "cpf": "69285717640",
             "phone": "1299871234",
+            "version": 1,
         },
         "created_at": None,
+        "version": 1,
     }
 
 
@@ -15,8 +15,10 @@ def stock_request_json_out_of_stock():
 def stock_response_json():
     return {
         "id": 1,
-        "car": {"id": 1, "name": "Galardo", "year": 1999, "brand": "lamborghini"},
+        "car": {"id": 1, "name": "Galardo", "year": 1999, "brand": "lamborghini", "version": 1},
         "quantity": 10,
+        "reserved_quantity": 0,
+        "version": 1,
     }
 
 
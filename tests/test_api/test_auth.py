@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.src.core.config import settings
+from app.src.core.security import password_hasher, pwd_context
+from app.src.domain.user.models import User
+from ..config.database_test_config import TestingSessionLocal
+from ..database_test import clear_database, configure_test_database
+
+client = TestClient(app)
+
+api_route = "/api/v1"
+
+credentials = {"username": "test@example.com", "password": "password123"}
+
+
+def setup_module(module):
+    configure_test_database(app)
+    pwd_context.update(bcrypt__rounds=4)
+
+
+def teardown_module(module):
+    pwd_context.update(bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+
+def setup_function(module):
+    clear_database()
+
+
+def register():
+    return client.post(api_route + "/register/", json={"email": credentials["username"], "password": credentials["password"]})
+
+
+def stored_hash() -> str:
+    db = TestingSessionLocal()
+    try:
+        return db.query(User).one().hashed_password
+    finally:
+        db.close()
+
+
+def test_register_and_login():
+    """Registered users get a token and can log in with their password"""
+    response = register()
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    assert client.get(api_route + "/me/", headers={"Authorization": f"Bearer {token}"}).json() == {"email": credentials["username"]}
+    assert stored_hash().startswith("$2b$04$")
+
+    response = client.post(api_route + "/login/", data=credentials)
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+
+
+def test_register_twice():
+    register()
+    response = register()
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Email already registered"}
+
+
+@pytest.mark.parametrize("form", [
+    {**credentials, "password": "wrong-password"},
+    {**credentials, "username": "nobody@example.com"},
+])
+def test_login_wrong_credentials(form):
+    register()
+    response = client.post(api_route + "/login/", data=form)
+    assert response.status_code == 401
+
+
+def test_login_rehashes_on_cost_change():
+    """A hash of another cost is replaced on the next successful login"""
+    register()
+    pwd_context.update(bcrypt__rounds=5)
+    try:
+        assert client.post(api_route + "/login/", data={**credentials, "password": "wrong-password"}).status_code == 401
+        assert stored_hash().startswith("$2b$04$")
+        assert client.post(api_route + "/login/", data=credentials).status_code == 200
+        assert stored_hash().startswith("$2b$05$")
+    finally:
+        pwd_context.update(bcrypt__rounds=4)
+
+
+def test_login_refused_when_hasher_full():
+    """Past PASSWORD_HASH_MAX_PENDING logins get a 503 instead of queueing"""
+    register()
+    release = threading.Event()
+    blocked = [password_hasher.submit(release.wait) for _ in range(password_hasher.max_pending)]
+    try:
+        response = client.post(api_route + "/login/", data=credentials)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+    finally:
+        release.set()
+        for future in blocked:
+            future.result()
+    assert password_hasher.pending == 0
+    assert client.post(api_route + "/login/", data=credentials).status_code == 200
@@ -111,3 +111,32 @@ def test_delete_buyer_not_found(buyer_not_found_error):
     response = client.delete(request_url)
     assert response.status_code == 404
     assert response.json() == buyer_not_found_error
+
+
+def test_create_buyers_bulk(buyer_json):
+    """Create buyers in bulk, repeated phones are reported per row"""
+    buyer = {key: value for key, value in buyer_json.items() if key != "id"}
+
+    response = client.post(buyers_route + "/bulk", json=[buyer, buyer])
+    assert response.status_code == 207
+    assert [created["phone"] for created in response.json()["created"]] == [buyer["phone"]]
+    assert response.json()["errors"][0]["index"] == 1
+
+
+def test_search_buyers_by_name(buyer_json):
+    """Search buyers by part of their name ignoring case, best matches first"""
+    for buyer_id, name in [(1, "Bruce Lee"), (2, "Brandon Lee"), (3, "Lee"), (4, "Chuck Norris")]:
+        insert_into_buyers({**buyer_json, "id": buyer_id, "name": name})
+
+    response = client.get(buyers_route + "/search/", params={"name": "LEE"})
+    assert response.status_code == 200
+    ids = [buyer["id"] for buyer in response.json()]
+    assert ids[0] == 3
+    assert sorted(ids) == [1, 2, 3]
+
+    response = client.get(buyers_route + "/search/", params={"name": "lee", "skip": 1, "limit": 1})
+    assert [buyer["id"] for buyer in response.json()] == ids[1:2]
+
+    # Shorter than a trigram
+    response = client.get(buyers_route + "/search/", params={"name": "ck"})
+    assert [buyer["id"] for buyer in response.json()] == [4]
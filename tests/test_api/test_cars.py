@@ -1,8 +1,15 @@
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import inspect, select
 
 from app.main import app
+from app.src.domain.car import exceptions, schemas
+from app.src.domain.car.models import Car
+from app.src.domain.car.repository import brand_criteria
+from app.src.domain.car.service import car_service
 from ..base_insertion import insert_into_cars
-from ..database_test import clear_database, configure_test_database
+from ..config.database_test_config import TestingSessionLocal, engine
+from ..database_test import clear_database, configure_test_database, count_queries
 from ..templates.car_tempĺates import car_json, car_not_found_error
 
 CAR_ROUTE = "/api/v1/cars"
@@ -93,3 +100,190 @@ def test_delete_car_not_found(car_not_found_error):
     response = client.delete(request_url)
     assert response.status_code == 404
     assert response.json() == car_not_found_error
+
+
+def test_create_cars_bulk(car_json):
+    """Create cars in bulk, duplicates and invalid rows are reported per row"""
+    insert_into_cars(car_json)
+    car = {key: value for key, value in car_json.items() if key != "id"}
+    other_car = {"name": "Murcielago", "year": 2001, "brand": "lamborghini"}
+
+    response = client.post(CAR_ROUTE + "/bulk", json=[car, other_car, other_car, {"name": "Huracan"}])
+    assert response.status_code == 207
+    assert response.json()["created"] == [{"id": 2, **other_car, "version": 1}]
+    assert [error["index"] for error in response.json()["errors"]] == [0, 2, 3]
+
+
+def test_create_cars_bulk_ndjson():
+    """Create cars in bulk from NDJSON"""
+    body = '{"name": "Galardo", "year": 1999, "brand": "lamborghini"}\n{"name": "Aventador", "year": 2011, "brand": "lamborghini"}\n'
+
+    response = client.post(
+        CAR_ROUTE + "/bulk", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 201
+    assert [car["name"] for car in response.json()["created"]] == ["Galardo", "Aventador"]
+    assert response.json()["errors"] == []
+
+
+def test_create_cars_bulk_invalid_body():
+    """Bulk body must be a list"""
+    response = client.post(CAR_ROUTE + "/bulk", json={"name": "Galardo"})
+    assert response.status_code == 400
+
+
+def test_export_cars_csv(car_json):
+    """Export cars as CSV"""
+    insert_into_cars(car_json)
+
+    response = client.get(CAR_ROUTE + "/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines() == ["id,name,year,brand,version", "1,Galardo,1999,lamborghini,1"]
+
+
+def test_read_cars_cursor(car_json):
+    """Walk cars with keyset pagination"""
+    for car_id in range(1, 4):
+        insert_into_cars({**car_json, "id": car_id, "name": f"Galardo {car_id}"})
+
+    response = client.get(CAR_ROUTE + "/cursor", params={"size": 2, "include_total": True})
+    assert response.status_code == 200
+    first_page = response.json()
+    assert [car["id"] for car in first_page["items"]] == [1, 2]
+    assert first_page["total"] == 3
+
+    response = client.get(CAR_ROUTE + "/cursor", params={"size": 2, "cursor": first_page["next_cursor"]})
+    second_page = response.json()
+    assert [car["id"] for car in second_page["items"]] == [3]
+    assert second_page["next_cursor"] is None
+    assert second_page["total"] is None
+
+
+def test_read_cars_cursor_invalid():
+    """Tampered cursors are rejected"""
+    response = client.get(CAR_ROUTE + "/cursor", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_create_car_already_exists(car_json):
+    """Create a car with a taken name, year and brand, past the first page of cars"""
+    for car_id in range(1, 151):
+        insert_into_cars({**car_json, "id": car_id, "year": car_json["year"] + car_id})
+
+    response = client.post(CAR_ROUTE + "/", json={**car_json, "year": car_json["year"] + 150})
+    assert response.status_code == 409
+    assert response.json() == {"detail": "car already exists"}
+
+
+@pytest.mark.filterwarnings("ignore:Skipped unsupported reflection")
+def test_cars_natural_key_unique_index():
+    """(year, name, brand) is backed by a unique index"""
+    indexes = {index["name"]: index for index in inspect(engine).get_indexes("cars")}
+    assert indexes["cars_year_name_brand_uk_idx1"]["unique"]
+    assert indexes["cars_year_name_brand_uk_idx1"]["column_names"] == ["year", "name", "brand"]
+
+
+def test_update_car_already_exists(car_json):
+    """Update a car to the name, year and brand of another one"""
+    insert_into_cars(car_json)
+    insert_into_cars({**car_json, "id": 2, "year": 2000})
+
+    db = TestingSessionLocal()
+    try:
+        with pytest.raises(exceptions.CarAlreadyExistsError):
+            car_service.update_car(db, 2, schemas.CarUpdate(year=car_json["year"]))
+        updated = car_service.update_car(db, 2, schemas.CarUpdate(name="Diablo", year=car_json["year"]))
+        assert (updated.name, updated.year) == ("Diablo", car_json["year"])
+    finally:
+        db.close()
+
+
+def test_search_cars_by_brand_paginated(car_json):
+    """Search cars by brand ignoring case, past the first 100 cars, one page at a time"""
+    for car_id in range(1, 106):
+        brand = "Ferrari" if car_id > 100 else car_json["brand"]
+        insert_into_cars({**car_json, "id": car_id, "year": car_json["year"] + car_id, "brand": brand})
+
+    response = client.get(CAR_ROUTE + "/search/", params={"brand": "FERRARI"})
+    assert response.status_code == 200
+    assert [car["id"] for car in response.json()] == [101, 102, 103, 104, 105]
+
+    response = client.get(CAR_ROUTE + "/search/", params={"brand": "ferrari", "skip": 2, "limit": 2})
+    assert [car["id"] for car in response.json()] == [103, 104]
+
+
+def test_search_cars_by_brand_prefix(car_json):
+    """Search cars by the start of their brand"""
+    insert_into_cars(car_json)
+    insert_into_cars({**car_json, "id": 2, "brand": "Lancia"})
+    insert_into_cars({**car_json, "id": 3, "brand": "Lamborghini Veneno"})
+
+    response = client.get(CAR_ROUTE + "/search/", params={"brand": "LAM", "prefix": True})
+    assert [car["id"] for car in response.json()] == [1, 3]
+
+    response = client.get(CAR_ROUTE + "/search/", params={"brand": "lam"})
+    assert response.json() == []
+
+
+def test_search_cars_by_brand_prefix_ending_in_max_code_point(car_json):
+    """A prefix ending in U+10FFFF has no next character, the range drops it instead of failing"""
+    insert_into_cars({**car_json, "brand": "lam\U0010ffff\U0010ffffx"})
+    insert_into_cars({**car_json, "id": 2, "brand": "lan"})
+
+    response = client.get(CAR_ROUTE + "/search/", params={"brand": "LAM\U0010ffff", "prefix": True})
+    assert response.status_code == 200
+    assert [car["id"] for car in response.json()] == [1]
+    assert client.get(CAR_ROUTE + "/search/", params={"brand": "\U0010ffff", "prefix": True}).json() == []
+
+
+def test_search_cars_by_brand_uses_index():
+    """Brand search seeks on the lower(brand) index"""
+    for prefix in (False, True):
+        statement = select(Car).where(brand_criteria(Car.brand, "Lam", prefix)).order_by(Car.id)
+        compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+        with engine.connect() as connection:
+            plan = " ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+        assert "ix_cars_lower_brand_id" in plan
+        # A single brand is read from the index already ordered by id
+        assert prefix or "TEMP B-TREE" not in plan
+
+
+def test_read_car_not_modified(car_json):
+    """A current If-None-Match is answered with 304 from the version column, an update changes the ETag"""
+    insert_into_cars(car_json)
+    etag = client.get(CAR_ROUTE + "/1").headers["ETag"]
+
+    with count_queries() as statements:
+        response = client.get(CAR_ROUTE + "/1", headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    # One plain column SELECT of the version
+    assert len(statements) == 1 and "cars.version" in statements[0]
+
+    db = TestingSessionLocal()
+    try:
+        car_service.update_car(db, car_id=1, car_update=schemas.CarUpdate(name="Murcielago"))
+    finally:
+        db.close()
+
+    response = client.get(CAR_ROUTE + "/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.headers["ETag"] != etag
+    assert client.get(CAR_ROUTE + "/2", headers={"If-None-Match": etag}).status_code == 404
+
+
+def test_read_cars_not_modified(car_json):
+    """Pages are tagged from their total and row versions, a new car changes the ETag"""
+    insert_into_cars(car_json)
+    etag = client.get(CAR_ROUTE + "/").headers["ETag"]
+
+    assert client.get(CAR_ROUTE + "/", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(CAR_ROUTE + "/", params={"size": 10}, headers={"If-None-Match": etag}).status_code == 200
+
+    insert_into_cars({**car_json, "id": 2, "name": "Murcielago"})
+    response = client.get(CAR_ROUTE + "/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["total"] == 2
@@ -1,12 +1,21 @@
+import time
+
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.src.core.config import settings
+from ..config.database_test_config import engine
+from ..database_test import configure_test_database, count_queries
 
 client = TestClient(app)
 
 health_route = "/api/v1/system"
 
 
+def setup_module(module):
+    configure_test_database(app)
+
+
 def test_health_check():
     """Test basic health check endpoint"""
     response = client.get(f"{health_route}/health")
@@ -58,3 +67,70 @@ def test_api_root():
     assert 'docs' in response_data
     assert 'info' in response_data
     assert 'health' in response_data
+
+
+def test_pool_metrics():
+    """Test connection pool metrics endpoint"""
+    client.get(f"{health_route}/health")
+    response = client.get(f"{health_route}/pool")
+    assert response.status_code == 200
+    pools = response.json()['pools']
+    assert 'primary' in pools
+    primary = pools['primary']
+    assert primary['checkouts'] >= 1
+    assert primary['checkout_wait']['count'] >= 1
+    assert 'buckets' in primary['checkout_wait']
+    assert primary['pool']['pool_size'] > 0
+
+
+def test_probes_serve_the_monitor_snapshot():
+    """Probes read the last snapshot instead of querying the database each time"""
+    first = client.get(f"{health_route}/health/ready").json()
+    with count_queries() as statements:
+        responses = [client.get(f"{health_route}/{route}") for route in ("health", "health/ready", "health")]
+    assert statements == []
+    assert {response.json()["checked_at"] for response in responses} == {first["checked_at"]}
+    assert responses[0].json()["checks"]["database"]["latency_ms"] >= 0
+
+
+def test_health_monitor_probes_the_test_database():
+    """The monitor serving the probes is bound to the engine of the tests"""
+    assert app.state.health_monitor.engine is engine
+    assert app.state.engine is engine
+
+
+def test_readiness_fails_on_slow_database_and_exhausted_pool():
+    """Latency over the threshold or a saturated pool answer 503"""
+    health_monitor = app.state.health_monitor
+    try:
+        health_monitor.latency_threshold_ms = 0
+        health_monitor.check()
+        response = client.get(f"{health_route}/health/ready")
+        assert response.status_code == 503
+        assert response.json()["checks"]["database"]["status"] == "degraded"
+        assert client.get(f"{health_route}/health").json()["status"] == "healthy"
+
+        health_monitor.latency_threshold_ms = settings.HEALTH_DB_LATENCY_THRESHOLD_MS
+        health_monitor.pool_saturation_threshold = 0
+        health_monitor.check()
+        response = client.get(f"{health_route}/health/ready")
+        assert response.status_code == 503
+        assert response.json()["checks"]["database_pool"]["status"] == "exhausted"
+    finally:
+        health_monitor.latency_threshold_ms = settings.HEALTH_DB_LATENCY_THRESHOLD_MS
+        health_monitor.pool_saturation_threshold = settings.HEALTH_POOL_SATURATION_THRESHOLD
+        health_monitor.check()
+
+
+def test_readiness_fails_on_stale_snapshot():
+    """A running monitor that stopped completing rounds makes the worker not ready"""
+    health_monitor = app.state.health_monitor
+    started = time.time()
+    with TestClient(app) as running_client:
+        while health_monitor.snapshot is None or health_monitor.snapshot["checked_at"] < started:
+            time.sleep(0.01)
+        health_monitor.snapshot["checked_at"] -= settings.HEALTH_STALE_AFTER + 1
+        response = running_client.get(f"{health_route}/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["monitor"]["status"] == "stale"
+    health_monitor.check()
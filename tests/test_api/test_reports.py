@@ -0,0 +1,184 @@
+from datetime import date, datetime
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.src.core.unit_of_work import unit_of_work
+from app.src.domain.car.schemas import CarUpdate
+from app.src.domain.car.service import car_service
+from app.src.domain.report.leaderboard import SellerLeaderboard, seller_leaderboard
+from app.src.domain.report.service import report_service
+from app.src.domain.sale.schemas import SaleUpdate
+from app.src.domain.sale.service import sale_service
+from ..base_insertion import insert_into_buyers, insert_into_cars, insert_into_sellers, insert_into_stocks
+from ..config.database_test_config import TestingSessionLocal
+from ..database_test import clear_database, configure_test_database, count_queries
+from ..templates.buyer_tempĺates import buyer_json
+from ..templates.car_tempĺates import car_json
+from ..templates.seller_tempĺates import seller_json
+
+client = TestClient(app)
+
+reports_route = "/api/v1/reports"
+sales_route = "/api/v1/sales"
+
+
+def setup_module(module):
+    configure_test_database(app)
+
+
+def setup_function(module):
+    clear_database()
+    seller_leaderboard.reset()
+
+
+def insert_shop(car_json, buyer_json, seller_json):
+    """Insert two cars of different brands in stock, a buyer and two sellers"""
+    insert_into_cars(car_json)
+    insert_into_cars({**car_json, "id": 2, "name": "Fusca", "brand": "volkswagen"})
+    for car_id in (1, 2):
+        insert_into_stocks({"id": car_id, "car_id": car_id, "quantity": 10})
+    insert_into_buyers(buyer_json)
+    insert_into_sellers(seller_json)
+    insert_into_sellers({**seller_json, "id": 2, "cpf": "12345678909"})
+
+
+def read_reports():
+    """Every report, for comparisons"""
+    return [client.get(f"{reports_route}/sales/{report}").json() for report in ("by-day", "by-seller", "by-brand")]
+
+
+def test_sales_reports(car_json, buyer_json, seller_json):
+    """Creating, updating and deleting sales keep the reports up to date"""
+    insert_shop(car_json, buyer_json, seller_json)
+    sale = {"car_id": 1, "buyer_id": 1, "seller_id": 1}
+    client.post(sales_route + "/", json=sale)
+    client.post(sales_route + "/batch", json=[sale, {**sale, "car_id": 2}, {**sale, "car_id": 2, "seller_id": 2}])
+    moved_id = client.post(sales_route + "/", json=sale).json()["id"]
+    deleted_id = client.post(sales_route + "/", json=sale).json()["id"]
+
+    db = TestingSessionLocal()
+    try:
+        sale_service.update_sale(db, moved_id, SaleUpdate(car_id=2, seller_id=2))
+    finally:
+        db.close()
+    assert client.delete(f"{sales_route}/{deleted_id}").status_code == 200
+
+    today = datetime.utcnow().date().isoformat()
+    assert client.get(reports_route + "/sales/by-day").json() == [{"day": today, "sales": 5}]
+    assert client.get(reports_route + "/sales/by-seller").json() == [
+        {"seller_id": 1, "sales": 3},
+        {"seller_id": 2, "sales": 2},
+    ]
+    assert client.get(reports_route + "/sales/by-brand").json() == [
+        {"brand": "lamborghini", "sales": 2},
+        {"brand": "volkswagen", "sales": 3},
+    ]
+    assert client.get(reports_route + "/sales/by-brand", params={"seller_id": 2}).json() == [
+        {"brand": "volkswagen", "sales": 2},
+    ]
+    assert client.get(reports_route + "/sales/by-day", params={"end": "2000-01-01"}).json() == []
+
+
+def test_rebuild_sales_rollups(car_json, buyer_json, seller_json):
+    """A rebuild from the sales in chunks gives the incrementally kept rollups"""
+    insert_shop(car_json, buyer_json, seller_json)
+    sales = [{"car_id": car_id, "buyer_id": 1, "seller_id": seller_id} for car_id in (1, 2) for seller_id in (1, 2, 2)]
+    client.post(sales_route + "/batch", json=sales)
+    reports = read_reports()
+
+    db = TestingSessionLocal()
+    try:
+        assert report_service.rebuild_rollups(db, chunk_size=4) == 4
+    finally:
+        db.close()
+    assert read_reports() == reports
+
+
+def test_car_brand_change_moves_its_rollups(car_json, buyer_json, seller_json):
+    """Sales of a car follow it to its new brand, as a rebuild would count them"""
+    insert_shop(car_json, buyer_json, seller_json)
+    sales = [{"car_id": car_id, "buyer_id": 1, "seller_id": seller_id} for car_id in (1, 2) for seller_id in (1, 2, 2)]
+    client.post(sales_route + "/batch", json=sales)
+    leaderboard = client.get("/api/v1/sellers/leaderboard").json()
+    assert leaderboard == [{"seller_id": 2, "sales": 4}, {"seller_id": 1, "sales": 2}]
+
+    db = TestingSessionLocal()
+    try:
+        car_service.update_car(db, 1, CarUpdate(brand="volkswagen"))
+        car_service.update_car(db, 2, CarUpdate(brand="ferrari"))
+    finally:
+        db.close()
+    assert client.get(reports_route + "/sales/by-brand").json() == [
+        {"brand": "ferrari", "sales": 3},
+        {"brand": "volkswagen", "sales": 3},
+    ]
+    assert client.get("/api/v1/sellers/leaderboard").json() == leaderboard
+    reports = read_reports()
+
+    db = TestingSessionLocal()
+    try:
+        report_service.rebuild_rollups(db)
+    finally:
+        db.close()
+    assert read_reports() == reports
+
+
+def test_sales_report_query_count(car_json, buyer_json, seller_json):
+    """Reports read the rollup buckets with one aggregate query"""
+    insert_shop(car_json, buyer_json, seller_json)
+    client.post(sales_route + "/batch", json=[{"car_id": 1, "buyer_id": 1, "seller_id": 1}] * 5)
+
+    with count_queries() as statements:
+        response = client.get(reports_route + "/sales/by-seller")
+    assert response.json() == [{"seller_id": 1, "sales": 5}]
+    assert len(statements) == 1
+    assert "FROM sales_rollups" in statements[0]
+
+
+def test_seller_leaderboard(car_json, buyer_json, seller_json):
+    """The leaderboard is seeded once from the rollups, then follows committed sales from memory"""
+    insert_shop(car_json, buyer_json, seller_json)
+    sale = {"car_id": 1, "buyer_id": 1, "seller_id": 1}
+    client.post(sales_route + "/batch", json=[sale, sale, {**sale, "seller_id": 2}])
+
+    with count_queries() as statements:
+        response = client.get("/api/v1/sellers/leaderboard")
+    assert response.json() == [{"seller_id": 1, "sales": 2}, {"seller_id": 2, "sales": 1}]
+    assert len(statements) == 1 and "FROM sales_rollups" in statements[0]
+
+    client.post(sales_route + "/batch", json=[{**sale, "seller_id": 2}] * 2)
+    client.delete(sales_route + "/1")
+    with count_queries() as statements:
+        response = client.get("/api/v1/sellers/leaderboard", params={"limit": 1})
+    assert response.json() == [{"seller_id": 2, "sales": 3}]
+    assert statements == []
+
+
+def test_seller_leaderboard_ignores_rollbacks(car_json, buyer_json, seller_json):
+    """Sales of a rolled back transaction never reach the leaderboard"""
+    insert_shop(car_json, buyer_json, seller_json)
+    client.post(sales_route + "/", json={"car_id": 1, "buyer_id": 1, "seller_id": 1})
+    assert client.get("/api/v1/sellers/leaderboard").json() == [{"seller_id": 1, "sales": 1}]
+
+    db = TestingSessionLocal()
+    try:
+        with unit_of_work(db):
+            report_service.record_sales(db, added=[(datetime.utcnow().date(), 2, "lamborghini")] * 5)
+            raise RuntimeError("rolled back")
+    except RuntimeError:
+        pass
+    finally:
+        db.close()
+    assert client.get("/api/v1/sellers/leaderboard").json() == [{"seller_id": 1, "sales": 1}]
+
+
+def test_seller_leaderboard_months():
+    """Only sales of the current month count, ties go to the lowest seller id"""
+    leaderboard = SellerLeaderboard(size=2)
+    today = datetime.utcnow().date()
+    leaderboard.add({(today, 3): 2, (today, 1): 2, (today, 2): 1, (date(2000, 1, 1), 2): 9})
+    assert leaderboard.top() == [(1, 2), (3, 2)]
+
+    leaderboard.add({(today, 3): -2})
+    assert leaderboard.top() == [(1, 2), (2, 1)]
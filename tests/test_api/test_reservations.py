@@ -0,0 +1,187 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.src.domain.reservation.service import reservation_service
+from app.src.domain.reservation.sweeper import ReservationSweeper
+from app.src.domain.stock.events import stock_events
+from app.src.domain.stock.exceptions import InsufficientStockError
+from ..base_insertion import (
+    insert_into_buyers,
+    insert_into_cars,
+    insert_into_sellers,
+    insert_into_stocks,
+    read_stock_by_id,
+)
+from ..config.database_test_config import TestingSessionLocal, engine
+from ..database_test import clear_database, configure_test_database, count_queries
+from ..templates.buyer_tempĺates import buyer_json
+from ..templates.car_tempĺates import car_json
+from ..templates.seller_tempĺates import seller_json
+
+client = TestClient(app)
+
+reservations_route = "/api/v1/reservations"
+
+reservation_json = {"car_id": 1, "buyer_id": 1, "seller_id": 1, "quantity": 2}
+
+
+def setup_module(module):
+    configure_test_database(app)
+
+
+def setup_function(module):
+    clear_database()
+
+
+def insert_parties(car_json, buyer_json, seller_json, quantity):
+    """Insert a car with its stock, a buyer and a seller"""
+    insert_into_cars(car_json)
+    insert_into_stocks({"id": 1, "car_id": 1, "quantity": quantity})
+    insert_into_buyers(buyer_json)
+    insert_into_sellers(seller_json)
+
+
+def expire_reservation(reservation_id):
+    """Move the expiry of a reservation to the past"""
+    with engine.connect() as con:
+        con.execute(
+            text("UPDATE reservations SET expires_at = '2000-01-01 00:00:00' WHERE id = :id"),
+            {"id": reservation_id},
+        )
+        con.commit()
+
+
+def test_create_reservation(car_json, buyer_json, seller_json):
+    """Reserved units are held apart from quantity and cannot be sold"""
+    insert_parties(car_json, buyer_json, seller_json, quantity=2)
+
+    response = client.post(reservations_route + "/", json=reservation_json)
+    assert response.status_code == 201
+    assert response.json()["status"] == "active"
+    assert read_stock_by_id(1)["quantity"] == 2
+    assert read_stock_by_id(1)["reserved_quantity"] == 2
+
+    assert client.get("/api/v1/stocks/search/available/").json() == []
+    response = client.post("/api/v1/sales/", json={"car_id": 1, "buyer_id": 1, "seller_id": 1})
+    assert response.status_code == 422
+    response = client.post(reservations_route + "/", json={**reservation_json, "quantity": 1})
+    assert response.status_code == 422
+
+
+def test_confirm_reservation(car_json, buyer_json, seller_json):
+    """Confirming a reservation sells its held units"""
+    insert_parties(car_json, buyer_json, seller_json, quantity=3)
+    reservation_id = client.post(reservations_route + "/", json=reservation_json).json()["id"]
+
+    response = client.post(f"{reservations_route}/{reservation_id}/confirm")
+    assert response.status_code == 201
+    assert [sale["car"]["id"] for sale in response.json()] == [1, 1]
+    assert read_stock_by_id(1)["quantity"] == 1
+    assert read_stock_by_id(1)["reserved_quantity"] == 0
+    assert client.get(f"{reservations_route}/{reservation_id}").json()["status"] == "confirmed"
+
+    response = client.post(f"{reservations_route}/{reservation_id}/confirm")
+    assert response.status_code == 409
+
+
+def test_confirm_reservation_short_of_held_units(car_json, buyer_json, seller_json):
+    """A hold that lost its units reports the units actually available"""
+    insert_parties(car_json, buyer_json, seller_json, quantity=3)
+    reservation_id = client.post(reservations_route + "/", json=reservation_json).json()["id"]
+    with engine.connect() as con:
+        con.execute(text("UPDATE stocks SET reserved_quantity = 1 WHERE id = 1"))
+        con.commit()
+
+    db = TestingSessionLocal()
+    try:
+        with pytest.raises(InsufficientStockError) as error:
+            reservation_service.confirm_reservation(db, reservation_id)
+    finally:
+        db.close()
+    assert (error.value.requested, error.value.available) == (2, 2)
+    assert client.post(f"{reservations_route}/{reservation_id}/confirm").status_code == 422
+
+
+def test_cancel_reservation(car_json, buyer_json, seller_json):
+    """Cancelling a reservation gives its units back"""
+    insert_parties(car_json, buyer_json, seller_json, quantity=2)
+    reservation_id = client.post(reservations_route + "/", json=reservation_json).json()["id"]
+
+    response = client.delete(f"{reservations_route}/{reservation_id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    assert read_stock_by_id(1)["reserved_quantity"] == 0
+    assert client.delete(f"{reservations_route}/{reservation_id}").status_code == 409
+
+
+def test_low_stock_search_counts_held_units(car_json, buyer_json, seller_json):
+    """A stock whose units are all held is low stock, though its quantity is not"""
+    insert_parties(car_json, buyer_json, seller_json, quantity=2)
+    assert client.get("/api/v1/stocks/search/low-stock/", params={"threshold": 0}).json() == []
+
+    client.post(reservations_route + "/", json=reservation_json)
+    stocks = client.get("/api/v1/stocks/search/low-stock/", params={"threshold": 0}).json()
+    assert [(stock["id"], stock["quantity"], stock["reserved_quantity"]) for stock in stocks] == [(1, 2, 2)]
+
+
+def test_reservation_stock_events(car_json, buyer_json, seller_json):
+    """Holding, selling, cancelling and expiring held units publish the stock changes"""
+    insert_parties(car_json, buyer_json, seller_json, quantity=5)
+    last_seq = stock_events.last_seq
+
+    confirmed_id = client.post(reservations_route + "/", json=reservation_json).json()["id"]
+    client.post(f"{reservations_route}/{confirmed_id}/confirm")
+    cancelled_id = client.post(reservations_route + "/", json={**reservation_json, "quantity": 1}).json()["id"]
+    client.delete(f"{reservations_route}/{cancelled_id}")
+    expired_id = client.post(reservations_route + "/", json={**reservation_json, "quantity": 1}).json()["id"]
+    expire_reservation(expired_id)
+    ReservationSweeper(session_factory=TestingSessionLocal, batch_size=10).sweep()
+
+    events = [event.data for event in stock_events._buffer if event.seq > last_seq]
+    assert [
+        (event["event"], event["id"], event["quantity"], event["delta"], event["available"], event["available_delta"])
+        for event in events
+    ] == [
+        ("updated", 1, 5, 0, 3, -2),
+        ("updated", 1, 3, -2, 3, 0),
+        ("updated", 1, 3, 0, 2, -1),
+        ("updated", 1, 3, 0, 3, 1),
+        ("updated", 1, 3, 0, 2, -1),
+        ("updated", 1, 3, 0, 3, 1),
+    ]
+
+
+def test_reservation_not_found():
+    """Reading or confirming a missing reservation"""
+    assert client.get(reservations_route + "/1").status_code == 404
+    assert client.post(reservations_route + "/1/confirm").status_code == 404
+
+
+def test_sweep_expired_reservations(car_json, buyer_json, seller_json):
+    """The sweeper releases the expired holds in one batch and waits for the next expiry"""
+    insert_parties(car_json, buyer_json, seller_json, quantity=4)
+    expired_id = client.post(reservations_route + "/", json=reservation_json).json()["id"]
+    active_id = client.post(reservations_route + "/", json={**reservation_json, "quantity": 1}).json()["id"]
+    expire_reservation(expired_id)
+
+    # Past its expiry a hold cannot be confirmed, even before the sweep
+    assert client.post(f"{reservations_route}/{expired_id}/confirm").status_code == 409
+
+    with count_queries() as statements:
+        delay = ReservationSweeper(session_factory=TestingSessionLocal, batch_size=10).sweep()
+    assert 0 < delay <= 900
+    assert client.get(f"{reservations_route}/{expired_id}").json()["status"] == "expired"
+    assert client.get(f"{reservations_route}/{active_id}").json()["status"] == "active"
+    assert read_stock_by_id(1)["reserved_quantity"] == 1
+
+    # Expired holds are found on the partial index, not by scanning the reservations
+    select_expired = next(statement for statement in statements if "expires_at <=" in statement)
+    with engine.connect() as con:
+        plan = " ".join(
+            row[-1] for row in con.execute(
+                text("EXPLAIN QUERY PLAN " + select_expired.replace("?", "'2000-01-02'", 1).replace("?", "10"))
+            )
+        )
+    assert "ix_reservations_active_expires_at" in plan
@@ -1,4 +1,7 @@
+import json
+
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
 from app.main import app
 from ..base_insertion import (
@@ -9,7 +12,8 @@ from ..base_insertion import (
     insert_into_stocks,
     read_stock_by_id,
 )
-from ..database_test import clear_database, configure_test_database
+from ..config.database_test_config import engine
+from ..database_test import clear_database, configure_test_database, count_queries
 from ..templates.buyer_tempĺates import buyer_json, buyer_not_found_error
 from ..templates.car_tempĺates import car_json, car_not_found_error
 from ..templates.sale_tempĺates import (
@@ -61,6 +65,47 @@ def test_create_sale(
     assert (stock_request_json["quantity"] - 1) == db_stock["quantity"]
 
 
+def test_create_sale_single_transaction(
+    car_json,
+    stock_request_json,
+    seller_json,
+    buyer_json,
+    sale_request_json,
+):
+    """Stock decrement and sale insert commit together, without reads of the stock or refresh queries"""
+    insert_into_cars(car_json)
+    insert_into_stocks(stock_request_json)
+    insert_into_buyers(buyer_json)
+    insert_into_sellers(seller_json)
+
+    commits = []
+
+    def on_commit(connection):
+        commits.append(connection)
+
+    event.listen(engine, "commit", on_commit)
+    try:
+        with count_queries() as statements:
+            response = client.post(sales_route + "/", json=sale_request_json)
+    finally:
+        event.remove(engine, "commit", on_commit)
+
+    assert response.status_code == 201
+    assert len(commits) == 1
+    # Generated ids come back with the INSERT, written rows are not reloaded
+    inserted = next(i for i, statement in enumerate(statements) if statement.startswith("INSERT INTO sales"))
+    assert not any("FROM sales" in statement for statement in statements[inserted:])
+    # Stock is taken with one conditional UPDATE, never read first
+    assert not any("FROM stocks" in statement for statement in statements)
+    stock_updates = [statement for statement in statements if statement.startswith("UPDATE stocks")]
+    assert len(stock_updates) == 1
+    assert "quantity >=" in stock_updates[0] and "RETURNING" in stock_updates[0]
+    # Stock decrement, one lookup of car, buyer and seller, sale insert, rollup upsert
+    assert len(statements) == 4
+    assert statements[3].startswith("INSERT INTO sales_rollups")
+    assert statements[1].startswith("SELECT") and "LEFT OUTER JOIN sellers" in statements[1]
+
+
 def test_read_sale(
     car_json,
     stock_request_json,
@@ -237,3 +282,138 @@ def test_create_sale_all_not_found(sale_request_json, sale_all_not_found_error):
     response = client.post(sales_route + "/", json=sale_request_json)
     assert response.status_code == 404
     assert response.json() == sale_all_not_found_error
+
+
+def test_export_sales_ndjson(
+    car_json,
+    stock_request_json,
+    seller_json,
+    buyer_json,
+    sale_request_json,
+):
+    """Export sales as NDJSON flattened with car, buyer and seller columns"""
+    insert_into_cars(car_json)
+    insert_into_stocks(stock_request_json)
+    insert_into_buyers(buyer_json)
+    insert_into_sellers(seller_json)
+    insert_into_sales(sale_request_json)
+
+    response = client.get(sales_route + "/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 1
+    assert rows[0]["car_name"] == car_json["name"]
+    assert rows[0]["buyer_name"] == buyer_json["name"]
+    assert rows[0]["seller_cpf"] == seller_json["cpf"]
+
+    response = client.get(sales_route + "/export", params={"created_after": "2999-01-01T00:00:00"})
+    assert response.text == ""
+
+
+def test_read_sales_cursor_by_created_at(
+    car_json,
+    seller_json,
+    buyer_json,
+    sale_request_json,
+):
+    """Walk sales newest first with keyset pagination on created_at"""
+    insert_into_cars(car_json)
+    insert_into_buyers(buyer_json)
+    insert_into_sellers(seller_json)
+    for sale_id, created_at in [(1, "2024-01-02 00:00:00.000000"), (2, "2024-01-01 00:00:00.000000"), (3, "2024-01-02 00:00:00.000000")]:
+        insert_into_sales({**sale_request_json, "id": sale_id, "created_at": created_at})
+
+    params = {"size": 2, "order_by": "created_at", "direction": "desc"}
+    first_page = client.get(sales_route + "/cursor", params=params).json()
+    assert [sale["id"] for sale in first_page["items"]] == [3, 1]
+
+    params["cursor"] = first_page["next_cursor"]
+    second_page = client.get(sales_route + "/cursor", params=params).json()
+    assert [sale["id"] for sale in second_page["items"]] == [2]
+    assert second_page["next_cursor"] is None
+
+
+def insert_sales_of_one_seller(car_json, buyer_json, seller_json, sale_request_json, count):
+    """Insert sales of distinct cars and buyers, all by the same seller"""
+    insert_into_sellers(seller_json)
+    for sale_id in range(1, count + 1):
+        insert_into_cars({**car_json, "id": sale_id, "year": car_json["year"] + sale_id})
+        insert_into_buyers({**buyer_json, "id": sale_id, "phone": f"{buyer_json['phone']}{sale_id}"})
+        insert_into_sales({**sale_request_json, "id": sale_id, "car_id": sale_id, "buyer_id": sale_id})
+
+
+def test_read_sales_query_count(car_json, seller_json, buyer_json, sale_request_json):
+    """Listing sales loads car, buyer and seller without a query per sale"""
+    insert_sales_of_one_seller(car_json, buyer_json, seller_json, sale_request_json, 3)
+
+    with count_queries() as statements:
+        response = client.get(sales_route + "/")
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 3
+    # COUNT and one joined SELECT
+    assert len(statements) == 2
+
+    with count_queries() as statements:
+        response = client.get(sales_route + "/cursor")
+    assert len(response.json()["items"]) == 3
+    assert len(statements) == 1
+
+
+def test_search_sales_by_seller_query_count(car_json, seller_json, buyer_json, sale_request_json):
+    """Searching sales by seller selects the shared seller once"""
+    insert_sales_of_one_seller(car_json, buyer_json, seller_json, sale_request_json, 3)
+
+    with count_queries() as statements:
+        response = client.get(sales_route + "/search/by-seller/", params={"seller_id": 1})
+    assert response.status_code == 200
+    assert [sale["buyer"]["id"] for sale in response.json()] == [1, 2, 3]
+    assert len(statements) == 2
+
+
+def test_create_sales_batch(car_json, seller_json, buyer_json, sale_request_json):
+    """Batch sales take stock per car in request order, failures are reported per row"""
+    insert_into_buyers(buyer_json)
+    insert_into_sellers(seller_json)
+    insert_into_cars(car_json)
+    insert_into_stocks({"id": 1, "car_id": 1, "quantity": 2})
+    insert_into_cars({**car_json, "id": 2, "year": car_json["year"] + 1})
+    sale = {"car_id": 1, "buyer_id": 1, "seller_id": 1}
+
+    response = client.post(sales_route + "/batch", json=[
+        sale,
+        {**sale, "buyer_id": 9},
+        sale,
+        sale,
+        {**sale, "car_id": 2},
+        {**sale, "seller_id": 9},
+    ])
+    assert response.status_code == 207
+    assert [created["car"]["id"] for created in response.json()["created"]] == [1, 1]
+    assert [(error["index"], error["error"]) for error in response.json()["errors"]] == [
+        (1, "Buyer with id 9 not found"),
+        (3, "Insufficient stock for car 1: requested 1, available 0"),
+        (4, "Stock with id 0 not found"),
+        (5, "Insufficient stock for car 1: requested 1, available 0"),
+    ]
+    assert read_stock_by_id(1)["quantity"] == 0
+
+
+def test_create_sales_batch_query_count(car_json, seller_json, buyer_json):
+    """Batch sales cost the same statements whatever the number of sales"""
+    insert_into_sellers(seller_json)
+    sales = []
+    for car_id in range(1, 4):
+        insert_into_cars({**car_json, "id": car_id, "year": car_json["year"] + car_id})
+        insert_into_stocks({"id": car_id, "car_id": car_id, "quantity": 10})
+        insert_into_buyers({**buyer_json, "id": car_id, "phone": f"{buyer_json['phone']}{car_id}"})
+        sales += [{"car_id": car_id, "buyer_id": car_id, "seller_id": 1}] * car_id
+
+    with count_queries() as statements:
+        response = client.post(sales_route + "/batch", json=sales)
+    assert response.status_code == 201
+    assert len(response.json()["created"]) == 6
+    # Cars, buyers, sellers, locked stock read, one UPDATE, one INSERT and the rollup upsert
+    assert len(statements) == 7
+    assert sum(statement.startswith("UPDATE stocks") for statement in statements) == 1
+    assert [read_stock_by_id(stock_id)["quantity"] for stock_id in range(1, 4)] == [9, 8, 7]
@@ -1,9 +1,19 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from ..database_test import clear_database, configure_test_database
 
 client = TestClient(app)
 
+
+def setup_module(module):
+    configure_test_database(app)
+
+
+def setup_function(module):
+    clear_database()
+
+
 def test_search_cars_by_brand():
     """Test search cars by brand endpoint"""
     # Create a test car first
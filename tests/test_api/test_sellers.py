@@ -1,7 +1,9 @@
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.src.domain.seller.models import name_search
 from ..base_insertion import insert_into_sellers
+from ..config.database_test_config import engine
 from ..database_test import clear_database, configure_test_database
 from ..templates.seller_tempĺates import seller_json, seller_not_found_error
 
@@ -126,3 +128,40 @@ def test_delete_seller_not_found(seller_not_found_error):
     response = client.delete(request_url)
     assert response.status_code == 404
     assert response.json() == seller_not_found_error
+
+
+def test_create_sellers_bulk(seller_json):
+    """Create sellers in bulk, existing CPFs are reported per row"""
+    insert_into_sellers(seller_json)
+    seller = {key: value for key, value in seller_json.items() if key != "id"}
+    other_seller = {**seller, "cpf": "12345678901"}
+
+    response = client.post(sellers_route + "/bulk", json=[seller, other_seller])
+    assert response.status_code == 207
+    assert response.json()["created"] == [{"id": 2, **other_seller, "version": 1}]
+    assert response.json()["errors"][0]["index"] == 0
+
+
+def test_search_sellers_by_name(seller_json):
+    """Search sellers by part of their name, the index follows deletes"""
+    for seller_id, name in [(1, "João da Silva"), (2, "Maria Silveira"), (3, "Pedro Souza")]:
+        insert_into_sellers({**seller_json, "id": seller_id, "name": name, "cpf": str(seller_id)})
+
+    response = client.get(sellers_route + "/search/", params={"name": "silv"})
+    assert response.status_code == 200
+    assert sorted(seller["id"] for seller in response.json()) == [1, 2]
+
+    client.delete(sellers_route + "/2")
+    response = client.get(sellers_route + "/search/", params={"name": "silv"})
+    assert [seller["id"] for seller in response.json()] == [1]
+
+    response = client.get(sellers_route + "/search/", params={"name": "100%"})
+    assert response.json() == []
+
+
+def test_search_sellers_by_name_uses_index():
+    """Search by name on SQLite reads the FTS5 trigram table"""
+    statement = name_search.statement(engine.dialect, "Silva")
+    compiled = str(statement.compile(engine))
+    assert "MATCH" in compiled
+    assert "sellers_name_search" in compiled
@@ -1,8 +1,18 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.src.core.unit_of_work import unit_of_work
+from app.src.core.broker import EventBroker
+from app.src.domain.stock.events import StockEventFilter, stock_events
+from app.src.domain.stock.repository import stock_repository
+from app.src.domain.stock.service import stock_service
 from ..base_insertion import insert_into_cars, insert_into_stocks
-from ..database_test import clear_database, configure_test_database
+from ..config.database_test_config import TestingSessionLocal
+from ..database_test import clear_database, configure_test_database, count_queries
 from ..templates.car_tempĺates import car_json, car_not_found_error
 from ..templates.stock_tempĺates import (
     stock_already_exist,
@@ -140,3 +150,164 @@ def test_delete_stock_not_found(stock_not_found_error):
     response = client.delete(request_url)
     assert response.status_code == 404
     assert response.json() == stock_not_found_error
+
+
+def test_create_stocks_bulk(car_json, stock_response_json):
+    """Create stocks in bulk, missing cars and repeated cars are reported per row"""
+    insert_into_cars(car_json)
+    stock = {"car_id": 1, "quantity": 10}
+
+    response = client.post(stocks_route + "/bulk", json=[stock, stock, {"car_id": 2, "quantity": 1}])
+    assert response.status_code == 207
+    assert response.json()["created"] == [stock_response_json]
+    assert [error["index"] for error in response.json()["errors"]] == [1, 2]
+
+
+def test_read_stocks_query_count(car_json):
+    """Listing stocks loads their cars without a query per stock"""
+    for stock_id in range(1, 4):
+        insert_into_cars({**car_json, "id": stock_id, "year": car_json["year"] + stock_id})
+        insert_into_stocks({"id": stock_id, "car_id": stock_id, "quantity": stock_id})
+
+    with count_queries() as statements:
+        response = client.get(stocks_route)
+    assert response.status_code == 200
+    assert [stock["car"]["id"] for stock in response.json()["items"]] == [1, 2, 3]
+    # COUNT and one joined SELECT
+    assert len(statements) == 2
+
+    with count_queries() as statements:
+        response = client.get(stocks_route + "/search/available/")
+    assert len(response.json()) == 3
+    assert len(statements) == 1
+
+
+def test_decrement_stock_concurrently(car_json):
+    """Concurrent sales of the same car never take more units than in stock"""
+    insert_into_cars(car_json)
+    insert_into_stocks({"id": 1, "car_id": 1, "quantity": 5})
+
+    def sell() -> bool:
+        db = TestingSessionLocal()
+        try:
+            with unit_of_work(db):
+                return stock_repository.decrement_quantity(db, car_id=1, quantity=1) is not None
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        sold = list(executor.map(lambda _: sell(), range(12)))
+
+    assert sold.count(True) == 5
+    response = client.get(stocks_route + "/1")
+    assert response.json()["quantity"] == 0
+
+
+def test_stock_events_published_on_commit(car_json, stock_request_json):
+    """Stock changes are published once committed, rolled back ones never"""
+    insert_into_cars(car_json)
+    last_seq = stock_events.last_seq
+    client.post(stocks_route + "/", json=stock_request_json)
+
+    db = TestingSessionLocal()
+    try:
+        stock_service.buy_car_from_stock(db, car_id=1, quantity=2)
+        try:
+            with unit_of_work(db):
+                stock_service.buy_car_from_stock(db, car_id=1, quantity=1)
+                raise RuntimeError("rolled back")
+        except RuntimeError:
+            pass
+    finally:
+        db.close()
+    client.delete(stocks_route + "/1")
+
+    events = [event.data for event in stock_events._buffer if event.seq > last_seq]
+    quantity = stock_request_json["quantity"]
+    assert [(event["event"], event["quantity"], event["delta"], event["available"]) for event in events] == [
+        ("created", quantity, quantity, quantity),
+        ("updated", quantity - 2, -2, quantity - 2),
+        ("deleted", 0, 2 - quantity, 0),
+    ]
+    assert events[0]["brand"] == car_json["brand"]
+
+
+def test_stock_events_stream_resume_and_filter():
+    """A stream resumes after a sequence number and only sends matching events"""
+    broker = EventBroker(buffer_size=3)
+    for car_id, quantity in ((1, 9), (2, 8), (1, 2)):
+        broker.publish({"event": "updated", "id": car_id, "car_id": car_id, "quantity": quantity, "delta": -1})
+
+    async def read(after, count, event_filter=StockEventFilter()):
+        chunks = []
+        stream = broker.stream(event_filter, after=after, heartbeat=60)
+        async for chunk in stream:
+            chunks.append(chunk)
+            if len(chunks) == 1:
+                # Published from another thread while streaming
+                asyncio.get_running_loop().run_in_executor(None, broker.publish, {
+                    "event": "updated", "id": 1, "car_id": 1, "quantity": 1, "delta": -1
+                })
+            if len(chunks) == count:
+                break
+        await stream.aclose()
+        return chunks
+
+    chunks = asyncio.run(read(after=1, count=3, event_filter=StockEventFilter(car_id=1)))
+    assert chunks[0] == "retry: 3000\n\n"
+    assert chunks[1].startswith("id: 3\n")
+    assert json.loads(chunks[2].split("data: ")[1])["quantity"] == 1
+    assert chunks[2].startswith("id: 4\n")
+
+    # Events after 0 are no longer buffered, the client is told to reload
+    chunks = asyncio.run(read(after=0, count=2))
+    assert chunks[1].startswith("id: 4\nevent: reset\n")
+
+
+def test_stock_event_filter_low_stock():
+    """Low stock filters keep changes entering or leaving the threshold"""
+    event_filter = StockEventFilter(low_stock_threshold=3)
+    assert event_filter({"car_id": 1, "quantity": 2, "delta": -2, "available": 2, "available_delta": -2})
+    assert event_filter({"car_id": 1, "quantity": 5, "delta": 3, "available": 5, "available_delta": 3})
+    assert not event_filter({"car_id": 1, "quantity": 7, "delta": -1, "available": 7, "available_delta": -1})
+    # Held units are not available, a reservation can enter the threshold without a quantity change
+    assert event_filter({"car_id": 1, "quantity": 7, "delta": 0, "available": 2, "available_delta": -5})
+    assert not event_filter({"car_id": 1, "quantity": 7, "delta": 0, "available": 6, "available_delta": 1})
+
+
+def test_read_stock_etag_follows_stock_and_car(car_json):
+    """Set based stock UPDATEs bump the row version behind the ETag"""
+    insert_into_cars(car_json)
+    insert_into_stocks({"id": 1, "car_id": 1, "quantity": 5})
+    etag = client.get(stocks_route + "/1").headers["ETag"]
+    assert client.get(stocks_route + "/1", headers={"If-None-Match": etag}).status_code == 304
+
+    db = TestingSessionLocal()
+    try:
+        stock_service.buy_car_from_stock(db, car_id=1, quantity=1)
+    finally:
+        db.close()
+    response = client.get(stocks_route + "/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+
+
+def test_set_based_updates_refresh_loaded_stocks(car_json):
+    """A Stock loaded before a set based UPDATE sees the new version and still flushes"""
+    insert_into_cars(car_json)
+    insert_into_stocks({"id": 1, "car_id": 1, "quantity": 5})
+
+    db = TestingSessionLocal()
+    try:
+        with unit_of_work(db):
+            db_stock = stock_repository.get_by_car_id(db, car_id=1)
+            stock_repository.reserve_quantity(db, car_id=1, quantity=2)
+            stock_repository.decrement_quantities(db, taken={1: 1})
+            assert stock_repository.decrement_quantity(db, car_id=1, quantity=1) is db_stock
+            stock_repository.release_reserved_quantities(db, released={1: 1})
+            assert (db_stock.quantity, db_stock.reserved_quantity, db_stock.version) == (3, 1, 5)
+            db_stock.quantity = 10
+            db.flush()
+    finally:
+        db.close()
+    assert client.get(stocks_route + "/1").json()["version"] == 6
@@ -1,6 +1,13 @@
+import threading
+
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.src.core.security import PasswordHasherBusyError, password_hasher
+from app.src.domain.user import schemas
+from app.src.domain.user.service import user_service
+from ..config.database_test_config import TestingSessionLocal
 from ..database_test import clear_database, configure_test_database
 
 client = TestClient(app)
@@ -110,3 +117,39 @@ def test_read_users_empty():
     assert "size" in paginated_response
     assert paginated_response["items"] == []
     assert paginated_response["total"] == 0
+
+
+def test_create_user_refused_when_hasher_full():
+    """The password is hashed on the hasher pool, past its bound a 503 answers"""
+    release = threading.Event()
+    blocked = [password_hasher.submit(release.wait) for _ in range(password_hasher.max_pending)]
+    try:
+        response = client.post(users_route + "/", json={"email": "test@example.com", "password": "password123"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+    finally:
+        release.set()
+        for future in blocked:
+            future.result()
+    assert client.get(users_route).json()["total"] == 0
+
+
+def test_update_user_password_hashed_on_hasher_pool():
+    """A new password goes through the bounded hasher pool like a new user"""
+    response = client.post(users_route + "/", json={"email": "test@example.com", "password": "password123"})
+    user_id = response.json()["id"]
+    update = schemas.UserUpdate(password="new-password123")
+
+    release = threading.Event()
+    blocked = [password_hasher.submit(release.wait) for _ in range(password_hasher.max_pending)]
+    try:
+        with TestingSessionLocal() as db, pytest.raises(PasswordHasherBusyError):
+            user_service.update_user(db, user_id, update)
+    finally:
+        release.set()
+        for future in blocked:
+            future.result()
+
+    with TestingSessionLocal() as db:
+        db_user = user_service.update_user(db, user_id, update)
+        assert password_hasher.context.verify("new-password123", db_user.hashed_password)
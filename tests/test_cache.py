@@ -0,0 +1,182 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+
+from app.main import app
+from app.src.core.cache import EntityCache, LocalSharedClient, MemoryBackend, SharedBackend, entity_cache
+from app.src.core.database import Base
+from app.src.core.replicas import Replica, ReplicaSet, RoutingSession, use_replica
+from app.src.domain.car.models import Car as CarModel
+from app.src.domain.car.schemas import Car, CarUpdate
+from app.src.domain.car.service import car_service
+from app.src.domain.stock.service import stock_service
+from .base_insertion import insert_into_buyers, insert_into_cars, insert_into_sales, insert_into_sellers, insert_into_stocks
+from .config.database_test_config import TestingSessionLocal
+from .database_test import clear_database, configure_test_database, count_queries
+from .templates.buyer_tempĺates import buyer_json
+from .templates.car_tempĺates import car_json
+from .templates.seller_tempĺates import seller_json
+
+client = TestClient(app)
+
+api_route = "/api/v1"
+
+BACKENDS = {
+    "memory": lambda: MemoryBackend(max_entries=2, ttl=60),
+    "shared": lambda: SharedBackend(LocalSharedClient(), ttl=60),
+}
+
+
+def setup_module(module):
+    configure_test_database(app)
+
+
+def setup_function(module):
+    clear_database()
+    entity_cache.metrics.reset()
+
+
+def make_car(id: int, name: str = "Galardo") -> Car:
+    return Car(id=id, name=name, year=1999, brand="lamborghini", version=1)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_cache_read_through_and_tag_invalidation(backend):
+    """Entries are loaded once and evicted by their own or embedded tags"""
+    cache = EntityCache(BACKENDS[backend]())
+    loads = []
+
+    def load(id):
+        loads.append(id)
+        return make_car(id)
+
+    assert cache.get_or_load("car", 1, Car, lambda: load(1)) == make_car(1)
+    assert cache.get_or_load("car", 1, Car, lambda: load(1)) == make_car(1)
+    cache.get_or_load("stock", 7, Car, lambda: load(7), tags=lambda value: ("car:1",))
+    assert loads == [1, 7]
+
+    cache.invalidate("car", ["car:1"])
+    cache.get_or_load("car", 1, Car, lambda: load(1))
+    cache.get_or_load("stock", 7, Car, lambda: load(7))
+    assert loads == [1, 7, 1, 7]
+    assert cache.metrics.snapshot()["entities"]["car"] == {
+        "hits": 1, "misses": 2, "stores": 2, "invalidations": 2, "hit_ratio": 0.3333,
+    }
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_cache_skips_entries_loaded_during_invalidation(backend):
+    """A read racing a write does not store what the write evicted"""
+    cache = EntityCache(BACKENDS[backend]())
+
+    def stale_load():
+        cache.invalidate("car", ["car:1"])
+        return make_car(1, name="Stale")
+
+    cache.get_or_load("car", 1, Car, stale_load)
+    assert cache.get_or_load("car", 1, Car, lambda: make_car(1)).name == "Galardo"
+
+
+def test_shared_cache_skips_entries_invalidated_before_the_write():
+    """An invalidation landing between the generation check and the write is not lost"""
+    client = LocalSharedClient()
+    backend = SharedBackend(client, ttl=60)
+    pipeline = client.pipeline
+
+    def racing_pipeline():
+        pipe = pipeline()
+        multi = pipe.multi
+
+        def invalidate_then_multi():
+            backend.invalidate(["car:1"])
+            multi()
+
+        pipe.multi = invalidate_then_multi
+        return pipe
+
+    client.pipeline = racing_pipeline
+    assert backend.set("car:1", make_car(1, name="Stale"), ("car:1",), backend.generation()) is False
+    assert backend.get("car:1", Car) is None
+
+    client.pipeline = pipeline
+    assert backend.set("car:1", make_car(1), ("car:1",), backend.generation()) is True
+    assert backend.get("car:1", Car).name == "Galardo"
+
+
+def test_memory_cache_evicts_least_recently_used():
+    """Past max_entries the least recently read entry goes first"""
+    backend = MemoryBackend(max_entries=2, ttl=60)
+    for id in (1, 2):
+        backend.set(f"car:{id}", make_car(id), (), backend.generation())
+    backend.get("car:1", Car)
+    backend.set("car:3", make_car(3), (), backend.generation())
+
+    assert backend.get("car:2", Car) is None
+    assert backend.get("car:1", Car) is not None
+
+
+def test_read_car_served_from_cache_until_update(car_json, buyer_json, seller_json):
+    """Reads hit the database once, a car update evicts the car and the stocks and sales embedding it"""
+    insert_into_cars(car_json)
+    insert_into_stocks({"id": 1, "car_id": 1, "quantity": 3})
+    insert_into_buyers(buyer_json)
+    insert_into_sellers(seller_json)
+    insert_into_sales({"id": 1, "car_id": 1, "buyer_id": 1, "seller_id": 1, "created_at": datetime(2024, 1, 1)})
+    for route in ("cars/1", "stocks/1", "sales/1"):
+        client.get(f"{api_route}/{route}")
+
+    with count_queries() as statements:
+        responses = [client.get(f"{api_route}/{route}") for route in ("cars/1", "stocks/1", "sales/1")]
+    assert statements == []
+    assert responses[1].json()["car"]["name"] == car_json["name"]
+
+    db = TestingSessionLocal()
+    try:
+        car_service.update_car(db, car_id=1, car_update=CarUpdate(name="Murcielago"))
+    finally:
+        db.close()
+
+    with count_queries() as statements:
+        responses = [client.get(f"{api_route}/{route}") for route in ("cars/1", "stocks/1", "sales/1")]
+    assert len(statements) == 3
+    assert responses[0].json()["name"] == "Murcielago"
+    assert responses[1].json()["car"]["name"] == "Murcielago"
+    assert responses[2].json()["car"]["name"] == "Murcielago"
+
+    entities = client.get(f"{api_route}/system/cache").json()["entities"]
+    assert entities["car"]["hits"] == 1
+    assert entities["car"]["invalidations"] == 3
+
+
+def test_read_stock_evicted_by_sale(car_json):
+    """Taking units from stock evicts the cached stock once committed"""
+    insert_into_cars(car_json)
+    insert_into_stocks({"id": 1, "car_id": 1, "quantity": 3})
+    client.get(f"{api_route}/stocks/1")
+
+    db = TestingSessionLocal()
+    try:
+        stock_service.buy_car_from_stock(db, car_id=1, quantity=2)
+    finally:
+        db.close()
+
+    assert client.get(f"{api_route}/stocks/1").json()["quantity"] == 1
+
+
+def test_cache_misses_load_from_the_primary(tmp_path):
+    """A replica lagging a write does not get its old row cached for the TTL"""
+    engines = {}
+    for name in ("primary", "replica"):
+        engines[name] = create_engine(f"sqlite:///{tmp_path / name}.db")
+        Base.metadata.create_all(bind=engines[name])
+        with engines[name].begin() as connection:
+            connection.execute(insert(CarModel).values(id=1, name=name, year=1999, brand="lamborghini"))
+    replicas = ReplicaSet([Replica("replica_0", engines["replica"])])
+
+    with RoutingSession(bind=engines["primary"], replicas=replicas) as db:
+        assert car_service.get_car(use_replica(db), 1).name == "primary"
+    with RoutingSession(bind=engines["primary"], replicas=replicas) as db:
+        assert car_service.get_car(use_replica(db), 1).name == "primary"
+    entity_cache.clear()
@@ -0,0 +1,35 @@
+import json
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select
+
+from app.src.core.export import ExportFormat, stream_rows
+
+metadata = MetaData()
+cars = Table("cars", metadata, Column("id", Integer, primary_key=True), Column("name", String))
+
+
+def make_engine():
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(cars), [{"id": i, "name": f"car {i}"} for i in range(1, 6)])
+    return engine
+
+
+def test_stream_rows_ndjson_in_batches():
+    """Each batch of the cursor is written as one NDJSON chunk"""
+    chunks = list(stream_rows(make_engine(), select(cars).order_by(cars.c.id), ExportFormat.ndjson, batch_size=2))
+
+    assert len(chunks) == 3
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert rows[0] == {"id": 1, "name": "car 1"}
+    assert len(rows) == 5
+
+
+def test_stream_rows_csv_header_once():
+    """CSV exports start with a single header row"""
+    chunks = list(stream_rows(make_engine(), select(cars).order_by(cars.c.id), ExportFormat.csv, batch_size=2))
+
+    lines = "".join(chunks).splitlines()
+    assert lines[0] == "id,name"
+    assert lines[1:] == [f"{i},car {i}" for i in range(1, 6)]
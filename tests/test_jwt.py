@@ -1,6 +1,9 @@
+import time
 from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 from typing import Optional
 
+from fastapi.testclient import TestClient
 from jose import jwt
 
 from app.src.core.config import SECRET_KEY, ALGORITHM
@@ -27,3 +30,52 @@ def test_create_token():
     user = {"sub": "sham"}
     token = create_access_token(user)
     assert decode(token) == "sham"
+
+
+def test_token_cache_verifies_once_until_exp(monkeypatch):
+    """A cached token skips decoding, an expired entry is decoded again"""
+    from app.src.core import security
+
+    cache = security.TokenCache(max_entries=2)
+    decoded = []
+    decode_token = security.decode_token
+    monkeypatch.setattr(security, "decode_token", lambda token: decoded.append(token) or decode_token(token))
+    token = security.create_access_token({"sub": "sham"})
+
+    assert cache.verify(token)["sub"] == "sham"
+    assert cache.verify(token)["sub"] == "sham"
+    assert (decoded, cache.hits, cache.misses) == ([token], 1, 1)
+
+    expired = time.time() + 16 * 60
+    monkeypatch.setattr(security, "time", SimpleNamespace(time=lambda: expired))
+    cache.verify(token)
+    assert decoded == [token, token]
+
+
+def test_token_cache_evicts_least_recently_used():
+    from app.src.core.security import TokenCache, create_access_token
+
+    cache = TokenCache(max_entries=2)
+    tokens = [create_access_token({"sub": sub}) for sub in ("a", "b", "c")]
+    for token in (tokens[0], tokens[1], tokens[0], tokens[2]):
+        cache.verify(token)
+    cache.verify(tokens[0])
+    cache.verify(tokens[1])
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_revoked_token_is_refused():
+    """Revocation evicts the cached claims and get_current_user answers 401"""
+    from app.main import app
+    from app.src.core.security import create_access_token, token_cache
+
+    client = TestClient(app)
+    token = create_access_token({"sub": "sham@example.com"})
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        assert client.get("/api/v1/me/", headers=headers).json() == {"email": "sham@example.com"}
+        assert client.get("/api/v1/me/", headers=headers).status_code == 200
+        token_cache.revoke(token)
+        assert client.get("/api/v1/me/", headers=headers).status_code == 401
+    finally:
+        token_cache.clear()
@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.src.core.pool import InstrumentedQueuePool, LatencyHistogram, PoolMetrics
+
+
+def test_latency_histogram_percentiles():
+    """Percentiles resolve to the bucket upper bound"""
+    histogram = LatencyHistogram()
+    for _ in range(90):
+        histogram.observe(0.0008)
+    for _ in range(10):
+        histogram.observe(0.2)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100
+    assert snapshot["p50_ms"] == 1
+    assert snapshot["p99_ms"] == 250
+    assert snapshot["buckets"]["le_1ms"] == 90
+
+
+def test_instrumented_pool_records_checkout_and_timeout(tmp_path):
+    """Checkouts, checkout durations and timeouts are recorded"""
+    metrics = PoolMetrics("test")
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_metrics=metrics,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+    connection = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    connection.close()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["checkouts"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checkout_wait"]["count"] == 2
+    assert snapshot["checkout_duration"]["count"] == 1
+    assert snapshot["pool"]["checked_out"] == 0
+
+    engine.dispose()
+    assert engine.pool.metrics is metrics
@@ -0,0 +1,75 @@
+from sqlalchemy import create_engine, text
+
+from app.src.core.replicas import Replica, ReplicaSet, RoutingSession, read_primary, use_replica
+
+
+def make_engine(path, name):
+    """File SQLite engine holding a single row naming the database"""
+    engine = create_engine(f"sqlite:///{path / name}.db")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE node (name VARCHAR)"))
+        connection.execute(text("INSERT INTO node (name) VALUES (:name)"), {"name": name})
+    return engine
+
+
+def node_name(db):
+    return db.execute(text("SELECT name FROM node")).scalar()
+
+
+def test_read_only_session_uses_replica(tmp_path):
+    """Read only sessions are served by a replica, others by the primary"""
+    primary = make_engine(tmp_path, "primary")
+    replicas = ReplicaSet([Replica("replica_0", make_engine(tmp_path, "replica"))])
+
+    with RoutingSession(bind=primary, replicas=replicas) as db:
+        assert node_name(db) == "primary"
+
+    with RoutingSession(bind=primary, replicas=replicas) as db:
+        assert node_name(use_replica(db)) == "replica"
+
+
+def test_session_sticks_to_primary_after_flush(tmp_path):
+    """Once a session writes, its reads go to the primary"""
+    primary = make_engine(tmp_path, "primary")
+    replicas = ReplicaSet([Replica("replica_0", make_engine(tmp_path, "replica"))])
+
+    with RoutingSession(bind=primary, replicas=replicas) as db:
+        use_replica(db)
+        db.info["wrote"] = True
+        assert node_name(db) == "primary"
+
+
+def test_read_primary_overrides_replica_routing(tmp_path):
+    """Queries inside read_primary go to the primary, the session keeps its replica after"""
+    primary = make_engine(tmp_path, "primary")
+    replicas = ReplicaSet([Replica("replica_0", make_engine(tmp_path, "replica"))])
+
+    with RoutingSession(bind=primary, replicas=replicas) as db:
+        assert node_name(use_replica(db)) == "replica"
+        with read_primary(db):
+            assert node_name(db) == "primary"
+        assert node_name(db) == "replica"
+
+
+def test_failed_replica_falls_back_to_primary(tmp_path):
+    """Connection errors take a replica out of rotation until the cooldown ends"""
+    primary = make_engine(tmp_path, "primary")
+    broken = Replica("replica_0", create_engine(f"sqlite:///{tmp_path}/missing/replica.db"))
+    replicas = ReplicaSet([broken], cooldown=60)
+
+    with RoutingSession(bind=primary, replicas=replicas) as db:
+        assert node_name(use_replica(db)) == "primary"
+
+    status = replicas.status()
+    assert status[0]["status"] == "unhealthy"
+    assert status[0]["failures"] == 1
+    assert replicas.choose() is None
+
+
+def test_replica_weights(tmp_path):
+    """Replicas with weight 0 never receive reads"""
+    heavy = Replica("replica_0", make_engine(tmp_path, "heavy"), weight=3)
+    drained = Replica("replica_1", make_engine(tmp_path, "drained"), weight=0)
+    replicas = ReplicaSet([heavy, drained])
+
+    assert {replicas.choose().name for _ in range(20)} == {"replica_0"}
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.src.api.deps import get_db
+from app.src.core.database import RequestSession
+
+
+class CountingFactory:
+    """Session factory counting how many sessions were built"""
+
+    def __init__(self):
+        self.sessions = []
+
+    def __call__(self):
+        session = SimpleNamespace(closed=False)
+        session.close = lambda: setattr(session, "closed", True)
+        self.sessions.append(session)
+        return session
+
+
+def test_request_session_is_lazy():
+    """No session is built until something asks for it"""
+    factory = CountingFactory()
+    request_session = RequestSession(factory)
+
+    request_session.close()
+
+    assert not request_session.started
+    assert factory.sessions == []
+
+
+def test_request_session_is_shared_and_closed():
+    """The session is built once, shared, and closed with the request"""
+    factory = CountingFactory()
+    request_session = RequestSession(factory)
+
+    first = request_session.get()
+    second = request_session.get()
+    request_session.close()
+
+    assert first is second
+    assert len(factory.sessions) == 1
+    assert first.closed
+
+
+def test_get_db_uses_request_session():
+    """The Database dependency yields the middleware session without closing it"""
+    factory = CountingFactory()
+    request = SimpleNamespace(state=SimpleNamespace(db=RequestSession(factory)))
+
+    dependency = get_db(request)
+    db = next(dependency)
+    dependency.close()
+
+    assert db is factory.sessions[0]
+    assert not db.closed
+
+
+def test_routes_without_database_build_no_session(monkeypatch):
+    """Health checks do not create a database session"""
+    factories = []
+
+    def request_session():
+        factory = CountingFactory()
+        factories.append(factory)
+        return RequestSession(factory)
+
+    monkeypatch.setattr("app.main.RequestSession", request_session)
+
+    response = TestClient(app).get("/health")
+
+    assert response.status_code == 200
+    assert len(factories) == 1
+    assert factories[0].sessions == []
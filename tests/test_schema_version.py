@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import create_engine
+
+from app.src.core.migrations import SchemaVersionError, check_schema_version, head_revisions, stamp
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_unmigrated_database_fails_the_check(engine):
+    """A database without the head revision stops startup, or only warns"""
+    with pytest.raises(SchemaVersionError) as error:
+        check_schema_version(engine)
+    assert error.value.current == set()
+    assert error.value.heads == head_revisions()
+    assert "python -m app.cli migrate" in str(error.value)
+
+    assert isinstance(check_schema_version(engine, mode="warn"), SchemaVersionError)
+    assert check_schema_version(engine, mode="off") is None
+
+
+def test_database_at_head_passes_the_check(engine):
+    with engine.begin() as connection:
+        stamp(connection, "0004")
+    with pytest.raises(SchemaVersionError):
+        check_schema_version(engine)
+
+    with engine.begin() as connection:
+        stamp(connection)
+    assert check_schema_version(engine) is None
@@ -0,0 +1,43 @@
+import pytest
+
+from app.src.core.unit_of_work import UNIT_OF_WORK_KEY, unit_of_work
+
+
+class RecordingSession:
+    """Session stand-in recording transaction calls"""
+
+    def __init__(self):
+        self.info = {}
+        self.calls = []
+
+    def commit(self):
+        self.calls.append("commit")
+
+    def rollback(self):
+        self.calls.append("rollback")
+
+
+def test_unit_of_work_commits_once_when_nested():
+    """Nested units of work join the outermost one"""
+    db = RecordingSession()
+
+    with unit_of_work(db):
+        with unit_of_work(db):
+            pass
+        assert db.calls == []
+
+    assert db.calls == ["commit"]
+    assert UNIT_OF_WORK_KEY not in db.info
+
+
+def test_unit_of_work_rolls_back_on_error():
+    """Errors roll back the whole unit of work"""
+    db = RecordingSession()
+
+    with pytest.raises(ValueError):
+        with unit_of_work(db):
+            with unit_of_work(db):
+                raise ValueError("invalid")
+
+    assert db.calls == ["rollback"]
+    assert UNIT_OF_WORK_KEY not in db.info